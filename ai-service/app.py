@@ -1,16 +1,48 @@
-from fastapi import FastAPI, HTTPException
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException, Depends, Request
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-import random
+import json
+import os
 import uvicorn
 
 from credit_score_explain_model import (
     CreditScoreExplainRequest,
+    CreditScoreExplainBatchRequest,
     CreditScoreExplainResponse
 )
+from llm_config import settings, get_async_neo4j_driver
 from fastapi.middleware.cors import CORSMiddleware
 from credit_score_explain_service import CreditScoreExplainService
+from credit_score_engine import CreditScoreEngine, DEFAULT_ARTIFACTS_PATH
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # One Neo4j driver pool, explain service and scoring engine for the lifetime of the app
+    app.state.neo4j_driver = get_async_neo4j_driver()
+    app.state.credit_score_explain_service = CreditScoreExplainService(driver=app.state.neo4j_driver)
+    app.state.credit_score_engine = load_credit_score_engine()
+    try:
+        yield
+    finally:
+        await app.state.credit_score_explain_service.close()
+        await app.state.neo4j_driver.close()
+
+
+def load_credit_score_engine(path: str = DEFAULT_ARTIFACTS_PATH):
+    if not os.path.exists(path):
+        print(f"Credit score artifacts not found at {path}, /predict is unavailable")
+        return None
+    engine = CreditScoreEngine.load(path)
+    print(f"Loaded credit score artifacts for {len(engine)} wallets from {path}")
+    return engine
+
+
+def get_credit_score_explain_service(request: Request) -> CreditScoreExplainService:
+    return request.app.state.credit_score_explain_service
+
+
+app = FastAPI(lifespan=lifespan)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -22,19 +54,75 @@ class Item(BaseModel):
     user: str
 
 @app.post("/credit_score_explain", response_model=CreditScoreExplainResponse)
-async def credit_score_explain(request: CreditScoreExplainRequest):
-    service = CreditScoreExplainService()
+async def credit_score_explain(
+    request: CreditScoreExplainRequest,
+    service: CreditScoreExplainService = Depends(get_credit_score_explain_service)
+):
     try:
         result = await service.explain_credit_score(request)
         return result
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/credit_score_explain/stream")
+async def credit_score_explain_stream(
+    request: CreditScoreExplainRequest,
+    service: CreditScoreExplainService = Depends(get_credit_score_explain_service)
+) -> StreamingResponse:
+    """NDJSON: a "context" line with score, nodes and edges, "token" lines, then the final "result" line"""
+    async def event_generator():
+        async for event in service.stream_explain_credit_score(request):
+            yield json.dumps(event, ensure_ascii=False, default=str) + "\n"
+
+    return StreamingResponse(event_generator(), media_type="application/x-ndjson")
+
+@app.post("/credit_score_explain/batch")
+async def credit_score_explain_batch(
+    request: CreditScoreExplainBatchRequest,
+    service: CreditScoreExplainService = Depends(get_credit_score_explain_service)
+) -> StreamingResponse:
+    """NDJSON: one {"wallet_id", "result"} line per distinct wallet, in completion order"""
+    if len(request.wallet_ids) > settings.EXPLAIN_BATCH_MAX_WALLETS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {settings.EXPLAIN_BATCH_MAX_WALLETS} wallet_ids per batch"
+        )
+    concurrency = min(request.max_concurrency or settings.EXPLAIN_BATCH_CONCURRENCY, settings.EXPLAIN_BATCH_CONCURRENCY)
+
+    async def result_generator():
+        async for wallet_id, result in service.explain_many(request.wallet_ids, concurrency):
+            line = {"wallet_id": wallet_id, "result": result.model_dump()}
+            yield json.dumps(line, ensure_ascii=False, default=str) + "\n"
+
+    return StreamingResponse(result_generator(), media_type="application/x-ndjson")
+
+async def _fetch_wallet_properties(tx, wallet_id: str):
+    result = await tx.run("MATCH (w:Wallet {id: $wallet_id}) RETURN properties(w) AS properties", wallet_id=wallet_id)
+    record = await result.single()
+    return record["properties"] if record else None
+
 @app.post('/predict')
-def predict(item: Item):
+async def predict(item: Item, request: Request):
+    engine = request.app.state.credit_score_engine
+    if engine is None:
+        raise HTTPException(status_code=503, detail="Credit score model artifacts are not loaded")
+
+    score = engine.score(item.user)
+    if score is not None:
+        return {
+            'score': round(score),
+            "explanation": "Score of the latest scoring run."
+        }
+
+    # Ví chưa có embedding: ước lượng từ các feature hiện tại của ví trong Neo4j
+    async with request.app.state.neo4j_driver.session() as session:
+        properties = await session.execute_read(_fetch_wallet_properties, item.user)
+    if properties is None:
+        raise HTTPException(status_code=404, detail=f"Wallet {item.user} not found")
+    score = engine.score_features(engine.features_matrix([properties]))[0]
     return {
-        'score': random.randint(300, 850),
-        "explanation": "This is a mock score generated for demonstration purposes."
+        'score': round(float(score)),
+        "explanation": "Estimated from the wallet features, the wallet is not part of the latest scoring run yet."
     }
 
 if __name__ == '__main__':
@@ -0,0 +1,52 @@
+import numpy as np
+from sklearn.cluster import MiniBatchKMeans
+from sklearn.metrics import silhouette_score
+
+
+def _farthest_point(X, centers):
+    """Row of X farthest from its nearest center, used to seed the extra center of the next k"""
+    squared = (X ** 2).sum(axis=1)[:, None] - 2.0 * X @ centers.T + (centers ** 2).sum(axis=1)
+    return X[np.argmax(squared.min(axis=1))]
+
+
+def predict_in_chunks(model, X, chunk_size=100000):
+    return np.concatenate([model.predict(X[start:start + chunk_size]) for start in range(0, len(X), chunk_size)])
+
+
+def sweep_minibatch_kmeans(X, k_min=2, k_max=39, sample_size=10000, batch_size=4096, seed=42, verbose=True):
+    """
+    Pick k for X by silhouette, with cost linear in the number of rows.
+
+    Every k is fitted with MiniBatchKMeans, warm-started from the centers of k - 1 plus the sample
+    point farthest from them, and scored with silhouette on one fixed random sample of
+    `sample_size` rows (exact silhouette is quadratic). Returns (best_k, best_silhouette, labels)
+    with labels for every row of X.
+    """
+    X = np.ascontiguousarray(X, dtype=np.float64)
+    rng = np.random.default_rng(seed)
+    sample = X[rng.choice(len(X), size=min(sample_size, len(X)), replace=False)]
+    k_max = min(k_max, len(sample) - 1)
+
+    best_k, best_score, best_model = None, -1.0, None
+    centers = None
+    for k in range(k_min, k_max + 1):
+        if centers is None:
+            init, n_init = "k-means++", 3
+        else:
+            init, n_init = np.vstack([centers, _farthest_point(sample, centers)]), 1
+        model = MiniBatchKMeans(n_clusters=k, init=init, n_init=n_init, batch_size=batch_size,
+                                random_state=seed).fit(X)
+        centers = model.cluster_centers_
+
+        sample_labels = model.predict(sample)
+        if len(np.unique(sample_labels)) < 2:
+            continue
+        score = silhouette_score(sample, sample_labels)
+        if verbose:
+            print(f"[cluster] k={k}, sampled silhouette={score:.4f}")
+        if score > best_score:
+            best_k, best_score, best_model = k, score, model
+
+    if best_model is None:
+        raise ValueError("No k in the sweep produced at least two clusters")
+    return best_k, best_score, predict_in_chunks(best_model, X)
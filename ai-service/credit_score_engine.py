@@ -0,0 +1,223 @@
+import os
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Feature weights of the scoring notebook (baai-kg), in wallet_features.csv column order
+FEATURE_WEIGHTS = {
+    'num_deposit':          2,
+    'total_deposit':       10,
+    'num_borrow':          -2,
+    'total_borrow':        -8,
+    'num_repay':            2,
+    'total_repay':          8,
+    'num_withdraw':        -2,
+    'total_withdraw':      -5,
+    'num_liquidated':      -5,
+    'total_liquidated':   -15,
+    'num_liquidating':     -2,
+    'total_liquidating':  -5,
+    'num_contracts':        3,
+    'num_projects':         3,
+    'num_tweets':           1,
+    'avg_likes':           0.5,
+    'avg_retweets':        0.5,
+    'num_hashtags':        0.5,
+}
+
+MIN_SCORE, MAX_SCORE = 300, 850
+# Blend of the feature-based and the embedding-based (distance to the best community) scores
+ALPHA, BETA = 0.7, 0.3
+
+DEFAULT_ARTIFACTS_PATH = os.getenv("CREDIT_SCORE_ARTIFACTS", "artifacts/credit_score_model.npz")
+# Rows per scoring chunk, bounds the temporaries of compute_credit_scores
+DEFAULT_CHUNK_ROWS = 1 << 16
+
+
+def compute_credit_scores(
+    features: np.ndarray,
+    embeddings: np.ndarray,
+    centroid: np.ndarray,
+    feature_weights: np.ndarray,
+    alpha: float = ALPHA,
+    beta: float = BETA,
+    feat_score_range: Optional[Tuple[float, float]] = None,
+    distance_range: Optional[Tuple[float, float]] = None,
+    score_range: Tuple[float, float] = (MIN_SCORE, MAX_SCORE),
+    chunk_size: int = DEFAULT_CHUNK_ROWS
+) -> Tuple[np.ndarray, Tuple[float, float], Tuple[float, float]]:
+    """
+    Credit scores of n wallets from their raw features (n x f) and embeddings (n x d) in float32:
+    alpha * minmax(features . weights) + beta * (1 - minmax(||embedding - centroid||)), mapped to
+    `score_range`. Rows are read `chunk_size` at a time, so the inputs may be np.memmap arrays larger
+    than memory. The min-max ranges are taken from the data unless given (e.g. from the artifacts).
+    Returns (scores, feat_score_range, distance_range).
+    """
+    n = len(features)
+    weights = np.ascontiguousarray(feature_weights, dtype=np.float32)
+    centroid = np.ascontiguousarray(centroid, dtype=np.float32)
+    feat_scores = np.empty(n, dtype=np.float32)
+    distances = np.empty(n, dtype=np.float32)
+    for start in range(0, n, chunk_size):
+        stop = min(start + chunk_size, n)
+        np.dot(np.ascontiguousarray(features[start:stop], dtype=np.float32), weights, out=feat_scores[start:stop])
+        diff = np.ascontiguousarray(embeddings[start:stop], dtype=np.float32)
+        diff -= centroid
+        np.sqrt(np.einsum("ij,ij->i", diff, diff), out=distances[start:stop])
+
+    if feat_score_range is None:
+        feat_score_range = (float(feat_scores.min()), float(feat_scores.max())) if n else (0.0, 0.0)
+    if distance_range is None:
+        distance_range = (float(distances.min()), float(distances.max())) if n else (0.0, 0.0)
+
+    # In place: feat_scores becomes the composite, then the score
+    _min_max_inplace(feat_scores, *feat_score_range)
+    _min_max_inplace(distances, *distance_range)
+    feat_scores *= alpha
+    feat_scores += beta * (1.0 - distances)
+    low, high = score_range
+    feat_scores *= high - low
+    feat_scores += low
+    return feat_scores, feat_score_range, distance_range
+
+
+def _min_max_inplace(values: np.ndarray, low: float, high: float) -> None:
+    span = high - low
+    if span <= 0:
+        values[:] = 0.0
+        return
+    values -= low
+    values /= span
+    np.clip(values, 0.0, 1.0, out=values)
+
+
+def build_artifacts(
+    wallet_ids: Sequence[str],
+    features: np.ndarray,
+    embeddings: np.ndarray,
+    communities: Sequence[int],
+    feature_names: Sequence[str] = tuple(FEATURE_WEIGHTS),
+    weights: Mapping[str, float] = FEATURE_WEIGHTS,
+    alpha: float = ALPHA,
+    beta: float = BETA
+) -> Dict[str, np.ndarray]:
+    """
+    Model artifacts from the outputs of the scoring run: raw wallet features (n x f), GAE embeddings
+    (n x d) and community labels (n). Reproduces the notebook's scoring: the best community is the one
+    whose mean features score highest, and each wallet blends its min-max normalized feature score
+    with its min-max normalized embedding distance to that community's centroid.
+    """
+    features = np.asarray(features, dtype=np.float64)
+    embeddings = np.asarray(embeddings, dtype=np.float64)
+    labels, community_index = np.unique(np.asarray(communities), return_inverse=True)
+    k = len(labels)
+    feature_weights = np.array([weights.get(name, 0.0) for name in feature_names], dtype=np.float64)
+
+    counts = np.bincount(community_index, minlength=k).astype(np.float64)[:, None]
+    feature_centroids = np.zeros((k, features.shape[1]))
+    np.add.at(feature_centroids, community_index, features)
+    feature_centroids /= counts
+    embedding_centroids = np.zeros((k, embeddings.shape[1]))
+    np.add.at(embedding_centroids, community_index, embeddings)
+    embedding_centroids /= counts
+    best_community = int(np.argmax(feature_centroids @ feature_weights))
+
+    _, feat_score_range, distance_range = compute_credit_scores(
+        features, embeddings, embedding_centroids[best_community], feature_weights, alpha, beta
+    )
+    feature_mean = features.mean(axis=0)
+    feature_scale = features.std(axis=0)
+    feature_scale[feature_scale == 0] = 1.0
+
+    return {
+        "wallet_ids": np.asarray(wallet_ids, dtype=str),
+        "features": features.astype(np.float32),
+        "embeddings": embeddings.astype(np.float32),
+        "communities": community_index.astype(np.int32),
+        "feature_names": np.asarray(feature_names, dtype=str),
+        "feature_weights": feature_weights,
+        "feature_mean": feature_mean,
+        "feature_scale": feature_scale,
+        # Standardized, used to place wallets without an embedding in a community
+        "feature_centroids": (feature_centroids - feature_mean) / feature_scale,
+        "embedding_centroids": embedding_centroids,
+        "best_community": np.array(best_community),
+        "feat_score_range": np.array(feat_score_range),
+        "distance_range": np.array(distance_range),
+        "blend": np.array([alpha, beta]),
+        "score_range": np.array([MIN_SCORE, MAX_SCORE], dtype=np.float64),
+    }
+
+
+def save_artifacts(path: str, artifacts: Dict[str, np.ndarray]) -> None:
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.tmp.npz"
+    np.savez_compressed(tmp_path, **artifacts)
+    os.replace(tmp_path, path)
+
+
+class CreditScoreEngine:
+    """
+    In-memory credit scoring from the persisted model artifacts. Scores of every known wallet are
+    computed once at load, so a lookup is a dict access; wallets that are not embedded yet are
+    scored in one vectorized pass from their features.
+    """
+
+    def __init__(self, artifacts: Mapping[str, np.ndarray]):
+        self.feature_names: List[str] = [str(name) for name in artifacts["feature_names"]]
+        self.feature_weights = np.asarray(artifacts["feature_weights"], dtype=np.float64)
+        self.feature_mean = np.asarray(artifacts["feature_mean"], dtype=np.float64)
+        self.feature_scale = np.asarray(artifacts["feature_scale"], dtype=np.float64)
+        self.feature_centroids = np.asarray(artifacts["feature_centroids"], dtype=np.float64)
+        self.embedding_centroids = np.asarray(artifacts["embedding_centroids"], dtype=np.float64)
+        self.best_community = int(artifacts["best_community"])
+        self.feat_score_range = tuple(float(v) for v in artifacts["feat_score_range"])
+        self.distance_range = tuple(float(v) for v in artifacts["distance_range"])
+        self.alpha, self.beta = (float(v) for v in artifacts["blend"])
+        self.min_score, self.max_score = (float(v) for v in artifacts["score_range"])
+
+        self.wallet_ids = np.asarray(artifacts["wallet_ids"], dtype=str)
+        self._row_by_wallet: Dict[str, int] = {wallet_id: row for row, wallet_id in enumerate(self.wallet_ids.tolist())}
+        self.scores = self._score(artifacts["features"], artifacts["embeddings"])
+
+    @classmethod
+    def load(cls, path: str = DEFAULT_ARTIFACTS_PATH) -> "CreditScoreEngine":
+        with np.load(path, allow_pickle=False) as artifacts:
+            return cls({key: artifacts[key] for key in artifacts.files})
+
+    def __len__(self) -> int:
+        return len(self._row_by_wallet)
+
+    def __contains__(self, wallet_id: str) -> bool:
+        return wallet_id in self._row_by_wallet
+
+    def score(self, wallet_id: str) -> Optional[float]:
+        """Score of an embedded wallet, None when the wallet was not part of the scoring run"""
+        row = self._row_by_wallet.get(wallet_id)
+        return None if row is None else float(self.scores[row])
+
+    def score_features(self, features: np.ndarray) -> np.ndarray:
+        """
+        Scores for wallets without an embedding (m x f raw features, in `feature_names` order).
+        Each wallet takes the embedding centroid of the community whose feature centroid is closest.
+        """
+        features = np.atleast_2d(np.asarray(features, dtype=np.float64))
+        standardized = (features - self.feature_mean) / self.feature_scale
+        # ||x - c||^2 = ||x||^2 - 2 x.c + ||c||^2, the ||x||^2 term does not change the argmin
+        squared = -2.0 * standardized @ self.feature_centroids.T + (self.feature_centroids ** 2).sum(axis=1)
+        nearest = np.argmin(squared, axis=1)
+        return self._score(features, self.embedding_centroids[nearest])
+
+    def features_matrix(self, rows: Iterable[Mapping[str, Any]]) -> np.ndarray:
+        """Feature dicts (e.g. Wallet node properties) as a matrix in `feature_names` order, missing = 0"""
+        return np.array(
+            [[float(row.get(name) or 0.0) for name in self.feature_names] for row in rows],
+            dtype=np.float64
+        ).reshape(-1, len(self.feature_names))
+
+    def _score(self, features: np.ndarray, embeddings: np.ndarray) -> np.ndarray:
+        scores, _, _ = compute_credit_scores(
+            features, embeddings, self.embedding_centroids[self.best_community], self.feature_weights,
+            self.alpha, self.beta, self.feat_score_range, self.distance_range, (self.min_score, self.max_score)
+        )
+        return scores
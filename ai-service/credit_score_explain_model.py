@@ -1,5 +1,5 @@
 from enum import Enum
-from typing import Optional, Dict, Any
+from typing import Optional, Any, List
 from pydantic import BaseModel, Field
 
 class CreditScoreExplainStatus(str, Enum):
@@ -17,6 +17,18 @@ class CreditScoreExplainRequest(BaseModel):
             }
         }
 
+class CreditScoreExplainBatchRequest(BaseModel):
+    wallet_ids: List[str] = Field(..., min_length=1, description="Danh sách ID ví trong Neo4j")
+    max_concurrency: Optional[int] = Field(None, ge=1, description="Số ví xử lý đồng thời tối đa")
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "wallet_ids": ["0xAbC1234Def5678", "0x1234AbCd5678Ef"],
+                "max_concurrency": 4
+            }
+        }
+
 class CreditScoreExplainResponse(BaseModel):
     status: CreditScoreExplainStatus
     explanation: Optional[str] = Field(None, description="Giải thích ảnh hưởng tới credit score")
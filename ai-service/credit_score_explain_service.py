@@ -1,115 +1,246 @@
+import asyncio
+import hashlib
+import os
 import time
+from functools import lru_cache
+from typing import Any, AsyncIterator, Dict, Iterable, Tuple
 from langchain.prompts import ChatPromptTemplate
-from llm_config import get_llm_model
+from llm_config import settings, get_llm_model, get_async_neo4j_driver
 from json_helpers import clean_and_parse_json
+from explain_cache import ExplainCache, context_hash
+from explain_context import build_explain_context
 from credit_score_explain_model import (
     CreditScoreExplainRequest,
     CreditScoreExplainResponse,
     CreditScoreExplainStatus
 )
-from neo4j import AsyncGraphDatabase
+from neo4j import AsyncDriver
+
+TEMPLATE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "credit_score_explain_template.txt")
+
+# Wallet, score, neighbours and edges in one round trip. At most $neighbors_per_type neighbours are
+# kept per relationship type, and $neighbor_limit in total, so hub wallets stay small.
+WALLET_CONTEXT_QUERY = """
+MATCH (w:Wallet {id: $wallet_id})
+CALL {
+    WITH w
+    CALL {
+        WITH w
+        MATCH (w)-[r]-(n)
+        // Ordered before sampling and limiting, so the same graph always yields the same context
+        WITH r, n ORDER BY type(r), elementId(n), elementId(r)
+        WITH type(r) AS rel_type, collect([r, n])[..$neighbors_per_type] AS sampled
+        UNWIND sampled AS pair
+        RETURN pair
+        ORDER BY type(pair[0]), elementId(pair[1]), elementId(pair[0])
+        LIMIT $neighbor_limit
+    }
+    RETURN collect(pair[0]) AS edges, collect(pair[1]) AS nodes,
+        collect(type(pair[0])) AS edge_types, collect(labels(pair[1])) AS node_labels
+}
+RETURN w AS info, w.credit_score AS score, edges, nodes, edge_types, node_labels
+"""
+
+
+@lru_cache(maxsize=None)
+def load_prompt_template(path: str = TEMPLATE_PATH) -> str:
+    """Read a prompt template once per process"""
+    with open(path, "r", encoding="utf-8") as f:
+        return f.read()
+
 
 class CreditScoreExplainService:
-    def __init__(self):
-        # Load prompt template
-        with open("credit_score_explain_template.txt", "r", encoding="utf-8") as f:
-            prompt_template = f.read()
-        self.prompt = ChatPromptTemplate.from_template(prompt_template)
-        self.model = get_llm_model()
-        self.chain = self.prompt | self.model
-        # Neo4j driver (URL, AUTH lấy từ config)
-        from llm_config import settings
-        self.driver = AsyncGraphDatabase.driver(
-            settings.NEO4J_URI, auth=(settings.NEO4J_USERNAME, settings.NEO4J_PASSWORD)
+    """
+    Meant to live for the whole application: build it once at startup and call close() on shutdown.
+    The prompt chain and the Neo4j driver (and its connection pool) are shared by every request.
+    """
+
+    def __init__(self, driver: AsyncDriver = None, chain=None, cache: ExplainCache = None):
+        if chain is None:
+            # Load prompt template
+            prompt_template = load_prompt_template()
+            self.prompt = ChatPromptTemplate.from_template(prompt_template)
+            self.model = get_llm_model()
+            chain = self.prompt | self.model
+            # Cached explanations are only reused with the same template and model
+            self.prompt_version = hashlib.sha256(
+                f"{prompt_template}|{settings.LLM_PROVIDER}|{settings.MODEL_NAME}".encode("utf-8")
+            ).hexdigest()[:12]
+        else:
+            self.prompt_version = "custom"
+        self.chain = chain
+        self.cache = cache or ExplainCache(
+            max_entries=settings.EXPLAIN_CACHE_MAX_ENTRIES,
+            ttl_seconds=settings.EXPLAIN_CACHE_TTL_SECONDS,
+            redis_url=settings.REDIS_URL
+        )
+        # Neo4j driver (URL, AUTH lấy từ config), closed by close() only when created here
+        self._owns_driver = driver is None
+        self.driver = driver or get_async_neo4j_driver()
+        self.neighbor_limit = settings.EXPLAIN_NEIGHBOR_LIMIT
+        self.neighbors_per_type = settings.EXPLAIN_NEIGHBORS_PER_TYPE
+        # wallet_id -> running explanation, shared by concurrent requests for the same wallet
+        self._in_flight: Dict[str, asyncio.Future] = {}
+
+    async def close(self):
+        await self.cache.close()
+        if self._owns_driver:
+            await self.driver.close()
+
+    @staticmethod
+    async def _fetch_wallet_context(tx, wallet_id: str, neighbors_per_type: int, neighbor_limit: int):
+        result = await tx.run(
+            WALLET_CONTEXT_QUERY,
+            wallet_id=wallet_id,
+            neighbors_per_type=neighbors_per_type,
+            neighbor_limit=neighbor_limit
+        )
+        return await result.single()
+
+    async def _load_context(self, wallet_id: str) -> Dict[str, Any]:
+        """Graph context of the wallet, plus either its cached explanation or the LLM input"""
+        # Ví, credit score, các node và edge nối với ví: một read transaction duy nhất
+        async with self.driver.session() as session:
+            record = await session.execute_read(
+                self._fetch_wallet_context, wallet_id, self.neighbors_per_type, self.neighbor_limit
+            )
+        if not record:
+            score, info, nodes, edges = 700, "No wallet information found.", [], []
+            edge_types, node_labels = [], []
+        else:
+            # nếu không tìm thấy score, trả về 700
+            score = record["score"] if record["score"] is not None else 700
+            info = record["info"]
+            nodes = [dict(n) for n in record["nodes"]]
+            edges = [dict(r) for r in record["edges"]]
+            edge_types, node_labels = record["edge_types"], record["node_labels"]
+
+        # 1. Kiểm tra credit score có hợp lệ không
+        if not (300 <= score <= 850):
+            raise ValueError("Credit score must be between 300 and 850.")
+        if not nodes or not edges:
+            raise ValueError("Nodes and edges data must not be empty.")
+
+        context = {"score": score, "nodes": nodes, "edges": edges, "llm_input": None}
+
+        # Kết quả đã cache cho cùng score, ví và vùng lân cận thì không gọi lại LLM
+        context["cache_key"] = self.cache.make_key(
+            wallet_id, context_hash(score, dict(info), nodes, edges), self.prompt_version
+        )
+        cached = await self.cache.get(context["cache_key"])
+        context["cached_explanation"] = cached["explanation"] if cached is not None else None
+        if cached is not None:
+            return context
+
+        # 2. Chuẩn bị input cho LLM: tóm tắt theo loại node/edge, vừa với token budget
+        prompt_context = build_explain_context(
+            info, nodes, edges, edge_types, node_labels,
+            token_budget=settings.EXPLAIN_CONTEXT_TOKEN_BUDGET,
+            top_k=settings.EXPLAIN_CONTEXT_TOP_K
+        )
+        context["llm_input"] = {
+            "credit_score": score,
+            "wallet_id": wallet_id,
+            "nodes": prompt_context["nodes"],
+            "edges": prompt_context["edges"],
+            "info": prompt_context["info"]
+        }
+        return context
+
+    async def _finish(self, context: Dict[str, Any], content: str) -> CreditScoreExplainResponse:
+        print(f"LLM raw response: {content}")
+
+        # 4. Parse JSON output
+        parsed = clean_and_parse_json(content)
+        print(f"LLM response: {parsed}")
+        explanation = parsed.get('summary', 'No explanation provided')
+        await self.cache.set(context["cache_key"], {"explanation": explanation})
+        return self._success(context, explanation)
+
+    @staticmethod
+    def _success(context: Dict[str, Any], explanation: str) -> CreditScoreExplainResponse:
+        return CreditScoreExplainResponse(
+            status=CreditScoreExplainStatus.SUCCESS,
+            explanation=explanation,
+            score=context["score"],
+            nodes=context["nodes"],
+            edges=context["edges"],
+        )
+
+    @staticmethod
+    def _error(e: Exception, start: float) -> CreditScoreExplainResponse:
+        elapsed = time.time() - start
+        return CreditScoreExplainResponse(
+            status=CreditScoreExplainStatus.ERROR,
+            error_message=str(e),
+            processing_time=round(elapsed, 3)
         )
 
     async def explain_credit_score(self, request: CreditScoreExplainRequest) -> CreditScoreExplainResponse:
+        """Explain one wallet; concurrent calls for the same wallet share one Neo4j read and LLM call"""
+        wallet_id = request.wallet_id
+        task = self._in_flight.get(wallet_id)
+        if task is None:
+            task = asyncio.ensure_future(self._explain_credit_score(request))
+            self._in_flight[wallet_id] = task
+            task.add_done_callback(lambda done: self._in_flight.pop(wallet_id, None)
+                                   if self._in_flight.get(wallet_id) is done else None)
+        # A caller that goes away must not cancel the explanation the other callers wait for
+        return await asyncio.shield(task)
+
+    async def explain_many(
+        self, wallet_ids: Iterable[str], concurrency: int
+    ) -> AsyncIterator[Tuple[str, CreditScoreExplainResponse]]:
+        """Explain distinct wallets with at most `concurrency` in progress, yielding each as it completes"""
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def explain_one(wallet_id: str) -> Tuple[str, CreditScoreExplainResponse]:
+            async with semaphore:
+                return wallet_id, await self.explain_credit_score(CreditScoreExplainRequest(wallet_id=wallet_id))
+
+        tasks = [asyncio.ensure_future(explain_one(wallet_id)) for wallet_id in dict.fromkeys(wallet_ids)]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def _explain_credit_score(self, request: CreditScoreExplainRequest) -> CreditScoreExplainResponse:
         start = time.time()
         try:
-            #tra cứu field credit score từ  node Wallet trong Neo4j (Wallet có field score)
-            # node nối với node Wallet và edge nối với node Wallet
-            async with self.driver.session() as session:
-                query = """
-                MATCH (w:Wallet {id: $wallet_id})-[r]-(n)
-                RETURN w, collect(r) AS edges, collect(n) AS nodes
-                """
-                result = await session.run(query, wallet_id=request.wallet_id)
-                record = await result.single()
-                nodes = [dict(n) for n in record["nodes"]]
-                edges = [dict(r) for r in record["edges"]]
-            
-            async with self.driver.session() as session:
-                result = await session.run(
-                    "MATCH (w:Wallet {id: $wallet_id}) RETURN w.credit_score AS score",
-                    wallet_id=request.wallet_id
-                )
-                # nếu không tìm thấy score, trả về 700
-                record = await result.single()
-                if not record:
-                    score = 700
-                else:
-                    score = record["score"]
-
-            print('12345566')
-
-            # Kiểm tra credit score có hợp lệ không
-            if not (300 <= score <= 850):
-                raise ValueError("Credit score must be between 300 and 850.")
-            if not nodes or not edges:
-                raise ValueError("Nodes and edges data must not be empty.")
-            # 1. Kiểm tra credit score có hợp lệ không
-            if not (300 <= score <= 850):
-                raise ValueError("Credit score must be between 300 and 850.")
-            
-            async with self.driver.session() as session:
-                print('00000000')
-                result = await session.run(
-                    "MATCH (w:Wallet {id: $wallet_id}) RETURN w as info",
-                    wallet_id=request.wallet_id
-                )
-                print('1111111111')
-                record = await result.single()
-                print('2222222222')
-                if not record:
-                    info = "No wallet information found."
-                else:
-                    info = record["info"]
-            print(record)
-            # 2. Chuẩn bị input cho LLM
-            llm_input = {
-                "credit_score": score,
-                "wallet_id": request.wallet_id,
-                "nodes": nodes,
-                "edges": edges,
-                "info": info
-            }
+            context = await self._load_context(request.wallet_id)
+            if context["cached_explanation"] is not None:
+                return self._success(context, context["cached_explanation"])
 
             # 3. Gọi LLM
-            response = await self.chain.ainvoke(llm_input)
+            response = await self.chain.ainvoke(context["llm_input"])
             content = response.content if hasattr(response, "content") else str(response)
-            print(f"LLM raw response: {content}")
-
-            # 4. Parse JSON output
-            parsed = clean_and_parse_json(content)
-            print(f"LLM response: {parsed}")
-            elapsed = time.time() - start
-            print(nodes)
-            print(edges)
-            return CreditScoreExplainResponse(
-                status=CreditScoreExplainStatus.SUCCESS,
-                explanation= parsed.get('summary', 'No explanation provided'),
-                # data=parsed,
-                # processing_time=round(elapsed, 3),
-                # tokens_used=1
-                score=score,
-                nodes=nodes,
-                edges=edges,
-            
-            )
+            return await self._finish(context, content)
         except Exception as e:
-            elapsed = time.time() - start
-            return CreditScoreExplainResponse(
-                status=CreditScoreExplainStatus.ERROR,
-                error_message=str(e),
-                processing_time=round(elapsed, 3)
-            )
+            return self._error(e, start)
+
+    async def stream_explain_credit_score(self, request: CreditScoreExplainRequest) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Same result as explain_credit_score, as events: {"event": "context"} with score, nodes and edges
+        as soon as the graph is read, {"event": "token"} per LLM chunk, then {"event": "result"}.
+        """
+        start = time.time()
+        try:
+            context = await self._load_context(request.wallet_id)
+            yield {"event": "context", "score": context["score"], "nodes": context["nodes"], "edges": context["edges"]}
+
+            if context["cached_explanation"] is not None:
+                result = self._success(context, context["cached_explanation"])
+            else:
+                # 3. Gọi LLM, chuyển từng token cho client ngay khi nhận được
+                chunks = []
+                async for chunk in self.chain.astream(context["llm_input"]):
+                    text = chunk.content if hasattr(chunk, "content") else str(chunk)
+                    if text:
+                        chunks.append(text)
+                        yield {"event": "token", "text": text}
+                result = await self._finish(context, "".join(chunks))
+        except Exception as e:
+            result = self._error(e, start)
+        yield {"event": "result", "data": result.model_dump()}
@@ -1,46 +1,173 @@
 from neo4j import GraphDatabase
-import pandas as pd
+import argparse
+import csv
 import json
+import os
 
-# ──────────────────────────────────────────────────────────────────────────────
-# 1) Configure your Neo4j connection
-from llm_config import settings
-driver = GraphDatabase.driver(
-            settings.NEO4J_URI, auth=(settings.NEO4J_USERNAME, settings.NEO4J_PASSWORD)
-)
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:  # orjson is optional, the stdlib parser gives the same result
+    _loads = json.loads
 
 # ──────────────────────────────────────────────────────────────────────────────
-# 2) Cypher to fetch raw liquidation logs
+# 1) Cypher to stream raw liquidation logs, grouped by (source, target)
 # ──────────────────────────────────────────────────────────────────────────────
-CYpher = """
+LIQUIDATIONS_QUERY = """
 MATCH (w1:Wallet)-[r:LIQUIDATED_BY]->(w2:Wallet)
+WHERE r.liquidationLogs IS NOT NULL
 RETURN w1.id AS source, w2.id AS target, r.liquidationLogs AS logsJson
+ORDER BY source, target
 """
 
+FETCH_SIZE = 5000
+# Rows per CSV flush / Parquet row group
+CHUNK_ROWS = 50000
+
+AGGREGATED_COLUMNS = [("source", "string"), ("target", "string"), ("weight", "float"),
+                      ("count", "int"), ("max_weight", "float")]
+EVENT_COLUMNS = [("source", "string"), ("target", "string"), ("weight", "float")]
+
+
 # ──────────────────────────────────────────────────────────────────────────────
-# 3) Pull data and parse JSON in Python
+# 2) Parse and de-duplicate liquidation events
 # ──────────────────────────────────────────────────────────────────────────────
-def fetch_raw_liquidations(tx):
-    return list(tx.run(CYpher))
-
-records = []
-with driver.session() as session:
-    for rec in session.read_transaction(fetch_raw_liquidations):
-        src = rec["source"]
-        tgt = rec["target"]
-        logs = json.loads(rec["logsJson"])
-        # logs["liquidatedWallet"] is a dict: ts_str -> { debtAssetInUSD: ..., ... }
-        for ts_str, detail in logs.get("liquidatedWallet", {}).items():
-            weight = float(detail.get("debtAssetInUSD", 0.0))
-            records.append({
-                "source": src,
-                "target": tgt,
-                "weight": weight
-            })
+def iter_liquidation_events(driver, fetch_size=FETCH_SIZE):
+    """
+    Yield one (source, target, weight) per distinct liquidation event.
+
+    logs["liquidatedWallet"] is a dict: ts_str -> { debtAssetInUSD: ..., ... }. The same event can
+    be stored on several LIQUIDATED_BY edges of a pair, so events are keyed by timestamp per pair.
+    Records arrive ordered by pair, so only the current pair's timestamps are kept in memory.
+    """
+    current_pair = None
+    seen_ts = set()
+    with driver.session(fetch_size=fetch_size) as session:
+        for rec in session.run(LIQUIDATIONS_QUERY):
+            pair = (rec["source"], rec["target"])
+            if pair != current_pair:
+                current_pair = pair
+                seen_ts = set()
+            logs = _loads(rec["logsJson"])
+            for ts_str, detail in (logs.get("liquidatedWallet") or {}).items():
+                if ts_str in seen_ts:
+                    continue
+                seen_ts.add(ts_str)
+                yield pair[0], pair[1], float(detail.get("debtAssetInUSD") or 0.0)
+
+
+def aggregate_pairs(events):
+    """Collapse consecutive events of the same pair into (source, target, sum, count, max)"""
+    current_pair = None
+    total = count = 0
+    max_weight = 0.0
+    for source, target, weight in events:
+        if (source, target) != current_pair:
+            if current_pair is not None:
+                yield current_pair[0], current_pair[1], total, count, max_weight
+            current_pair = (source, target)
+            total, count, max_weight = 0.0, 0, weight
+        total += weight
+        count += 1
+        max_weight = max(max_weight, weight)
+    if current_pair is not None:
+        yield current_pair[0], current_pair[1], total, count, max_weight
+
 
 # ──────────────────────────────────────────────────────────────────────────────
-# 4) Save to CSV
+# 3) Write in chunks, as CSV or typed Parquet
 # ──────────────────────────────────────────────────────────────────────────────
-df = pd.DataFrame(records)
-df.to_csv("liquidated_edges.csv", index=False)
-print(f"Exported {len(df)} liquidation edges to liquidated_edges.csv")
+def write_csv(rows, filename, columns, chunk_rows=CHUNK_ROWS):
+    tmp_file = f"{filename}.tmp"
+    written = 0
+    with open(tmp_file, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow([name for name, _ in columns])
+        chunk = []
+        for row in rows:
+            chunk.append(row)
+            if len(chunk) >= chunk_rows:
+                writer.writerows(chunk)
+                written += len(chunk)
+                chunk = []
+        writer.writerows(chunk)
+        written += len(chunk)
+    os.replace(tmp_file, filename)
+    return written
+
+
+def write_parquet(rows, filename, columns, chunk_rows=CHUNK_ROWS):
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise ImportError("Parquet output requires pyarrow: pip install pyarrow") from e
+
+    # Wallet ids repeat a lot across edges, dictionary encoding keeps the file small
+    arrow_types = {"string": pa.dictionary(pa.int32(), pa.string()), "int": pa.int32(), "float": pa.float64()}
+    schema = pa.schema([(name, arrow_types[kind]) for name, kind in columns])
+
+    def write_chunk(writer, chunk):
+        arrays = []
+        for values, field in zip(zip(*chunk), schema):
+            if pa.types.is_dictionary(field.type):
+                arrays.append(pa.array(values, type=pa.string()).dictionary_encode())
+            else:
+                arrays.append(pa.array(values, type=field.type))
+        writer.write_batch(pa.RecordBatch.from_arrays(arrays, schema=schema))
+
+    tmp_file = f"{filename}.tmp"
+    written = 0
+    with pq.ParquetWriter(tmp_file, schema) as writer:
+        chunk = []
+        for row in rows:
+            chunk.append(row)
+            if len(chunk) >= chunk_rows:
+                write_chunk(writer, chunk)
+                written += len(chunk)
+                chunk = []
+        if chunk:
+            write_chunk(writer, chunk)
+            written += len(chunk)
+        if written == 0:
+            writer.write_table(schema.empty_table())
+    os.replace(tmp_file, filename)
+    return written
+
+
+def extract_liquidation_edges(driver, filename="liquidated_edges.csv", aggregate=True,
+                              fetch_size=FETCH_SIZE, chunk_rows=CHUNK_ROWS):
+    """
+    Export liquidation edges, one row per (source, target) pair with weight = summed debt in USD,
+    count and max_weight, or one row per distinct event when `aggregate` is False.
+    Files ending in .parquet are written as Parquet, anything else as CSV.
+    """
+    rows = iter_liquidation_events(driver, fetch_size=fetch_size)
+    columns = EVENT_COLUMNS
+    if aggregate:
+        rows = aggregate_pairs(rows)
+        columns = AGGREGATED_COLUMNS
+
+    write = write_parquet if filename.endswith(".parquet") else write_csv
+    return write(rows, filename, columns, chunk_rows=chunk_rows)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export LIQUIDATED_BY edges for the graph model")
+    parser.add_argument("--output", default="liquidated_edges.csv",
+                        help="output file, written as Parquet when it ends in .parquet")
+    parser.add_argument("--no-aggregate", action="store_true",
+                        help="write one row per distinct liquidation event instead of one per wallet pair")
+    parser.add_argument("--fetch-size", type=int, default=FETCH_SIZE)
+    args = parser.parse_args()
+
+    from llm_config import settings
+    driver = GraphDatabase.driver(
+        settings.NEO4J_URI, auth=(settings.NEO4J_USERNAME, settings.NEO4J_PASSWORD)
+    )
+    try:
+        count = extract_liquidation_edges(driver, args.output, aggregate=not args.no_aggregate,
+                                          fetch_size=args.fetch_size)
+        print(f"Exported {count} liquidation edges to {args.output}")
+    finally:
+        driver.close()
@@ -0,0 +1,94 @@
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from typing import Optional, Dict, Any
+
+try:
+    import redis.asyncio as aioredis
+except ImportError:  # Redis tier is optional, the in-process LRU works without it
+    aioredis = None
+
+
+def context_hash(score: Any, info: Any, nodes: Any, edges: Any) -> str:
+    """
+    Stable hash of everything the explanation depends on.
+    The graph builder stamps graphUpdatedAt on rewritten wallets and the scoring job rewrites
+    credit_score, so either write changes the hash and the old explanation is never served.
+    """
+    payload = json.dumps(
+        {"score": score, "info": info, "nodes": nodes, "edges": edges},
+        sort_keys=True, default=str, separators=(",", ":")
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ExplainCache:
+    """
+    Two-tier cache for explanation results: an in-process LRU with TTL, backed by Redis when
+    `redis_url` is set. Redis errors are logged and ignored so the cache never fails a request.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: float = 3600, redis_url: Optional[str] = None,
+                 namespace: str = "explain"):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.namespace = namespace
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self.redis = None
+        if redis_url:
+            if aioredis is None:
+                print("REDIS_URL is set but the redis package is not installed, using the in-process cache only")
+            else:
+                self.redis = aioredis.from_url(redis_url, decode_responses=True)
+
+    def make_key(self, wallet_id: str, digest: str, prompt_version: str = "") -> str:
+        return f"{self.namespace}:{wallet_id}:{prompt_version}:{digest}"
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires_at, value = entry
+            if expires_at > time.monotonic():
+                self._entries.move_to_end(key)
+                return value
+            del self._entries[key]
+
+        if self.redis is None:
+            return None
+        try:
+            raw = await self.redis.get(key)
+        except Exception as e:
+            print(f"Explain cache: Redis get failed: {e}")
+            return None
+        if raw is None:
+            return None
+        try:
+            value = json.loads(raw)
+        except ValueError as e:
+            # A corrupt entry is a miss; the next set() overwrites it
+            print(f"Explain cache: ignoring unreadable entry {key}: {e}")
+            return None
+        self._store_local(key, value)
+        return value
+
+    async def set(self, key: str, value: Dict[str, Any]) -> None:
+        self._store_local(key, value)
+        if self.redis is None:
+            return
+        try:
+            await self.redis.set(key, json.dumps(value, default=str), ex=max(1, int(self.ttl_seconds)))
+        except Exception as e:
+            print(f"Explain cache: Redis set failed: {e}")
+
+    async def close(self) -> None:
+        if self.redis is not None:
+            await self.redis.aclose()
+
+    def _store_local(self, key: str, value: Dict[str, Any]) -> None:
+        if self.max_entries <= 0:
+            return
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
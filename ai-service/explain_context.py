@@ -0,0 +1,157 @@
+import json
+from collections import defaultdict
+from typing import Any, Dict, List
+
+try:
+    import tiktoken
+    _encoding = tiktoken.get_encoding("cl100k_base")
+except Exception:  # tiktoken is optional (and needs its BPE file), fall back to ~4 characters per token
+    _encoding = None
+
+# Bookkeeping properties that say nothing about credit risk
+IGNORED_PROPERTIES = {"graphUpdatedAt", "_id"}
+# Numeric properties that are identifiers or positions, never summed
+NON_ADDITIVE_PROPERTIES = {"block_number", "log_index", "bucket_id", "timestamp", "chainId", "decimals"}
+# Edge properties used to rank the top-k edges of a relationship type, first present wins
+RANKING_PROPERTIES = ("valueInUSD", "amountInUSD", "amount", "value")
+# Strings longer than this are treated as serialized time series / logs
+MAX_STRING_CHARS = 200
+
+
+def count_tokens(text: str) -> int:
+    if _encoding is not None:
+        return len(_encoding.encode(text))
+    return len(text) // 4 + 1
+
+
+def compact_properties(properties: Dict[str, Any], samples: int = 3) -> Dict[str, Any]:
+    """
+    Copy of `properties` without bookkeeping fields and with long JSON blobs (balanceChangeLogs,
+    dailyAllTransactions, liquidationLogs, ...) replaced by their size and last `samples` entries.
+    """
+    compact = {}
+    for key, value in properties.items():
+        if key in IGNORED_PROPERTIES:
+            continue
+        if isinstance(value, str) and len(value) > MAX_STRING_CHARS:
+            value = _downsample_blob(value, samples)
+        elif isinstance(value, list) and len(value) > samples:
+            value = {"entries": len(value), "last": value[-samples:]} if samples > 0 else {"entries": len(value)}
+        compact[key] = value
+    return compact
+
+
+def _downsample_blob(text: str, samples: int) -> Any:
+    try:
+        parsed = json.loads(text)
+    except ValueError:
+        return text[:MAX_STRING_CHARS] + "..."
+    if isinstance(parsed, dict):
+        keys = sorted(parsed)[-samples:] if samples > 0 else []
+        return {"entries": len(parsed), "last": {key: parsed[key] for key in keys}}
+    if isinstance(parsed, list):
+        return {"entries": len(parsed), "last": parsed[-samples:] if samples > 0 else []}
+    return parsed
+
+
+def _ranking_value(properties: Dict[str, Any]) -> float:
+    for key in RANKING_PROPERTIES:
+        value = properties.get(key)
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            return float(value)
+    return 0.0
+
+
+def _node_name(node: Dict[str, Any]) -> Any:
+    return node.get("id") or node.get("name") or node.get("userName") or node.get("tag")
+
+
+def summarize_neighbourhood(
+    nodes: List[Dict[str, Any]],
+    edges: List[Dict[str, Any]],
+    edge_types: List[str],
+    node_labels: List[List[str]],
+    top_k: int = 5,
+    samples: int = 3
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Summarize the neighbourhood per node label and per relationship type: counts, totals of the
+    additive numeric edge properties and the top-k edges / example nodes.
+    `edges[i]` connects the wallet to `nodes[i]`, with type `edge_types[i]` and labels `node_labels[i]`.
+    """
+    by_label: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+    by_type: Dict[str, List[tuple]] = defaultdict(list)
+    seen_nodes = set()
+    for node, edge, edge_type, labels in zip(nodes, edges, edge_types, node_labels):
+        label = labels[0] if labels else "Node"
+        name = _node_name(node)
+        if (label, name) not in seen_nodes:
+            seen_nodes.add((label, name))
+            by_label[label].append(node)
+        by_type[edge_type].append((edge, name))
+
+    node_summary = {
+        label: {
+            "count": len(members),
+            "examples": [compact_properties(node, samples) for node in members[:top_k]]
+        }
+        for label, members in by_label.items()
+    }
+
+    edge_summary = {}
+    for edge_type, members in by_type.items():
+        totals: Dict[str, float] = defaultdict(float)
+        for edge, _ in members:
+            for key, value in edge.items():
+                if key in NON_ADDITIVE_PROPERTIES or key in IGNORED_PROPERTIES:
+                    continue
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    totals[key] += value
+        top = sorted(members, key=lambda member: _ranking_value(member[0]), reverse=True)[:top_k]
+        edge_summary[edge_type] = {
+            "count": len(members),
+            "totals": {key: round(value, 6) for key, value in totals.items()},
+            "top": [dict(compact_properties(edge, samples), neighbor=name) for edge, name in top]
+        }
+
+    return {"nodes": node_summary, "edges": edge_summary}
+
+
+def build_explain_context(
+    info: Any,
+    nodes: List[Dict[str, Any]],
+    edges: List[Dict[str, Any]],
+    edge_types: List[str],
+    node_labels: List[List[str]],
+    token_budget: int,
+    top_k: int = 5,
+    samples: int = 3
+) -> Dict[str, Any]:
+    """
+    Prompt-ready {"info", "nodes", "edges"} strings that fit in `token_budget` tokens together.
+    Examples and log samples are halved until the context fits; as a last resort it is cut.
+    """
+    info_properties = dict(info) if not isinstance(info, str) else None
+    while True:
+        summary = summarize_neighbourhood(nodes, edges, edge_types, node_labels, top_k, samples)
+        context = {
+            "info": _dumps(compact_properties(info_properties, samples)) if info_properties is not None else info,
+            "nodes": _dumps(summary["nodes"]),
+            "edges": _dumps(summary["edges"])
+        }
+        tokens = sum(count_tokens(text) for text in context.values())
+        if tokens <= token_budget or (top_k == 0 and samples == 0):
+            break
+        top_k, samples = top_k // 2, samples // 2
+
+    if tokens > token_budget:
+        # Counts and totals alone are still too large, keep the same share of every field
+        ratio = token_budget / tokens
+        context = {key: text[:int(len(text) * ratio)] for key, text in context.items()}
+        tokens = sum(count_tokens(text) for text in context.values())
+    context["tokens"] = tokens
+    return context
+
+
+def _dumps(value: Any) -> str:
+    return json.dumps(value, ensure_ascii=False, default=str, separators=(",", ":"))
@@ -1,5 +1,6 @@
 from pydantic_settings import BaseSettings
 from typing import Optional
+from neo4j import AsyncGraphDatabase, AsyncDriver
 
 # LangChain chat model imports
 from langchain_community.chat_models import ChatOpenAI, ChatGooglePalm
@@ -22,6 +23,27 @@ class Settings(BaseSettings):
     NEO4J_URI: str
     NEO4J_USERNAME: str
     NEO4J_PASSWORD: str
+    # Neo4j driver pool, shared by every request of the service
+    NEO4J_MAX_CONNECTION_POOL_SIZE: int = 50
+    NEO4J_CONNECTION_ACQUISITION_TIMEOUT: float = 60.0
+    NEO4J_CONNECTION_TIMEOUT: float = 30.0
+    NEO4J_MAX_CONNECTION_LIFETIME: float = 3600.0
+
+    # Wallet context sent to the explain prompt: neighbours kept per relationship type, and in total
+    EXPLAIN_NEIGHBORS_PER_TYPE: int = 25
+    EXPLAIN_NEIGHBOR_LIMIT: int = 200
+    # Token budget of the summarized wallet / nodes / edges context, and examples kept per type
+    EXPLAIN_CONTEXT_TOKEN_BUDGET: int = 3000
+    EXPLAIN_CONTEXT_TOP_K: int = 5
+
+    # Explanation cache: in-process LRU, plus Redis when REDIS_URL is set
+    EXPLAIN_CACHE_MAX_ENTRIES: int = 1024
+    EXPLAIN_CACHE_TTL_SECONDS: float = 3600.0
+    REDIS_URL: Optional[str] = None
+
+    # /credit_score_explain/batch: default wallets explained concurrently, and wallets per request
+    EXPLAIN_BATCH_CONCURRENCY: int = 8
+    EXPLAIN_BATCH_MAX_WALLETS: int = 100
 
     class Config:
         env_file = ".env"
@@ -59,3 +81,18 @@ def get_llm_model():
         )
 
     raise ValueError(f"Unsupported LLM_PROVIDER: {settings.LLM_PROVIDER}")
+
+
+def get_async_neo4j_driver() -> AsyncDriver:
+    """
+    Returns an async Neo4j driver using the configured connection pool settings.
+    The caller owns the driver and must close it.
+    """
+    return AsyncGraphDatabase.driver(
+        settings.NEO4J_URI,
+        auth=(settings.NEO4J_USERNAME, settings.NEO4J_PASSWORD),
+        max_connection_pool_size=settings.NEO4J_MAX_CONNECTION_POOL_SIZE,
+        connection_acquisition_timeout=settings.NEO4J_CONNECTION_ACQUISITION_TIMEOUT,
+        connection_timeout=settings.NEO4J_CONNECTION_TIMEOUT,
+        max_connection_lifetime=settings.NEO4J_MAX_CONNECTION_LIFETIME
+    )
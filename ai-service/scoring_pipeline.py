@@ -0,0 +1,335 @@
+"""
+Offline credit scoring pipeline (the baai-kg notebook as a CPU batch job).
+
+Stages, each cached under --work-dir and skipped when its inputs and parameters are unchanged:
+    load     wallet features + liquidation edges -> aligned arrays
+    embed    GAE node embeddings (+ graph-level features used for clustering)
+    cluster  communities (mini-batch k-means, or the notebook's spectral sweep), k chosen by silhouette
+    score    model artifacts served by credit_score_engine / /predict
+    write    credit_score of changed wallets back to Neo4j, in chunks
+
+    python scoring_pipeline.py --features wallet_features.csv --edges liquidated_edges.csv
+"""
+import argparse
+import hashlib
+import json
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from community_detection import sweep_minibatch_kmeans
+from credit_score_engine import FEATURE_WEIGHTS, DEFAULT_ARTIFACTS_PATH, CreditScoreEngine, build_artifacts, save_artifacts
+
+STAGES = ("load", "embed", "cluster", "score", "write")
+
+WRITE_SCORES_QUERY = """
+UNWIND $rows AS row
+MATCH (w:Wallet {id: row.wallet})
+SET w.credit_score = row.credit_score
+"""
+
+
+def file_digest(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def arrays_digest(path):
+    """Digest of the arrays of an .npz file (the zip container itself embeds timestamps)"""
+    digest = hashlib.sha256()
+    with np.load(path, allow_pickle=False) as arrays:
+        for key in sorted(arrays.files):
+            value = arrays[key]
+            digest.update(key.encode("utf-8"))
+            digest.update(str(value.dtype).encode("utf-8"))
+            digest.update(str(value.shape).encode("utf-8"))
+            digest.update(np.ascontiguousarray(value).tobytes())
+    return digest.hexdigest()
+
+
+def read_table(path):
+    return pd.read_parquet(path) if path.endswith(".parquet") else pd.read_csv(path)
+
+
+class ScoringPipeline:
+    def __init__(self, work_dir, features_path, edges_path, artifacts_path=DEFAULT_ARTIFACTS_PATH,
+                 epochs=2000, hidden_channels=16, lr=0.005, k_min=2, k_max=39,
+                 cluster_method="minibatch", silhouette_sample_size=10000,
+                 betweenness_samples=500, seed=42, write_chunk_size=5000, force=()):
+        self.work_dir = work_dir
+        self.features_path = features_path
+        self.edges_path = edges_path
+        self.artifacts_path = artifacts_path
+        self.epochs = epochs
+        self.hidden_channels = hidden_channels
+        self.lr = lr
+        self.k_min = k_min
+        self.k_max = k_max
+        self.cluster_method = cluster_method
+        self.silhouette_sample_size = silhouette_sample_size
+        self.betweenness_samples = betweenness_samples
+        self.seed = seed
+        self.write_chunk_size = write_chunk_size
+        self.force = set(force)
+        self.manifest_path = os.path.join(work_dir, "manifest.json")
+        os.makedirs(work_dir, exist_ok=True)
+        self.manifest = self._load_manifest()
+
+    def path(self, stage):
+        if stage == "score":
+            return self.artifacts_path
+        return os.path.join(self.work_dir, f"{stage}.npz")
+
+    def run(self, stages=STAGES, driver=None):
+        for stage in stages:
+            inputs = self._stage_inputs(stage)
+            fingerprint = hashlib.sha256(json.dumps(inputs, sort_keys=True).encode("utf-8")).hexdigest()
+            cached = self.manifest.get(stage) == fingerprint and os.path.exists(self.path(stage))
+            if cached and stage not in self.force:
+                print(f"[{stage}] up to date, skipped")
+                continue
+
+            start = time.time()
+            if stage == "write":
+                self.write(driver)
+            else:
+                getattr(self, stage)()
+            self.manifest[stage] = fingerprint
+            self._save_manifest()
+            print(f"[{stage}] done in {time.time() - start:.1f}s")
+
+    def _stage_inputs(self, stage):
+        """What a stage depends on: its parameters and the content of its inputs"""
+        if stage == "load":
+            return {"features": file_digest(self.features_path), "edges": file_digest(self.edges_path)}
+        if stage == "embed":
+            return {"load": arrays_digest(self.path("load")), "epochs": self.epochs,
+                    "hidden_channels": self.hidden_channels, "lr": self.lr,
+                    "betweenness_samples": self.betweenness_samples, "seed": self.seed}
+        if stage == "cluster":
+            return {"embed": arrays_digest(self.path("embed")), "k_min": self.k_min,
+                    "k_max": self.k_max, "seed": self.seed, "method": self.cluster_method,
+                    "silhouette_sample_size": self.silhouette_sample_size}
+        if stage == "score":
+            return {"load": arrays_digest(self.path("load")), "embed": arrays_digest(self.path("embed")),
+                    "cluster": arrays_digest(self.path("cluster")), "weights": FEATURE_WEIGHTS}
+        if stage == "write":
+            return {"score": arrays_digest(self.path("score"))}
+        raise ValueError(f"Unknown stage: {stage}")
+
+    # ── stages ────────────────────────────────────────────────────────────────
+    def load(self):
+        edges = read_table(self.edges_path)
+        features_df = read_table(self.features_path).set_index("id")
+
+        # Union of the wallets with features and the wallets in edges, missing features = 0
+        wallets_in_edges = pd.Index(pd.concat([edges["source"], edges["target"]]).unique())
+        all_wallets = features_df.index.union(wallets_in_edges)
+        features_df = features_df.reindex(all_wallets).fillna(0)
+        feature_names = [name for name in FEATURE_WEIGHTS if name in features_df.columns]
+
+        row_of = pd.Series(np.arange(len(all_wallets)), index=all_wallets)
+        np.savez(
+            self.path("load"),
+            wallet_ids=np.asarray(all_wallets, dtype=str),
+            feature_names=np.asarray(feature_names, dtype=str),
+            features=features_df[feature_names].to_numpy(dtype=np.float64),
+            edge_src=row_of[edges["source"]].to_numpy(dtype=np.int64),
+            edge_dst=row_of[edges["target"]].to_numpy(dtype=np.int64),
+            edge_weight=edges["weight"].to_numpy(dtype=np.float32),
+        )
+        print(f"[load] {len(all_wallets)} wallets, {len(edges)} edges")
+
+    def embed(self):
+        import torch
+        from torch_geometric.nn import GAE, GCNConv
+        from sklearn.preprocessing import StandardScaler
+
+        with np.load(self.path("load"), allow_pickle=False) as data:
+            features, src, dst, weight = data["features"], data["edge_src"], data["edge_dst"], data["edge_weight"]
+
+        torch.manual_seed(self.seed)
+        x = torch.tensor(StandardScaler().fit_transform(features), dtype=torch.float)
+        # Undirected
+        edge_index = torch.tensor(np.vstack([np.concatenate([src, dst]), np.concatenate([dst, src])]), dtype=torch.long)
+        edge_weight = torch.tensor(np.concatenate([weight, weight]), dtype=torch.float)
+
+        class GCNEncoder(torch.nn.Module):
+            def __init__(self, in_channels, out_channels):
+                super().__init__()
+                self.conv1 = GCNConv(in_channels, 128)
+                self.conv2 = GCNConv(128, out_channels)
+
+            def forward(self, x, edge_index, edge_weight=None):
+                x = self.conv1(x, edge_index, edge_weight=edge_weight).relu()
+                return self.conv2(x, edge_index, edge_weight=edge_weight)
+
+        model = GAE(GCNEncoder(x.shape[1], self.hidden_channels))
+        optimizer = torch.optim.Adam(model.parameters(), lr=self.lr)
+        model.train()
+        for epoch in range(1, self.epochs + 1):
+            optimizer.zero_grad()
+            z = model.encode(x, edge_index, edge_weight)
+            loss = model.recon_loss(z, edge_index)
+            loss.backward()
+            optimizer.step()
+            if epoch % 100 == 0 or epoch == 1:
+                print(f"[embed] epoch {epoch:04d}, loss {loss.item():.4f}")
+
+        model.eval()
+        with torch.no_grad():
+            z = model.encode(x, edge_index, edge_weight).cpu().numpy()
+
+        graph_features = self._graph_features(len(features), src, dst, weight)
+        np.savez(self.path("embed"), embeddings=z, combined=np.hstack([z, graph_features]))
+
+    def _graph_features(self, num_wallets, src, dst, weight):
+        """Standardized pagerank, degrees and betweenness of the weighted liquidation graph"""
+        import networkx as nx
+        from sklearn.preprocessing import StandardScaler
+
+        graph = nx.DiGraph()
+        graph.add_nodes_from(range(num_wallets))
+        graph.add_weighted_edges_from(zip(src.tolist(), dst.tolist(), weight.tolist()))
+        # Sampled betweenness keeps this stage linear-ish on large graphs, 0 = exact
+        samples = self.betweenness_samples if 0 < self.betweenness_samples < num_wallets else None
+        metrics = [
+            nx.pagerank(graph, weight="weight"),
+            dict(graph.degree(weight="weight")),
+            dict(graph.in_degree(weight="weight")),
+            dict(graph.out_degree(weight="weight")),
+            nx.betweenness_centrality(graph, k=samples, weight="weight", seed=self.seed),
+        ]
+        values = np.array([[metric.get(node, 0.0) for metric in metrics] for node in range(num_wallets)])
+        return np.nan_to_num(StandardScaler().fit_transform(values))
+
+    def cluster(self):
+        with np.load(self.path("embed"), allow_pickle=False) as data:
+            combined = data["combined"]
+
+        if self.cluster_method == "spectral":
+            best_k, best_score, best_labels = self._spectral_sweep(combined)
+        else:
+            best_k, best_score, best_labels = sweep_minibatch_kmeans(
+                combined, self.k_min, self.k_max, sample_size=self.silhouette_sample_size, seed=self.seed
+            )
+        print(f"[cluster] best k={best_k} with silhouette {best_score:.4f}")
+        np.savez(self.path("cluster"), labels=best_labels, k=np.array(best_k), silhouette=np.array(best_score))
+
+    def _spectral_sweep(self, combined):
+        """The notebook's exact sweep, quadratic in the number of wallets: only for small graphs"""
+        from sklearn.cluster import SpectralClustering
+        from sklearn.metrics import silhouette_score
+
+        best_k, best_score, best_labels = None, -1.0, None
+        for k in range(self.k_min, min(self.k_max, len(combined) - 1) + 1):
+            spec = SpectralClustering(n_clusters=k, affinity="nearest_neighbors", assign_labels="kmeans",
+                                      random_state=self.seed)
+            labels = spec.fit_predict(combined)
+            score = silhouette_score(combined, labels)
+            print(f"[cluster] k={k}, silhouette={score:.4f}")
+            if score > best_score:
+                best_k, best_score, best_labels = k, score, labels
+        return best_k, best_score, best_labels
+
+    def score(self):
+        with np.load(self.path("load"), allow_pickle=False) as data:
+            wallet_ids, feature_names, features = data["wallet_ids"], data["feature_names"], data["features"]
+        with np.load(self.path("embed"), allow_pickle=False) as data:
+            embeddings = data["embeddings"]
+        with np.load(self.path("cluster"), allow_pickle=False) as data:
+            labels = data["labels"]
+
+        artifacts = build_artifacts(wallet_ids, features, embeddings, labels, feature_names=feature_names.tolist())
+        save_artifacts(self.artifacts_path, artifacts)
+        print(f"[score] artifacts for {len(wallet_ids)} wallets written to {self.artifacts_path}")
+
+    def write(self, driver):
+        """Write credit_score of the wallets whose score changed since the last successful write"""
+        if driver is None:
+            raise ValueError("The write stage needs a Neo4j driver")
+        engine = CreditScoreEngine.load(self.artifacts_path)
+        wallet_ids, scores = engine.wallet_ids, engine.scores
+
+        written_path = os.path.join(self.work_dir, "written.npz")
+        changed = np.ones(len(wallet_ids), dtype=bool)
+        if os.path.exists(written_path):
+            with np.load(written_path, allow_pickle=False) as previous:
+                previous_scores = pd.Series(previous["scores"], index=previous["wallet_ids"])
+            before = previous_scores.reindex(wallet_ids).to_numpy()
+            changed = np.isnan(before) | ~np.isclose(before, scores, rtol=0.0, atol=1e-6)
+
+        rows = [{"wallet": wallet, "credit_score": float(score)}
+                for wallet, score in zip(wallet_ids[changed], scores[changed])]
+        with driver.session() as session:
+            for start in range(0, len(rows), self.write_chunk_size):
+                chunk = rows[start:start + self.write_chunk_size]
+                session.execute_write(lambda tx: tx.run(WRITE_SCORES_QUERY, rows=chunk).consume())
+                print(f"[write] {start + len(chunk)}/{len(rows)} scores written")
+        np.savez(written_path, wallet_ids=wallet_ids, scores=scores)
+        print(f"[write] {len(rows)} of {len(wallet_ids)} wallets changed")
+
+    # ── manifest ──────────────────────────────────────────────────────────────
+    def _load_manifest(self):
+        if not os.path.exists(self.manifest_path):
+            return {}
+        with open(self.manifest_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def _save_manifest(self):
+        tmp_path = f"{self.manifest_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.manifest, f, indent=2)
+        os.replace(tmp_path, self.manifest_path)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Offline credit scoring pipeline")
+    parser.add_argument("--features", default="wallet_features.csv")
+    parser.add_argument("--edges", default="liquidated_edges.csv")
+    parser.add_argument("--work-dir", default=".scoring")
+    parser.add_argument("--artifacts", default=DEFAULT_ARTIFACTS_PATH)
+    parser.add_argument("--stages", default=",".join(STAGES),
+                        help=f"comma separated subset of {','.join(STAGES)}")
+    parser.add_argument("--force", default="", help="comma separated stages to rerun even when up to date")
+    parser.add_argument("--epochs", type=int, default=2000)
+    parser.add_argument("--hidden-channels", type=int, default=16)
+    parser.add_argument("--lr", type=float, default=0.005)
+    parser.add_argument("--k-min", type=int, default=2)
+    parser.add_argument("--k-max", type=int, default=39)
+    parser.add_argument("--cluster-method", choices=("minibatch", "spectral"), default="minibatch")
+    parser.add_argument("--silhouette-sample-size", type=int, default=10000)
+    parser.add_argument("--betweenness-samples", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--write-chunk-size", type=int, default=5000)
+    args = parser.parse_args()
+
+    stages = [stage for stage in args.stages.split(",") if stage]
+    unknown = set(stages) - set(STAGES)
+    if unknown:
+        parser.error(f"unknown stages: {', '.join(sorted(unknown))}")
+
+    pipeline = ScoringPipeline(
+        args.work_dir, args.features, args.edges, artifacts_path=args.artifacts,
+        epochs=args.epochs, hidden_channels=args.hidden_channels, lr=args.lr,
+        k_min=args.k_min, k_max=args.k_max, cluster_method=args.cluster_method,
+        silhouette_sample_size=args.silhouette_sample_size, betweenness_samples=args.betweenness_samples,
+        seed=args.seed, write_chunk_size=args.write_chunk_size,
+        force=[stage for stage in args.force.split(",") if stage],
+    )
+
+    driver = None
+    if "write" in stages:
+        from neo4j import GraphDatabase
+        from llm_config import settings
+        driver = GraphDatabase.driver(settings.NEO4J_URI, auth=(settings.NEO4J_USERNAME, settings.NEO4J_PASSWORD))
+    try:
+        pipeline.run(stages, driver=driver)
+    finally:
+        if driver is not None:
+            driver.close()
@@ -1,4 +1,122 @@
 from neo4j import GraphDatabase
+import argparse
+import json
+import os
+
+WATERMARK_FILE = "wallet_features_watermark.json"
+# Rows per streamed CSV chunk / Parquet row group
+EXPORT_CHUNK_ROWS = 50000
+
+# Exported columns, in file order, with their types
+FEATURE_COLUMNS = [
+    ("id", "string"),
+    ("num_deposit", "int"),
+    ("total_deposit", "float"),
+    ("num_borrow", "int"),
+    ("total_borrow", "float"),
+    ("num_repay", "int"),
+    ("total_repay", "float"),
+    ("num_withdraw", "int"),
+    ("total_withdraw", "float"),
+    ("num_liquidated", "int"),
+    ("total_liquidated", "float"),
+    ("num_liquidating", "int"),
+    ("total_liquidating", "float"),
+    ("num_contracts", "int"),
+    ("num_projects", "int"),
+    ("num_tweets", "int"),
+    ("avg_likes", "float"),
+    ("avg_retweets", "float"),
+    ("num_hashtags", "int"),
+]
+
+ALL_WALLETS_QUERY = """
+MATCH (w:Wallet)
+"""
+
+# Wallets stamped by the graph builder after the watermark, plus wallets reaching a changed Project
+INCREMENTAL_WALLETS_QUERY = """
+CALL {
+    MATCH (w:Wallet)
+    WHERE w.graphUpdatedAt > $since
+    RETURN w
+    UNION
+    MATCH (p:Project)
+    WHERE p.graphUpdatedAt > $since
+    MATCH (w:Wallet)-[:DEPOSITED|BORROWED|REPAID|WITHDREW]->(:Contract)-[:PART_OF]->(p)
+    RETURN w
+}
+WITH DISTINCT w
+"""
+
+# Every feature of one wallet, committed every {batch_size} wallets
+WALLET_FEATURES_SUBQUERY = """
+CALL {{
+    WITH w
+    CALL {{
+        WITH w
+        OPTIONAL MATCH (w)-[r:DEPOSITED]->()
+        RETURN count(r) AS num_deposit, sum(r.amount) AS total_deposit
+    }}
+    CALL {{
+        WITH w
+        OPTIONAL MATCH (w)-[r:BORROWED]->()
+        RETURN count(r) AS num_borrow, sum(r.amount) AS total_borrow
+    }}
+    CALL {{
+        WITH w
+        OPTIONAL MATCH (w)-[r:REPAID]->()
+        RETURN count(r) AS num_repay, sum(r.amount) AS total_repay
+    }}
+    CALL {{
+        WITH w
+        OPTIONAL MATCH (w)-[r:WITHDREW]->()
+        RETURN count(r) AS num_withdraw, sum(r.amount) AS total_withdraw
+    }}
+    CALL {{
+        WITH w
+        OPTIONAL MATCH (w)<-[r:LIQUIDATED_BY]-()
+        RETURN count(r) AS num_liquidated, sum(r.amount) AS total_liquidated
+    }}
+    CALL {{
+        WITH w
+        OPTIONAL MATCH (w)-[r:LIQUIDATED_BY]->()
+        RETURN count(r) AS num_liquidating, sum(r.amount) AS total_liquidating
+    }}
+    CALL {{
+        WITH w
+        OPTIONAL MATCH (w)-[:DEPOSITED|BORROWED|REPAID|WITHDREW]->(c:Contract)
+        RETURN count(DISTINCT c) AS num_contracts
+    }}
+    CALL {{
+        WITH w
+        OPTIONAL MATCH (w)-[:DEPOSITED|BORROWED|REPAID|WITHDREW]->(:Contract)-[:PART_OF]->(p:Project)
+        RETURN count(DISTINCT p) AS num_projects
+    }}
+    CALL {{
+        WITH w
+        OPTIONAL MATCH (w)-[:DEPOSITED|BORROWED|REPAID|WITHDREW]->(:Contract)-[:PART_OF]->(:Project)-[:HAS_ACCOUNT]->(:TweetUser)-[:TWEETED]->(t:Tweet)
+        RETURN count(t) AS num_tweets, avg(t.likes) AS avg_likes, avg(t.retweetCounts) AS avg_retweets
+    }}
+    CALL {{
+        WITH w
+        OPTIONAL MATCH (w)-[:DEPOSITED|BORROWED|REPAID|WITHDREW]->(:Contract)-[:PART_OF]->(:Project)-[:HAS_ACCOUNT]->(:TweetUser)-[:TWEETED]->(:Tweet)-[:MENTIONS]->(h:Hashtag)
+        RETURN count(DISTINCT h) AS num_hashtags
+    }}
+    SET w.num_deposit = num_deposit, w.total_deposit = total_deposit,
+        w.num_borrow = num_borrow, w.total_borrow = total_borrow,
+        w.num_repay = num_repay, w.total_repay = total_repay,
+        w.num_withdraw = num_withdraw, w.total_withdraw = total_withdraw,
+        w.num_liquidated = num_liquidated, w.total_liquidated = total_liquidated,
+        w.num_liquidating = num_liquidating, w.total_liquidating = total_liquidating,
+        w.num_contracts = num_contracts,
+        w.num_projects = num_projects,
+        w.num_tweets = num_tweets, w.avg_likes = avg_likes, w.avg_retweets = avg_retweets,
+        w.num_hashtags = num_hashtags
+}} IN TRANSACTIONS OF {batch_size} ROWS
+"""
+
+
 class WalletFeatureExporter:
     def __init__(self):
         from llm_config import settings
@@ -10,128 +128,165 @@ class WalletFeatureExporter:
     def close(self):
         self.driver.close()
 
-    def update_wallet_features(self):
-        queries = [
-            # DEPOSIT
-            """
-            MATCH (w:Wallet)-[r:DEPOSITED]->()
-            WITH w, count(r) AS num_deposit, sum(r.amount) AS total_deposit
-            SET w.num_deposit = num_deposit, w.total_deposit = total_deposit
-            """,
-            # BORROW
-            """
-            MATCH (w:Wallet)-[r:BORROWED]->()
-            WITH w, count(r) AS num_borrow, sum(r.amount) AS total_borrow
-            SET w.num_borrow = num_borrow, w.total_borrow = total_borrow
-            """,
-            # REPAID
-            """
-            MATCH (w:Wallet)-[r:REPAID]->()
-            WITH w, count(r) AS num_repay, sum(r.amount) AS total_repay
-            SET w.num_repay = num_repay, w.total_repay = total_repay
-            """,
-            # WITHDRAW
-            """
-            MATCH (w:Wallet)-[r:WITHDREW]->()
-            WITH w, count(r) AS num_withdraw, sum(r.amount) AS total_withdraw
-            SET w.num_withdraw = num_withdraw, w.total_withdraw = total_withdraw
-            """,
-            # # TRANSFERS (outgoing and incoming)
-            # """
-            # MATCH (w:Wallet)-[r:TRANSFERRED_TO]->()
-            # WITH w, count(r) AS num_outgoing, sum(r.value) AS total_outgoing
-            # SET w.num_outgoing = num_outgoing, w.total_outgoing = total_outgoing
-            # """,
-            # """
-            # MATCH ()-[r:TRANSFERRED_TO]->(w:Wallet)
-            # WITH w, count(r) AS num_incoming, sum(r.value) AS total_incoming
-            # SET w.num_incoming = num_incoming, w.total_incoming = total_incoming
-            # """,
-            # LIQUIDATIONS
-            """
-            MATCH (w:Wallet)<-[r:LIQUIDATED_BY]-()
-            WITH w, count(r) AS num_liquidated, sum(r.amount) AS total_liquidated
-            SET w.num_liquidated = num_liquidated, w.total_liquidated = total_liquidated
-            """,
-            """
-            MATCH (w:Wallet)-[r:LIQUIDATED_BY]->()
-            WITH w, count(r) AS num_liquidating, sum(r.amount) AS total_liquidating
-            SET w.num_liquidating = num_liquidating, w.total_liquidating = total_liquidating
-            """,
-            # CONTRACTS and PROJECTS
-            """
-            MATCH (w:Wallet)-[:DEPOSITED|BORROWED|REPAID|WITHDREW]->(c:Contract)
-            WITH w, count(DISTINCT c) AS num_contracts
-            SET w.num_contracts = num_contracts
-            """,
-            """
-            MATCH (w:Wallet)-[:DEPOSITED|BORROWED|REPAID|WITHDREW]->(:Contract)-[:PART_OF]->(p:Project)
-            WITH w, count(DISTINCT p) AS num_projects
-            SET w.num_projects = num_projects
-            """,
-            # TWEET METRICS
-            """
-            MATCH (w:Wallet)-[:DEPOSITED|BORROWED|REPAID|WITHDREW]->(:Contract)-[:PART_OF]->(:Project)-[:HAS_ACCOUNT]->(:TweetUser)-[:TWEETED]->(t:Tweet)
-            WITH w, count(t) AS num_tweets, avg(t.likes) AS avg_likes, avg(t.retweetCounts) AS avg_retweets
-            SET w.num_tweets = num_tweets, w.avg_likes = avg_likes, w.avg_retweets = avg_retweets
-            """,
-            # HASHTAG METRICS
-            """
-            MATCH (w:Wallet)-[:DEPOSITED|BORROWED|REPAID|WITHDREW]->(:Contract)-[:PART_OF]->(:Project)-[:HAS_ACCOUNT]->(:TweetUser)-[:TWEETED]->(:Tweet)-[:MENTIONS]->(h:Hashtag)
-            WITH w, count(DISTINCT h) AS num_hashtags
-            SET w.num_hashtags = num_hashtags
-            """
-        ]
+    def update_wallet_features(self, incremental=False, since=None, batch_size=1000,
+                               watermark_file=WATERMARK_FILE):
+        """
+        Recompute the wallet features in batches of `batch_size` wallets per transaction.
 
+        Full mode recomputes every Wallet. Incremental mode only recomputes wallets whose edges
+        changed after the watermark (`since`, or the one stored in `watermark_file` by the last
+        run), i.e. wallets or their projects stamped with a newer graphUpdatedAt by the backend
+        graph builder. The watermark is advanced once the refresh has finished.
+        """
         with self.driver.session() as session:
-            for query in queries:
-                session.run(query)
-                print("Executed:", query.strip().splitlines()[0])
+            # Neo4j clock, so the watermark is comparable with graphUpdatedAt = timestamp()
+            run_started_at = session.run("RETURN timestamp() AS now").single()["now"]
+
+            if incremental:
+                if since is None:
+                    since = self._load_watermark(watermark_file)
+                query = INCREMENTAL_WALLETS_QUERY + WALLET_FEATURES_SUBQUERY.format(batch_size=int(batch_size))
+                params = {"since": since}
+                print(f"Incremental wallet feature refresh since {since}")
+            else:
+                query = ALL_WALLETS_QUERY + WALLET_FEATURES_SUBQUERY.format(batch_size=int(batch_size))
+                params = {}
+                print("Full wallet feature refresh")
+
+            # CALL { } IN TRANSACTIONS needs an auto-commit transaction, i.e. session.run
+            summary = session.run(query, params).consume()
+            print(f"Updated features: {summary.counters.properties_set} properties set")
+
+        self._save_watermark(watermark_file, run_started_at)
+        return run_started_at
+
+    @staticmethod
+    def _load_watermark(watermark_file):
+        if not os.path.exists(watermark_file):
+            return 0
+        with open(watermark_file, "r", encoding="utf-8") as f:
+            return json.load(f).get("since", 0)
+
+    @staticmethod
+    def _save_watermark(watermark_file, since):
+        tmp_file = f"{watermark_file}.tmp"
+        with open(tmp_file, "w", encoding="utf-8") as f:
+            json.dump({"since": since}, f)
+        os.replace(tmp_file, watermark_file)
+
+    def export_to_csv(self, filename="wallet_features.csv", wallet_ids=None, chunk_rows=EXPORT_CHUNK_ROWS):
+        """
+        Stream the wallet features to `filename` through apoc.export.csv.query.
 
-    def export_to_csv(self, filename="wallet_features.csv"):
+        APOC yields the CSV in chunks of `chunk_rows` rows and each chunk is written as soon as it
+        arrives, so memory stays flat regardless of the number of wallets. `wallet_ids` limits the
+        export to those wallets.
+        """
         export_query = """
         CALL apoc.export.csv.query(
-        "MATCH (w:Wallet)
-        RETURN 
-            w.id AS id,
-            coalesce(w.num_deposit, 0) AS num_deposit,
-            coalesce(w.total_deposit, 0.0) AS total_deposit,
-            coalesce(w.num_borrow, 0) AS num_borrow,
-            coalesce(w.total_borrow, 0.0) AS total_borrow,
-            coalesce(w.num_repay, 0) AS num_repay,
-            coalesce(w.total_repay, 0.0) AS total_repay,
-            coalesce(w.num_withdraw, 0) AS num_withdraw,
-            coalesce(w.total_withdraw, 0.0) AS total_withdraw,
-            coalesce(w.num_liquidated, 0) AS num_liquidated,
-            coalesce(w.total_liquidated, 0.0) AS total_liquidated,
-            coalesce(w.num_liquidating, 0) AS num_liquidating,
-            coalesce(w.total_liquidating, 0.0) AS total_liquidating,
-            coalesce(w.num_contracts, 0) AS num_contracts,
-            coalesce(w.num_projects, 0) AS num_projects,
-            coalesce(w.num_tweets, 0) AS num_tweets,
-            coalesce(w.avg_likes, 0.0) AS avg_likes,
-            coalesce(w.avg_retweets, 0.0) AS avg_retweets,
-            coalesce(w.num_hashtags, 0) AS num_hashtags",
-        null,
-        {stream:true}
+            $query,
+            null,
+            {stream: true, batchSize: $chunk_rows, params: {wallet_ids: $wallet_ids}}
         )
         YIELD data
         RETURN data
         """
+        params = {
+            "query": _feature_query(wallet_ids),
+            "chunk_rows": int(chunk_rows),
+            "wallet_ids": list(wallet_ids) if wallet_ids is not None else None
+        }
 
-        with self.driver.session() as session:
-            result = session.run(export_query)
-            csv_data = ""
+        tmp_file = f"{filename}.tmp"
+        with self.driver.session() as session, open(tmp_file, "w", encoding="utf-8", newline="") as f:
+            result = session.run(export_query, params)
+            for record in result:
+                f.write(record["data"])
+        os.replace(tmp_file, filename)
+        print(f"Exported to {filename}")
+
+    def export_to_parquet(self, filename="wallet_features.parquet", wallet_ids=None, chunk_rows=EXPORT_CHUNK_ROWS):
+        """
+        Stream the wallet features to a Parquet file with typed columns (requires pyarrow).
+
+        Records are pulled with fetch_size = `chunk_rows` and written as one row group per chunk.
+        """
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise ImportError("Parquet export requires pyarrow: pip install pyarrow") from e
+
+        arrow_types = {"string": pa.string(), "int": pa.int64(), "float": pa.float64()}
+        schema = pa.schema([(name, arrow_types[kind]) for name, kind in FEATURE_COLUMNS])
+        names = [name for name, _ in FEATURE_COLUMNS]
+
+        def write_chunk(writer, rows):
+            columns = list(zip(*rows))
+            writer.write_batch(pa.RecordBatch.from_arrays(
+                [pa.array(column, type=field.type) for column, field in zip(columns, schema)],
+                schema=schema
+            ))
+
+        tmp_file = f"{filename}.tmp"
+        exported = 0
+        with self.driver.session(fetch_size=int(chunk_rows)) as session, pq.ParquetWriter(tmp_file, schema) as writer:
+            params = {"wallet_ids": list(wallet_ids)} if wallet_ids is not None else {}
+            result = session.run(_feature_query(wallet_ids), params)
+            rows = []
             for record in result:
-                csv_data += record["data"]
-            with open(filename, "w", encoding="utf-8") as f:
-                f.write(csv_data)
-            print(f"Exported to {filename}")
+                rows.append(record.values(*names))
+                if len(rows) >= chunk_rows:
+                    write_chunk(writer, rows)
+                    exported += len(rows)
+                    rows = []
+            if rows:
+                write_chunk(writer, rows)
+                exported += len(rows)
+            if exported == 0:
+                writer.write_table(schema.empty_table())
+        os.replace(tmp_file, filename)
+        print(f"Exported {exported} wallets to {filename}")
+
+
+def _feature_query(wallet_ids=None):
+    """Feature projection of every Wallet, or of the ones in $wallet_ids when given"""
+    defaults = {"int": "0", "float": "0.0"}
+    projections = ["w.id AS id"] + [
+        f"coalesce(w.{name}, {defaults[kind]}) AS {name}"
+        for name, kind in FEATURE_COLUMNS if kind != "string"
+    ]
+    match = "MATCH (w:Wallet) WHERE w.id IN $wallet_ids" if wallet_ids is not None else "MATCH (w:Wallet)"
+    return match + "\nRETURN\n    " + ",\n    ".join(projections)
+
+
+def _read_wallet_ids(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip()]
+
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Refresh wallet features in Neo4j and export them to CSV or Parquet")
+    parser.add_argument("--incremental", action="store_true",
+                        help="only recompute wallets changed since the stored watermark")
+    parser.add_argument("--since", type=int, default=None,
+                        help="watermark override (epoch ms) for --incremental")
+    parser.add_argument("--batch-size", type=int, default=1000,
+                        help="wallets per write transaction")
+    parser.add_argument("--output", default="wallet_features.csv",
+                        help="output file, written as Parquet when it ends in .parquet")
+    parser.add_argument("--wallet-ids-file", default=None,
+                        help="only export the wallet ids listed in this file, one per line")
+    args = parser.parse_args()
+    wallet_ids = _read_wallet_ids(args.wallet_ids_file) if args.wallet_ids_file else None
+
     exporter = WalletFeatureExporter()
     try:
-        exporter.update_wallet_features()
-        exporter.export_to_csv("wallet_features.csv")
+        exporter.update_wallet_features(incremental=args.incremental, since=args.since,
+                                        batch_size=args.batch_size)
+        if args.output.endswith(".parquet"):
+            exporter.export_to_parquet(args.output, wallet_ids=wallet_ids)
+        else:
+            exporter.export_to_csv(args.output, wallet_ids=wallet_ids)
     finally:
         exporter.close()
@@ -0,0 +1,108 @@
+from typing import Optional, Dict, Any, List, AsyncIterator, Union, Sequence
+from cassandra.cluster import Session, ResponseFuture
+from cassandra.query import PreparedStatement, SimpleStatement
+import asyncio
+
+
+class _ResponsePager:
+    """Bridge the pages of a cassandra-driver ResponseFuture into asyncio futures
+
+    The driver calls the callbacks registered with add_callbacks from its own I/O thread,
+    once per page, so every page result is handed back to the event loop thread-safely.
+    """
+
+    def __init__(self, response_future: ResponseFuture):
+        self._loop = asyncio.get_running_loop()
+        self._response_future = response_future
+        self._page = self._loop.create_future()
+        response_future.add_callbacks(self._on_page, self._on_error)
+
+    async def current_page(self) -> List[Any]:
+        return await self._page
+
+    def fetch_next_page(self) -> None:
+        # Swap in the next future before asking for the page, the callback may fire immediately
+        self._page = self._loop.create_future()
+        self._response_future.start_fetching_next_page()
+
+    def _on_page(self, rows) -> None:
+        page = self._page
+        self._loop.call_soon_threadsafe(self._resolve, page, list(rows or []), None)
+
+    def _on_error(self, exc: BaseException) -> None:
+        page = self._page
+        self._loop.call_soon_threadsafe(self._resolve, page, None, exc)
+
+    @staticmethod
+    def _resolve(page: asyncio.Future, rows: Optional[List[Any]], exc: Optional[BaseException]) -> None:
+        if page.done():
+            return
+        if exc is not None:
+            page.set_exception(exc)
+        else:
+            page.set_result(rows)
+
+
+class AsyncCassandraSession:
+    """Non-blocking access to a cassandra-driver Session from asyncio code"""
+
+    def __init__(self, session: Session, default_fetch_size: Optional[int] = None):
+        self.session = session
+        self.default_fetch_size = default_fetch_size
+        self._prepared: Dict[str, PreparedStatement] = {}
+        self._prepare_locks: Dict[str, asyncio.Lock] = {}
+
+    async def prepare(self, query: str) -> PreparedStatement:
+        """Prepare a query once per query string; concurrent callers share the same preparation"""
+        prepared = self._prepared.get(query)
+        if prepared is not None:
+            return prepared
+        lock = self._prepare_locks.setdefault(query, asyncio.Lock())
+        async with lock:
+            prepared = self._prepared.get(query)
+            if prepared is None:
+                # Session.prepare has no async variant, keep its round trip off the event loop
+                loop = asyncio.get_running_loop()
+                prepared = await loop.run_in_executor(None, self.session.prepare, query)
+                self._prepared[query] = prepared
+        return prepared
+
+    async def execute(
+        self,
+        query: str,
+        parameters: Optional[Union[Sequence[Any], Dict[str, Any]]] = None,
+        fetch_size: Optional[int] = None,
+        prepared: bool = True
+    ) -> List[Any]:
+        """Run a query and return the rows of every page"""
+        return [row async for row in self.iterate(query, parameters, fetch_size, prepared)]
+
+    async def iterate(
+        self,
+        query: str,
+        parameters: Optional[Union[Sequence[Any], Dict[str, Any]]] = None,
+        fetch_size: Optional[int] = None,
+        prepared: bool = True
+    ) -> AsyncIterator[Any]:
+        """Yield rows page by page, fetching the next page only when the current one is consumed
+
+        Prepared queries use `?` placeholders, unprepared ones (prepared=False) use `%s`.
+        """
+        fetch_size = fetch_size or self.default_fetch_size
+        if prepared:
+            statement = (await self.prepare(query)).bind(parameters or ())
+            if fetch_size:
+                statement.fetch_size = fetch_size
+            response_future = self.session.execute_async(statement)
+        else:
+            statement = SimpleStatement(query, fetch_size=fetch_size) if fetch_size else query
+            response_future = self.session.execute_async(statement, parameters)
+
+        pager = _ResponsePager(response_future)
+        while True:
+            rows = await pager.current_page()
+            for row in rows:
+                yield row
+            if not response_future.has_more_pages:
+                return
+            pager.fetch_next_page()
@@ -5,7 +5,12 @@ import asyncpg
 from neo4j import AsyncGraphDatabase
 from cassandra.cluster import Cluster, ExecutionProfile, EXEC_PROFILE_DEFAULT
 from cassandra.auth import PlainTextAuthProvider
-from cassandra.policies import DCAwareRoundRobinPolicy
+from cassandra.policies import DCAwareRoundRobinPolicy, HostDistance, TokenAwarePolicy
+from src.core.cassandra_async import AsyncCassandraSession
+from src.core import pool_config
+from src.core.pool_metrics import (
+    MongoPoolMonitor, postgres_pool_metrics, neo4j_pool_metrics, cassandra_pool_metrics
+)
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -16,6 +21,8 @@ class DatabaseManager:
         self.neo4j_driver = None
         self.cassandra_cluster = None
         self.cassandra_session = None
+        self.cassandra_async_session = None
+        self.mongodb_pool_monitor = MongoPoolMonitor()
 
     async def connect_all(self):
         """Connect to all available databases"""
@@ -46,7 +53,9 @@ class DatabaseManager:
             if not url:
                 print("⚠️ MongoDB URL not found")
                 return
-            self.mongodb_client = AsyncIOMotorClient(url)
+            self.mongodb_client = AsyncIOMotorClient(
+                url, event_listeners=[self.mongodb_pool_monitor], **pool_config.mongodb_client_options()
+            )
             await self.mongodb_client.admin.command('ping')
             print("✅ MongoDB connected successfully")
         except Exception as e:
@@ -59,8 +68,8 @@ class DatabaseManager:
             if not url:
                 print("⚠️ PostgreSQL URL not found")
                 return
-            self.postgres_pool = await asyncpg.create_pool(url)
-            async with self.postgres_pool.acquire() as conn:
+            self.postgres_pool = await asyncpg.create_pool(url, **pool_config.postgres_pool_options())
+            async with self.postgres_connection() as conn:
                 await conn.fetchval('SELECT 1')
             print("✅ PostgreSQL connected successfully")
         except Exception as e:
@@ -76,7 +85,7 @@ class DatabaseManager:
                 print("⚠️ Neo4j URI not found")
                 return
             self.neo4j_driver = AsyncGraphDatabase.driver(
-                uri, auth=(user, pwd) if user and pwd else None
+                uri, auth=(user, pwd) if user and pwd else None, **pool_config.neo4j_driver_options()
             )
             await self.neo4j_driver.verify_connectivity()
             print("✅ Neo4j connected successfully")
@@ -97,27 +106,41 @@ class DatabaseManager:
                 return
             auth = PlainTextAuthProvider(username=user, password=pwd)
             profile = ExecutionProfile(
-                request_timeout=60*60*24,  # 1 ngày
-                load_balancing_policy=DCAwareRoundRobinPolicy(local_dc=os.getenv("CASSANDRA_DATACENTER", "datacenter-1")),
+                # Per request (one page of a paged scan), not per whole query
+                request_timeout=pool_config.cassandra_request_timeout(),
+                # Token-aware routing sends partition-keyed queries straight to a replica
+                load_balancing_policy=TokenAwarePolicy(
+                    DCAwareRoundRobinPolicy(local_dc=os.getenv("CASSANDRA_DATACENTER", "datacenter-1"))
+                ),
                 # Thêm các option khác nếu cần...
             )
             self.cassandra_cluster = Cluster(
                 contact_points=hosts,
                 port=port,
                 auth_provider=auth,
-                execution_profiles={EXEC_PROFILE_DEFAULT: profile}
+                execution_profiles={EXEC_PROFILE_DEFAULT: profile},
+                **pool_config.cassandra_cluster_options()
             )
+            connections_per_host = pool_config.cassandra_connections_per_host()
+            if connections_per_host:
+                self.cassandra_cluster.set_core_connections_per_host(HostDistance.LOCAL, connections_per_host["core"])
+                self.cassandra_cluster.set_max_connections_per_host(HostDistance.LOCAL, connections_per_host["max"])
             # Connect in executor to avoid blocking event loop
             loop = asyncio.get_event_loop()
             self.cassandra_session = await loop.run_in_executor(
                 None,
                 lambda: self.cassandra_cluster.connect(keyspace)
             )
+            self.cassandra_async_session = AsyncCassandraSession(
+                self.cassandra_session,
+                default_fetch_size=int(os.getenv("CASSANDRA_FETCH_SIZE", 5000))
+            )
             print("✅ Cassandra connected successfully")
         except Exception as e:
             print(f"❌ Cassandra connection failed: {e}")
             self.cassandra_cluster = None
             self.cassandra_session = None
+            self.cassandra_async_session = None
 
     def get_mongodb_database(self, name: str):
         if not self.mongodb_client:
@@ -129,6 +152,10 @@ class DatabaseManager:
             raise Exception("PostgreSQL not connected")
         return self.postgres_pool
 
+    def postgres_connection(self):
+        """`async with` context of a pooled connection, failing after POSTGRES_ACQUIRE_TIMEOUT instead of waiting forever"""
+        return self.get_postgres_pool().acquire(timeout=pool_config.postgres_acquire_timeout())
+
     def get_neo4j_driver(self):
         if not self.neo4j_driver:
             raise Exception("Neo4j not connected")
@@ -139,6 +166,12 @@ class DatabaseManager:
             raise Exception("Cassandra not connected")
         return self.cassandra_session
 
+    def get_cassandra_async_session(self) -> AsyncCassandraSession:
+        """Cassandra session whose queries are awaited instead of blocking the event loop"""
+        if not self.cassandra_async_session:
+            raise Exception("Cassandra not connected")
+        return self.cassandra_async_session
+
     def is_mongodb_connected(self) -> bool:
         return self.mongodb_client is not None
 
@@ -150,3 +183,16 @@ class DatabaseManager:
 
     def is_cassandra_connected(self) -> bool:
         return self.cassandra_session is not None
+
+    def pool_metrics(self) -> dict:
+        """Live pool usage (in use / idle / waiters where the driver exposes them) of the connected stores"""
+        metrics = {}
+        if self.mongodb_client:
+            metrics["mongodb"] = self.mongodb_pool_monitor.metrics()
+        if self.postgres_pool:
+            metrics["postgres"] = postgres_pool_metrics(self.postgres_pool)
+        if self.neo4j_driver:
+            metrics["neo4j"] = neo4j_pool_metrics(self.neo4j_driver)
+        if self.cassandra_session:
+            metrics["cassandra"] = cassandra_pool_metrics(self.cassandra_session)
+        return metrics
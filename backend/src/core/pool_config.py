@@ -0,0 +1,106 @@
+"""
+Connection pool settings of the four stores, from the environment.
+
+Read when DatabaseManager connects (after load_dotenv), so .env values apply. Every store gets a bounded
+pool, a bounded wait for a free connection and a bounded request time, so load degrades into fast
+errors instead of starving the pool or hanging.
+"""
+import os
+from typing import Any, Dict, Optional
+
+
+def _env_int(name: str, default: int) -> int:
+    return int(os.getenv(name, default))
+
+
+def _env_float(name: str, default: float) -> float:
+    return float(os.getenv(name, default))
+
+
+def _env_optional_int(name: str) -> Optional[int]:
+    value = os.getenv(name)
+    return int(value) if value else None
+
+
+def mongodb_client_options() -> Dict[str, Any]:
+    """Keyword options of AsyncIOMotorClient (pymongo URI option names)"""
+    options = {
+        "maxPoolSize": _env_int("MONGODB_MAX_POOL_SIZE", 100),
+        "minPoolSize": _env_int("MONGODB_MIN_POOL_SIZE", 0),
+        # Idle connections are closed after this, so the pool shrinks back after a burst
+        "maxIdleTimeMS": _env_int("MONGODB_MAX_IDLE_TIME_MS", 300_000),
+        # Wait for a free connection, pymongo waits forever by default
+        "waitQueueTimeoutMS": _env_int("MONGODB_WAIT_QUEUE_TIMEOUT_MS", 10_000),
+        "connectTimeoutMS": _env_int("MONGODB_CONNECT_TIMEOUT_MS", 10_000),
+        "serverSelectionTimeoutMS": _env_int("MONGODB_SERVER_SELECTION_TIMEOUT_MS", 10_000),
+    }
+    socket_timeout = _env_optional_int("MONGODB_SOCKET_TIMEOUT_MS")
+    if socket_timeout:
+        options["socketTimeoutMS"] = socket_timeout
+    return options
+
+
+def postgres_pool_options() -> Dict[str, Any]:
+    """Keyword arguments of asyncpg.create_pool"""
+    return {
+        "min_size": _env_int("POSTGRES_MIN_POOL_SIZE", 2),
+        "max_size": _env_int("POSTGRES_MAX_POOL_SIZE", 20),
+        "max_inactive_connection_lifetime": _env_float("POSTGRES_MAX_INACTIVE_LIFETIME", 300.0),
+        # Connection establishment and per-statement timeouts, in seconds
+        "timeout": _env_float("POSTGRES_CONNECT_TIMEOUT", 10.0),
+        "command_timeout": _env_float("POSTGRES_COMMAND_TIMEOUT", 60.0),
+    }
+
+
+def postgres_acquire_timeout() -> float:
+    """Seconds to wait for a free asyncpg connection (asyncpg has no pool-wide setting)"""
+    return _env_float("POSTGRES_ACQUIRE_TIMEOUT", 10.0)
+
+
+def neo4j_driver_options() -> Dict[str, Any]:
+    """Keyword configuration of AsyncGraphDatabase.driver, durations in seconds"""
+    return {
+        "max_connection_pool_size": _env_int("NEO4J_MAX_POOL_SIZE", 100),
+        "connection_acquisition_timeout": _env_float("NEO4J_ACQUISITION_TIMEOUT", 30.0),
+        # Recycled before proxies / load balancers silently drop them
+        "max_connection_lifetime": _env_float("NEO4J_MAX_CONNECTION_LIFETIME", 3600.0),
+        "connection_timeout": _env_float("NEO4J_CONNECTION_TIMEOUT", 15.0),
+        "keep_alive": os.getenv("NEO4J_KEEP_ALIVE", "true").lower() != "false",
+        # Connections idle for longer are pinged before reuse
+        "liveness_check_timeout": _env_float("NEO4J_LIVENESS_CHECK_TIMEOUT", 60.0),
+    }
+
+
+def cassandra_request_timeout() -> float:
+    """Client-side timeout of one Cassandra request (one page of a paged query), in seconds"""
+    return _env_float("CASSANDRA_REQUEST_TIMEOUT", 60.0)
+
+
+def cassandra_cluster_options() -> Dict[str, Any]:
+    """Keyword arguments of cassandra.cluster.Cluster"""
+    options = {
+        "connect_timeout": _env_float("CASSANDRA_CONNECT_TIMEOUT", 10.0),
+        "control_connection_timeout": _env_float("CASSANDRA_CONTROL_CONNECTION_TIMEOUT", 10.0),
+        # Heartbeats keep idle connections open through firewalls and detect dead ones
+        "idle_heartbeat_interval": _env_float("CASSANDRA_IDLE_HEARTBEAT_INTERVAL", 30.0),
+        "idle_heartbeat_timeout": _env_float("CASSANDRA_IDLE_HEARTBEAT_TIMEOUT", 30.0),
+    }
+    protocol_version = _env_optional_int("CASSANDRA_PROTOCOL_VERSION")
+    if protocol_version:
+        # Pinned to skip the downgrade negotiation on every new connection
+        options["protocol_version"] = protocol_version
+    return options
+
+
+def cassandra_connections_per_host() -> Optional[Dict[str, int]]:
+    """
+    Core / max connections per local host. The driver only supports these with protocol v1/v2; from v3
+    a single connection per host multiplexes up to 32k requests, so None is returned there.
+    """
+    protocol_version = _env_optional_int("CASSANDRA_PROTOCOL_VERSION")
+    if protocol_version is None or protocol_version >= 3:
+        return None
+    return {
+        "core": _env_int("CASSANDRA_CORE_CONNECTIONS_PER_HOST", 2),
+        "max": _env_int("CASSANDRA_MAX_CONNECTIONS_PER_HOST", 8),
+    }
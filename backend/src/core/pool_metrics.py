@@ -0,0 +1,112 @@
+from typing import Any, Dict
+from pymongo import monitoring
+
+
+class MongoPoolMonitor(monitoring.ConnectionPoolListener):
+    """pymongo pool listener counting open, checked-out and waiting connections (pymongo exposes no pool stats)"""
+
+    def __init__(self):
+        self.open = 0
+        self.in_use = 0
+        self.waiters = 0
+        self.checkout_failures = 0
+
+    def connection_created(self, event):
+        self.open += 1
+
+    def connection_closed(self, event):
+        self.open = max(0, self.open - 1)
+
+    def connection_check_out_started(self, event):
+        self.waiters += 1
+
+    def connection_checked_out(self, event):
+        self.waiters = max(0, self.waiters - 1)
+        self.in_use += 1
+
+    def connection_check_out_failed(self, event):
+        self.waiters = max(0, self.waiters - 1)
+        self.checkout_failures += 1
+
+    def connection_checked_in(self, event):
+        self.in_use = max(0, self.in_use - 1)
+
+    def pool_cleared(self, event):
+        pass
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_ready(self, event):
+        pass
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "open": self.open,
+            "in_use": self.in_use,
+            "idle": max(0, self.open - self.in_use),
+            "waiters": self.waiters,
+            "checkout_failures": self.checkout_failures,
+        }
+
+
+def postgres_pool_metrics(pool) -> Dict[str, Any]:
+    size = pool.get_size()
+    idle = pool.get_idle_size()
+    metrics = {
+        "size": size,
+        "in_use": size - idle,
+        "idle": idle,
+        "min_size": pool.get_min_size(),
+        "max_size": pool.get_max_size(),
+    }
+    # Best effort: tasks blocked in acquire() wait on the pool's private holder queue
+    getters = getattr(getattr(pool, "_queue", None), "_getters", None)
+    if getters is not None:
+        metrics["waiters"] = sum(1 for waiter in getters if not waiter.done())
+    return metrics
+
+
+def neo4j_pool_metrics(driver) -> Dict[str, Any]:
+    """Best effort from the driver's private pool, the Python driver has no public pool statistics"""
+    pool = getattr(driver, "_pool", None)
+    connections = getattr(pool, "connections", None)
+    if connections is None:
+        return {"available": False}
+    in_use = idle = 0
+    per_address = {}
+    for address, members in list(connections.items()):
+        busy = sum(1 for connection in list(members) if getattr(connection, "in_use", False))
+        per_address[str(address)] = {"in_use": busy, "idle": len(members) - busy}
+        in_use += busy
+        idle += len(members) - busy
+    reservations = getattr(pool, "connections_reservations", {})
+    return {
+        "available": True,
+        "in_use": in_use,
+        "idle": idle,
+        "opening": sum(reservations.values()),
+        "max_size": getattr(getattr(pool, "pool_config", None), "max_connection_pool_size", None),
+        "addresses": per_address,
+    }
+
+
+def cassandra_pool_metrics(session) -> Dict[str, Any]:
+    per_host = {}
+    in_flight = 0
+    for host, state in session.get_pool_state().items():
+        host_in_flight = sum(state.get("in_flights") or [])
+        per_host[str(host)] = {
+            "open": state.get("open_count"),
+            "in_flight": host_in_flight,
+            "orphaned": sum(len(ids) for ids in state.get("orphan_requests") or []),
+            "shutdown": state.get("shutdown"),
+        }
+        in_flight += host_in_flight
+    return {"hosts": per_host, "in_flight": in_flight}
@@ -6,6 +6,7 @@ from src.core.database import DatabaseManager
 from src.schemas.responses import *
 from src.services.query_service import QueryService
 from src.services.graph_service import GraphService, WalletSource
+from src.services.token_transfer_service import TokenTransferService
 import asyncio
 
 app = FastAPI(
@@ -68,13 +69,24 @@ async def health_check():
         }
     }
 
+@app.get("/health/pools")
+async def pool_metrics():
+    """Live connection pool usage of the connected databases"""
+    return db_manager.pool_metrics()
+
 @app.get("/wallet-graph")
 async def get_wallet_graph(
     wallet_address: str = Query(..., description="Wallet address to query"),
     chain_id: Optional[str] = Query(None, description="Blockchain chain ID (e.g., 0x38)"),
-    limit: int = Query(20, ge=1, le=1000, description="Limit for records per collection")
+    limit: int = Query(20, ge=1, le=1000, description="Limit for records per collection"),
+    start_block: Optional[int] = Query(None, ge=0, description="First block of the token transfer window"),
+    end_block: Optional[int] = Query(None, ge=0, description="Last block of the token transfer window")
 ):
     """Get wallet-centric graph data linking Wallet, Lending Events, Contracts, Projects, Social, and Twitter"""
+    try:
+        TokenTransferService.block_window(start_block, end_block)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
     if not db_manager.is_mongodb_connected():
         raise HTTPException(status_code=503, detail="MongoDB not available")
     if chain_id and not db_manager.is_cassandra_connected():
@@ -84,7 +96,9 @@ async def get_wallet_graph(
         data = await query_service.get_wallet_graph_data(
             wallet_address=wallet_address,
             chain_id=chain_id,
-            limit=limit
+            limit=limit,
+            start_block=start_block,
+            end_block=end_block
         )
         return data
     except Exception as e:
@@ -172,11 +186,17 @@ async def get_wallet_graph(
 @app.get("/build-wallet-batch")
 async def build_wallet_batch(
     limit: int = Query(100, ge=1, le=10000000, description="Number of wallets to process per batch"),
-    offset: int = Query(0, ge=0, description="Starting offset for wallet batch"),
+    offset: int = Query(0, ge=0, description="Starting offset for wallet batch (ignored when after_id or resume is used)"),
     source: WalletSource = Query(WalletSource.wallets, description="Source collection for wallets: wallets, lending_transactions, or liquidations"),
-    chain_id: Optional[str] = Query("0x1", description="Blockchain chain ID (e.g., 0x38)")
+    chain_id: Optional[str] = Query("0x1", description="Blockchain chain ID (e.g., 0x38)"),
+    concurrency: Optional[int] = Query(None, ge=1, le=256, description="Number of wallets processed in parallel (defaults to WALLET_BATCH_CONCURRENCY)"),
+    wallet_timeout: Optional[float] = Query(None, gt=0, description="Per-wallet timeout in seconds (defaults to WALLET_BATCH_TIMEOUT_SECONDS)"),
+    page_size: Optional[int] = Query(None, ge=1, le=100000, description="Source records fetched per page (defaults to WALLET_BATCH_PAGE_SIZE)"),
+    after_id: Optional[str] = Query(None, description="Resume token (next_cursor of a previous run) to start after"),
+    resume: bool = Query(False, description="Start after the stored checkpoint of this source and chain"),
+    reset: bool = Query(False, description="Delete the stored checkpoint of this source and chain before starting")
 ):
-    """Build Neo4j graphs for a batch of wallets with pagination and deduplication"""
+    """Build Neo4j graphs for a batch of wallets with keyset pagination, checkpointing and deduplication"""
     if not db_manager.is_mongodb_connected():
         raise HTTPException(status_code=503, detail="MongoDB not available")
     if not db_manager.is_neo4j_connected():
@@ -189,7 +209,13 @@ async def build_wallet_batch(
             limit=limit,
             offset=offset,
             source=source,
-            chain_id=chain_id
+            chain_id=chain_id,
+            concurrency=concurrency,
+            wallet_timeout=wallet_timeout,
+            page_size=page_size,
+            after_id=after_id,
+            resume=resume,
+            reset=reset
         )
         return result
     except Exception as e:
@@ -207,9 +233,14 @@ async def build_wallet_batch(
         )
 
 
-from src.routers import chatbot
+from src.routers import chatbot, cypher
+from src.services.chat_tools_service import ChatToolsService
+from src.services.cypher_service import CypherQueryService
 
+chatbot.init_tools(ChatToolsService(db_manager, query_service))
+cypher.init_service(CypherQueryService(db_manager, chatbot.client))
 app.include_router(chatbot.router, prefix="/chatbot", tags=["Chatbot"])
+app.include_router(cypher.router, prefix="/cypher", tags=["Cypher"])
 
 
 if __name__ == "__main__":
@@ -1,4 +1,4 @@
-from typing import Any, List, Literal
+from typing import Any, Awaitable, Callable, Dict, List, Literal, Optional
 from fastapi import APIRouter, HTTPException
 from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
@@ -6,9 +6,18 @@ import os
 import asyncio
 import json
 from openai import AsyncOpenAI
+from src.services.chat_tools_service import ChatToolsService
+from src.services.chat_history import ChatHistoryManager
 
 router = APIRouter()
 client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+tools_service: Optional[ChatToolsService] = None
+
+CHAT_MODEL = "gpt-4o-mini"
+# Model turns allowed to call tools before the answer must be text
+MAX_TOOL_ROUNDS = 3
+
+history = ChatHistoryManager(client, CHAT_MODEL)
 
 
 class Message(BaseModel):
@@ -18,6 +27,8 @@ class Message(BaseModel):
 
 class ChatRequest(BaseModel):
     messages: List[Message]
+    # Tool results and the summary of older turns are reused for every turn of the same conversation
+    conversation_id: Optional[str] = None
 
 
 @router.post("/message/stream")
@@ -27,39 +38,66 @@ async def chat_stream(payload: ChatRequest, graph: Any = None) -> StreamingRespo
 
     async def event_generator():
         try:
-            messages = payload.messages
-            action = await decide_action(messages)
-
-            if action["type"] == "call_function":
-                func_name = action["function"]
-                args = action.get("args", {})
-
-                print(f"\nCALLING `{func_name}` with:\n{args}\n")
-
-                if func_name == "get_wallet_graph":
-                    result = await get_wallet_graph(**args)
-                elif func_name == "get_credit_score":
-                    result = await get_credit_score(**args)
-                else:
-                    result = {"error": f"Hàm không tồn tại: {func_name}"}
-
-                system_msg = Message(
-                    role="system",
-                    content=f"Kết quả từ `{func_name}`:\n{json.dumps(result, indent=2)}",
+            conversation = [m.model_dump() for m in payload.messages]
+            # Window + rolling summary, so a turn costs the same however long the conversation is
+            messages: List[Dict[str, Any]] = history.prepare(conversation, payload.conversation_id)
+
+            # One streaming request per model turn: text is forwarded as it arrives, tool calls are
+            # run and only their results are appended before the next turn
+            for round_number in range(MAX_TOOL_ROUNDS + 1):
+                stream = await client.chat.completions.create(
+                    model=CHAT_MODEL,
+                    messages=messages,
+                    tools=TOOLS,
+                    # Last round: the history holds tool calls, so tools stay declared but the answer must be text
+                    tool_choice="auto" if round_number < MAX_TOOL_ROUNDS else "none",
+                    stream=True,
                 )
-                messages.append(system_msg)
-
-            stream = await client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[m.model_dump() for m in messages],
-                stream=True,
-            )
 
-            async for chunk in stream:
-                text = chunk.choices[0].delta.content or ""
-                if text:
-                    yield text
-                    await asyncio.sleep(0)
+                content = ""
+                tool_calls: Dict[int, Dict[str, Any]] = {}
+                async for chunk in stream:
+                    if not chunk.choices:
+                        continue
+                    delta = chunk.choices[0].delta
+                    text = delta.content or ""
+                    if text:
+                        content += text
+                        yield text
+                        await asyncio.sleep(0)
+                    for tool_call in delta.tool_calls or []:
+                        call = tool_calls.setdefault(tool_call.index, {"id": None, "name": "", "arguments": ""})
+                        if tool_call.id:
+                            call["id"] = tool_call.id
+                        if tool_call.function and tool_call.function.name:
+                            call["name"] += tool_call.function.name
+                        if tool_call.function and tool_call.function.arguments:
+                            call["arguments"] += tool_call.function.arguments
+
+                if not tool_calls:
+                    break
+
+                calls = [tool_calls[index] for index in sorted(tool_calls)]
+                messages.append({
+                    "role": "assistant",
+                    # Text streamed before the tool calls stays in the history the next turn sees
+                    "content": content or None,
+                    "tool_calls": [
+                        {"id": call["id"], "type": "function",
+                         "function": {"name": call["name"], "arguments": call["arguments"]}}
+                        for call in calls
+                    ],
+                })
+                results = await asyncio.gather(*(run_tool(call["name"], call["arguments"], payload.conversation_id)
+                                                 for call in calls))
+                for call, result in zip(calls, results):
+                    messages.append({
+                        "role": "tool",
+                        "tool_call_id": call["id"],
+                        "content": json.dumps(result, ensure_ascii=False, separators=(",", ":")),
+                    })
+
+            history.summarize_in_background(conversation, payload.conversation_id)
 
         except Exception as e:
             yield f"[Error] {str(e)}\n\n"
@@ -67,93 +105,86 @@ async def chat_stream(payload: ChatRequest, graph: Any = None) -> StreamingRespo
     return StreamingResponse(event_generator(), media_type="text/plain; charset=utf-8")
 
 
-async def get_wallet_graph(wallet_address: str, chain_id: str = "0x1", limit: int = 20):
-    return {
-        "wallet": wallet_address,
-        "chain": chain_id,
-        "limit": limit,
-        "summary": f"Ví {wallet_address} trên chain {chain_id} có {limit} tương tác.",
-    }
-
-
-async def get_credit_score(wallet_address: str, chain_id: str = "0x1"):
-    return {
-        "wallet": wallet_address,
-        "chain": chain_id,
-        "credit_score": 72,
-        "grade": "B+",
-    }
-
-
-async def decide_action(messages: List[Message]) -> dict:
-    prompt = f"""
-Bạn là một AI nội bộ có quyền truy cập các hàm thực thi dữ liệu thật như `get_wallet_graph`, `get_credit_score`, v.v.
-Chỉ cần phát hiện người dùng yêu cầu thông tin cụ thể (như địa chỉ ví, chain ID...) thì hãy tạo yêu cầu gọi hàm tương ứng.
-
-- Nếu cần → trả về JSON kiểu: 
-  {{
-    "type": "call_function",
-    "function": "get_wallet_graph",
-    "args": {{
-      "wallet_address": "0xabc",
-      "chain_id": "0x1",
-      "limit": 20
-    }}
-  }}
-
-- Nếu không cần → trả về:
-  {{ "type": "chat" }}
-
-Hội thoại:
-{json.dumps([m.model_dump() for m in messages], indent=2)}
-"""
-
-    completion = await client.chat.completions.create(
-        model="gpt-4o-mini",
-        messages=[
-            {"role": "system", "content": "Bạn là một AI quyết định gọi hàm backend."},
-            {"role": "user", "content": prompt},
-        ],
-    )
+async def run_tool(name: str, arguments: str, conversation_id: Optional[str] = None) -> Any:
+    handler = TOOL_HANDLERS.get(name)
+    if handler is None:
+        return {"error": f"Hàm không tồn tại: {name}"}
+    try:
+        args = json.loads(arguments) if arguments else {}
+    except json.JSONDecodeError as e:
+        return {"error": f"Invalid arguments for {name}: {e}"}
+
+    if not isinstance(args, dict) or "conversation_id" in args:
+        return {"error": f"Invalid arguments for {name}"}
+
+    print(f"\nCALLING `{name}` with:\n{args}\n")
     try:
-        return json.loads(completion.choices[0].message.content)
+        return await handler(conversation_id=conversation_id, **args)
+    except TypeError as e:
+        return {"error": f"Invalid arguments for {name}: {e}"}
     except Exception as e:
-        return {"type": "chat"}
-
-
-# async def chat_stream(messages: List[Message]):
-#     try:
-#         action = await decide_action(messages)
-
-#         if action["type"] == "call_function":
-#             func_name = action["function"]
-#             args = action.get("args", {})
-
-#             print(f"\nCALLLLLL `{func_name}` with:\n{args}\n")
-
-#             if func_name == "get_wallet_graph":
-#                 result = await get_wallet_graph(**args)
-#             elif func_name == "get_credit_score":
-#                 result = await get_credit_score(**args)
-#             else:
-#                 result = {"error": f"Hàm không tồn tại: {func_name}"}
-
-#             system_msg = Message(
-#                 role="system",
-#                 content=f"Kết quả từ `{func_name}`:\n{json.dumps(result, indent=2)}",
-#             )
-#             messages.append(system_msg)
-#         stream = await client.chat.completions.create(
-#             model="gpt-4o-mini",
-#             messages=[m.model_dump() for m in messages],
-#             stream=True,
-#         )
-
-#         async for chunk in stream:
-#             text = chunk.choices[0].delta.content or ""
-#             if text:
-#                 print(text, end="", flush=True)
-#                 await asyncio.sleep(0)
-
-#     except Exception as e:
-#         print(f"\nError: {str(e)}")
+        # Reported to the model as the tool result, the answer can still explain what is missing
+        return {"error": f"{name} failed: {e}"}
+
+
+def init_tools(service: ChatToolsService) -> None:
+    """Bind the tools to the app's services, called once by src.main"""
+    global tools_service
+    tools_service = service
+
+
+def _tools() -> ChatToolsService:
+    if tools_service is None:
+        raise RuntimeError("Chatbot tools are not initialized")
+    return tools_service
+
+
+async def get_wallet_graph(
+    wallet_address: str, chain_id: str = "0x1", limit: int = 20, conversation_id: Optional[str] = None
+):
+    return await _tools().get_wallet_graph(wallet_address, chain_id, limit, conversation_id=conversation_id)
+
+
+async def get_credit_score(wallet_address: str, chain_id: str = "0x1", conversation_id: Optional[str] = None):
+    return await _tools().get_credit_score(wallet_address, chain_id, conversation_id=conversation_id)
+
+
+# Tool registry: OpenAI function schema and handler of every tool the chatbot may call
+TOOL_HANDLERS: Dict[str, Callable[..., Awaitable[Any]]] = {
+    "get_wallet_graph": get_wallet_graph,
+    "get_credit_score": get_credit_score,
+}
+
+TOOLS = [
+    {
+        "type": "function",
+        "function": {
+            "name": "get_wallet_graph",
+            "description": "Tóm tắt đồ thị giao dịch (lending, transfer, liquidation, project) của một ví.",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "wallet_address": {"type": "string", "description": "Địa chỉ ví, ví dụ 0xabc..."},
+                    "chain_id": {"type": "string", "description": "Chain ID dạng hex, mặc định 0x1"},
+                    "limit": {"type": "integer", "description": "Số tương tác tối đa (1-100), mặc định 20"},
+                },
+                "required": ["wallet_address"],
+            },
+        },
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "get_credit_score",
+            "description": "Credit score hiện tại của một ví.",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "wallet_address": {"type": "string", "description": "Địa chỉ ví, ví dụ 0xabc..."},
+                    "chain_id": {"type": "string", "description": "Chain ID dạng hex, mặc định 0x1"},
+                },
+                "required": ["wallet_address"],
+            },
+        },
+    },
+]
@@ -0,0 +1,40 @@
+from typing import Any, Dict, Optional
+from fastapi import APIRouter, HTTPException
+from pydantic import BaseModel, Field
+from neo4j.exceptions import ClientError, Neo4jError
+from src.services.cypher_service import CypherQueryService, CypherValidationError, CYPHER_MAX_LIMIT
+
+router = APIRouter()
+cypher_service: Optional[CypherQueryService] = None
+
+
+class CypherQuestionRequest(BaseModel):
+    question: str = Field(..., min_length=1)
+    limit: Optional[int] = Field(None, ge=1, le=CYPHER_MAX_LIMIT)
+
+
+def init_service(service: CypherQueryService) -> None:
+    """Bind the router to the app's service, called once by src.main"""
+    global cypher_service
+    cypher_service = service
+
+
+@router.post("/query")
+async def query_knowledge_graph(payload: CypherQuestionRequest) -> Dict[str, Any]:
+    """Answer a natural-language question with a generated, read-only Cypher query"""
+    if cypher_service is None:
+        raise HTTPException(status_code=503, detail="Cypher service is not initialized")
+    try:
+        return await cypher_service.answer(payload.question, payload.limit)
+    except CypherValidationError as e:
+        raise HTTPException(status_code=422, detail=f"Generated query rejected: {e}")
+    except ClientError as e:
+        if "TransactionTimedOut" in (e.code or ""):
+            raise HTTPException(status_code=504, detail="Query timed out")
+        raise HTTPException(status_code=422, detail=f"Generated query failed: {e.message}")
+    except Neo4jError as e:
+        raise HTTPException(status_code=502, detail=f"Neo4j error: {e.message}")
+    except Exception as e:
+        if "Neo4j not connected" in str(e):
+            raise HTTPException(status_code=503, detail="Neo4j not connected")
+        raise HTTPException(status_code=500, detail=str(e))
@@ -0,0 +1,179 @@
+from typing import Any, Dict, List, Optional, Set
+from src.core.ttl_cache import TTLCache
+import asyncio
+import hashlib
+import json
+import logging
+import os
+
+try:
+    import tiktoken
+    _encoding = tiktoken.get_encoding("cl100k_base")
+except Exception:  # tiktoken is optional (and needs its BPE file), fall back to ~4 characters per token
+    _encoding = None
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+handler = logging.StreamHandler()
+formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
+handler.setFormatter(formatter)
+if not logger.handlers:
+    logger.addHandler(handler)
+
+# User turns (with their answers) sent verbatim, older turns are folded into the summary
+CHAT_HISTORY_KEEP_TURNS = int(os.getenv("CHAT_HISTORY_KEEP_TURNS", "6"))
+# Prompt tokens allowed for the history of one completion call
+CHAT_HISTORY_TOKEN_BUDGET = int(os.getenv("CHAT_HISTORY_TOKEN_BUDGET", "6000"))
+CHAT_SUMMARY_MAX_TOKENS = int(os.getenv("CHAT_SUMMARY_MAX_TOKENS", "400"))
+CHAT_SUMMARY_TTL = float(os.getenv("CHAT_SUMMARY_TTL", "3600"))
+CHAT_SUMMARY_MAX_CONVERSATIONS = int(os.getenv("CHAT_SUMMARY_MAX_CONVERSATIONS", "1000"))
+# Per-message overhead of the chat format (role, separators)
+MESSAGE_OVERHEAD_TOKENS = 4
+
+SUMMARY_PROMPT = (
+    "Tóm tắt ngắn gọn cuộc hội thoại giữa người dùng và trợ lý phân tích ví blockchain. "
+    "Giữ lại địa chỉ ví, chain, số liệu (credit score, số dư, khoản vay, liquidation) và các câu hỏi còn mở. "
+    "Nếu có bản tóm tắt trước, hãy cập nhật nó với các tin nhắn mới."
+)
+SUMMARY_PREFIX = "Tóm tắt phần trước của cuộc hội thoại:\n"
+
+
+def count_tokens(text: str) -> int:
+    if _encoding is not None:
+        return len(_encoding.encode(text))
+    return len(text) // 4 + 1
+
+
+def message_tokens(message: Dict[str, Any]) -> int:
+    return count_tokens(message.get("content") or "") + MESSAGE_OVERHEAD_TOKENS
+
+
+def messages_digest(messages: List[Dict[str, Any]]) -> str:
+    digest = hashlib.sha256()
+    for message in messages:
+        digest.update(json.dumps([message.get("role"), message.get("content")], ensure_ascii=False).encode("utf-8"))
+    return digest.hexdigest()
+
+
+class ChatHistoryManager:
+    """
+    Bounded chat history per completion call: leading system messages, a rolling summary of the
+    older turns and the last `keep_turns` turns verbatim, within `token_budget` tokens.
+
+    The summary is cached by conversation id together with the number and digest of the messages it
+    covers, and is extended in the background after a turn, so a turn never waits for it. Requests
+    without a conversation id are only windowed.
+    """
+
+    def __init__(
+        self,
+        client: Any,
+        model: str,
+        keep_turns: int = CHAT_HISTORY_KEEP_TURNS,
+        token_budget: int = CHAT_HISTORY_TOKEN_BUDGET,
+        summary_max_tokens: int = CHAT_SUMMARY_MAX_TOKENS
+    ):
+        self.client = client
+        self.model = model
+        self.keep_turns = keep_turns
+        self.token_budget = token_budget
+        self.summary_max_tokens = summary_max_tokens
+        # conversation_id -> {"count", "digest", "summary"}
+        self.summaries = TTLCache(CHAT_SUMMARY_MAX_CONVERSATIONS, CHAT_SUMMARY_TTL)
+        self._summarizing: Set[str] = set()
+        self._tasks: Set[asyncio.Task] = set()
+
+    def prepare(self, messages: List[Dict[str, Any]], conversation_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Messages to send for this turn"""
+        system, dialogue = self._split_system(messages)
+        window_start = self._window_start(dialogue)
+
+        entry = self._summary_entry(dialogue, conversation_id)
+        covered = entry["count"] if entry else 0
+        # Older turns the summary does not cover yet stay verbatim while they fit the budget
+        older = dialogue[covered:window_start] if covered < window_start else []
+        recent = dialogue[max(window_start, covered):]
+
+        head = list(system)
+        if entry:
+            head.append({"role": "system", "content": SUMMARY_PREFIX + entry["summary"]})
+        head_tokens = sum(message_tokens(message) for message in head)
+
+        body = older + recent
+        body_tokens = [message_tokens(message) for message in body]
+        total = head_tokens + sum(body_tokens)
+        dropped = 0
+        # Drop the oldest messages first, the last message (the question) is always sent
+        while total > self.token_budget and dropped < len(body) - 1:
+            total -= body_tokens[dropped]
+            dropped += 1
+        if dropped:
+            logger.info(f"Chat history over budget, dropped {dropped} message(s) ({total}/{self.token_budget} tokens)")
+        return head + body[dropped:]
+
+    def summarize_in_background(self, messages: List[Dict[str, Any]], conversation_id: Optional[str]) -> None:
+        """Fold the turns that left the window into the conversation's summary, at most one task per conversation"""
+        if not conversation_id or conversation_id in self._summarizing:
+            return
+        _, dialogue = self._split_system(messages)
+        entry = self._summary_entry(dialogue, conversation_id)
+        if self._window_start(dialogue) <= (entry["count"] if entry else 0):
+            return
+        self._summarizing.add(conversation_id)
+        task = asyncio.create_task(self._summarize(dialogue, conversation_id, entry))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _summarize(self, dialogue: List[Dict[str, Any]], conversation_id: str, entry: Optional[Dict[str, Any]]):
+        try:
+            covered = entry["count"] if entry else 0
+            window_start = self._window_start(dialogue)
+            transcript = "\n".join(f"{message['role']}: {message.get('content') or ''}"
+                                   for message in dialogue[covered:window_start])
+            prompt = f"Bản tóm tắt trước:\n{entry['summary']}\n\nTin nhắn mới:\n{transcript}" if entry else transcript
+            response = await self.client.chat.completions.create(
+                model=self.model,
+                messages=[{"role": "system", "content": SUMMARY_PROMPT}, {"role": "user", "content": prompt}],
+                max_tokens=self.summary_max_tokens,
+            )
+            summary = (response.choices[0].message.content or "").strip()
+            if summary:
+                self.summaries.set(conversation_id, {
+                    "count": window_start,
+                    "digest": messages_digest(dialogue[:window_start]),
+                    "summary": summary,
+                })
+                logger.info(f"Summarized {window_start} message(s) of conversation {conversation_id}")
+        except Exception as e:
+            # The next turn is windowed without the new summary and tries again
+            logger.error(f"Error summarizing conversation {conversation_id}: {str(e)}")
+        finally:
+            self._summarizing.discard(conversation_id)
+
+    def _summary_entry(self, dialogue: List[Dict[str, Any]], conversation_id: Optional[str]) -> Optional[Dict[str, Any]]:
+        """Cached summary of the conversation, if it still describes a prefix of `dialogue`"""
+        if not conversation_id:
+            return None
+        entry = self.summaries.get(conversation_id)
+        if entry is None or entry["count"] > len(dialogue):
+            return None
+        if messages_digest(dialogue[:entry["count"]]) != entry["digest"]:
+            # The client edited or reset the history
+            self.summaries.pop(conversation_id)
+            return None
+        return entry
+
+    def _window_start(self, dialogue: List[Dict[str, Any]]) -> int:
+        """Index of the first message of the last `keep_turns` user turns"""
+        user_indexes = [index for index, message in enumerate(dialogue) if message.get("role") == "user"]
+        if len(user_indexes) <= self.keep_turns:
+            return 0
+        return user_indexes[-self.keep_turns] if self.keep_turns > 0 else len(dialogue) - 1
+
+    @staticmethod
+    def _split_system(messages: List[Dict[str, Any]]):
+        """Leading system messages (always sent) and the rest of the conversation"""
+        split = 0
+        while split < len(messages) and messages[split].get("role") == "system":
+            split += 1
+        return messages[:split], messages[split:]
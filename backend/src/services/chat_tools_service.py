@@ -0,0 +1,198 @@
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional
+from collections import Counter, defaultdict
+from src.core.database import DatabaseManager
+from src.core.ttl_cache import TTLCache
+from src.services.query_service import QueryService
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+handler = logging.StreamHandler()
+formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
+handler.setFormatter(formatter)
+if not logger.handlers:
+    logger.addHandler(handler)
+
+# Tool results shared by every conversation, short-lived so new blocks / scores show up
+CHAT_TOOL_CACHE_TTL = float(os.getenv("CHAT_TOOL_CACHE_TTL", "300"))
+CHAT_TOOL_CACHE_MAX_ENTRIES = int(os.getenv("CHAT_TOOL_CACHE_MAX_ENTRIES", "1024"))
+# Tool results pinned per conversation, so follow-up questions see the same data
+CHAT_CONVERSATION_TTL = float(os.getenv("CHAT_CONVERSATION_TTL", "1800"))
+CHAT_CONVERSATION_MAX = int(os.getenv("CHAT_CONVERSATION_MAX", "1000"))
+MAX_GRAPH_LIMIT = 100
+# Items listed per collection in the wallet graph summary
+SUMMARY_TOP_K = 5
+
+WALLET_BALANCE_FIELDS = ("balanceInUSD", "depositInUSD", "borrowInUSD", "numberOfLiquidation", "totalValueOfLiquidation")
+GRAPH_COLLECTIONS = (
+    "wallets", "lending_events", "contracts", "projects", "project_social",
+    "twitter_users", "tweets", "token_transfers", "liquidations"
+)
+
+CREDIT_SCORE_QUERY = """
+UNWIND $ids AS id
+MATCH (w:Wallet {id: id})
+RETURN w.id AS wallet_id, w.credit_score AS credit_score
+LIMIT 1
+"""
+
+
+class ChatToolsService:
+    """Backend of the chatbot tools: wallet data as compact summaries, cached per conversation and globally"""
+
+    def __init__(self, db_manager: DatabaseManager, query_service: QueryService):
+        self.db_manager = db_manager
+        self.query_service = query_service
+        self.shared_cache = TTLCache(CHAT_TOOL_CACHE_MAX_ENTRIES, CHAT_TOOL_CACHE_TTL)
+        # conversation_id -> {cache key: tool result}
+        self.conversations = TTLCache(CHAT_CONVERSATION_MAX, CHAT_CONVERSATION_TTL)
+
+    async def get_wallet_graph(
+        self,
+        wallet_address: str,
+        chain_id: str = "0x1",
+        limit: int = 20,
+        conversation_id: Optional[str] = None
+    ) -> Dict[str, Any]:
+        limit = max(1, min(int(limit), MAX_GRAPH_LIMIT))
+
+        async def load():
+            # Same preconditions as /wallet-graph; errors propagate so they are neither cached nor pinned
+            if not self.db_manager.is_mongodb_connected():
+                raise RuntimeError("MongoDB not available")
+            if not self.db_manager.is_cassandra_connected():
+                raise RuntimeError("Cassandra not available")
+            data = await self.query_service.get_wallet_graph_data(wallet_address, chain_id, limit, raise_errors=True)
+            return summarize_wallet_graph(data, wallet_address, chain_id, limit)
+
+        # Keyed on the address as given, like the lookups themselves (MongoDB matches it exactly)
+        return await self._cached(("get_wallet_graph", wallet_address, chain_id, limit), conversation_id, load)
+
+    async def get_credit_score(
+        self,
+        wallet_address: str,
+        chain_id: str = "0x1",
+        conversation_id: Optional[str] = None
+    ) -> Dict[str, Any]:
+        async def load():
+            # Wallet ids are "<chain_id>_<address>"; check the address as given and lowercased
+            ids = list({f"{chain_id}_{wallet_address}", f"{chain_id}_{wallet_address.lower()}"})
+            driver = self.db_manager.get_neo4j_driver()
+            async with driver.session() as session:
+                result = await session.run(CREDIT_SCORE_QUERY, ids=ids)
+                record = await result.single()
+            if record is None:
+                return {"wallet": wallet_address, "chain": chain_id, "found": False}
+            return {
+                "wallet": wallet_address,
+                "chain": chain_id,
+                "found": True,
+                "credit_score": _round(record["credit_score"]),
+            }
+
+        return await self._cached(("get_credit_score", wallet_address, chain_id, None), conversation_id, load)
+
+    async def _cached(
+        self,
+        key: Hashable,
+        conversation_id: Optional[str],
+        loader: Callable[[], Awaitable[Dict[str, Any]]]
+    ) -> Dict[str, Any]:
+        """Result from the conversation's cache, then the shared cache, loading it once on a miss"""
+        pinned = self.conversations.get(conversation_id) if conversation_id else None
+        if pinned is not None and key in pinned:
+            logger.debug(f"Chat tool cache hit (conversation {conversation_id}): {key}")
+            return pinned[key]
+
+        result = await self.shared_cache.get_or_load(key, loader)
+        if conversation_id:
+            if pinned is None:
+                pinned = {}
+            pinned[key] = result
+            # Re-set on every use so active conversations are not evicted
+            self.conversations.set(conversation_id, pinned)
+        return result
+
+
+def summarize_wallet_graph(data: Dict[str, Any], wallet_address: str, chain_id: str, limit: int) -> Dict[str, Any]:
+    """Compact view of QueryService.get_wallet_graph_data for the model: counts, totals and a few top items"""
+    wallets = data.get("wallets") or []
+    summary: Dict[str, Any] = {
+        "wallet": wallet_address,
+        "chain": chain_id,
+        "limit": limit,
+        "found": bool(wallets),
+        "counts": {name: len(data.get(name) or []) for name in GRAPH_COLLECTIONS if data.get(name)},
+    }
+    if wallets:
+        summary["balance"] = {
+            field: _round(wallets[0].get(field)) for field in WALLET_BALANCE_FIELDS if wallets[0].get(field) is not None
+        }
+
+    lending: Dict[str, Dict[str, float]] = defaultdict(lambda: {"count": 0, "amount": 0.0})
+    for event in data.get("lending_events") or []:
+        totals = lending[event.get("event_type") or "unknown"]
+        totals["count"] += 1
+        if isinstance(event.get("amount"), (int, float)):
+            totals["amount"] += event["amount"]
+    if lending:
+        summary["lending"] = {
+            event_type: {"count": totals["count"], "amount": _round(totals["amount"])}
+            for event_type, totals in lending.items()
+        }
+
+    contracts = sorted(
+        data.get("contracts") or [], key=lambda contract: contract.get("numberOfDailyActiveUsers") or 0, reverse=True
+    )
+    if contracts:
+        summary["top_contracts"] = [
+            {"address": contract.get("address"), "tags": _tag_names(contract.get("tags")),
+             "active_user_days": contract.get("numberOfDailyActiveUsers")}
+            for contract in contracts[:SUMMARY_TOP_K]
+        ]
+
+    projects = sorted(data.get("projects") or [], key=lambda project: project.get("tvl") or 0, reverse=True)
+    if projects:
+        summary["top_projects"] = [
+            {"name": project.get("name"), "category": project.get("category"), "tvl": _round(project.get("tvl"))}
+            for project in projects[:SUMMARY_TOP_K]
+        ]
+
+    address = wallet_address.lower()
+    transfers = data.get("token_transfers") or []
+    if transfers:
+        sent = [transfer for transfer in transfers if _same(transfer.get("from_address"), address)]
+        counterparties = Counter(
+            transfer.get("to_address") if _same(transfer.get("from_address"), address) else transfer.get("from_address")
+            for transfer in transfers
+        )
+        summary["token_transfers"] = {
+            "sent": len(sent),
+            "received": len(transfers) - len(sent),
+            "top_counterparties": [party for party, _ in counterparties.most_common(SUMMARY_TOP_K) if party],
+        }
+
+    liquidations = data.get("liquidations") or []
+    if liquidations:
+        summary["liquidations"] = {
+            "as_liquidated": sum(1 for item in liquidations if _same(item.get("liquidatedWallet"), address)),
+            "as_debt_buyer": sum(1 for item in liquidations if _same(item.get("debtBuyerWallet"), address)),
+        }
+    return summary
+
+
+def _same(address: Any, lowered: str) -> bool:
+    return isinstance(address, str) and address.lower() == lowered
+
+
+def _tag_names(tags: Any) -> List[str]:
+    if isinstance(tags, dict):
+        return list(tags)[:SUMMARY_TOP_K]
+    if isinstance(tags, list):
+        return [str(tag) for tag in tags[:SUMMARY_TOP_K]]
+    return []
+
+
+def _round(value: Any) -> Any:
+    return round(value, 2) if isinstance(value, float) else value
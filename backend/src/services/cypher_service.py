@@ -0,0 +1,286 @@
+from typing import Any, Dict, List, Optional
+from neo4j import Query, READ_ACCESS
+from openai import AsyncOpenAI
+from src.core.database import DatabaseManager
+from src.core.ttl_cache import TTLCache
+import logging
+import os
+import re
+import unicodedata
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+handler = logging.StreamHandler()
+formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
+handler.setFormatter(formatter)
+if not logger.handlers:
+    logger.addHandler(handler)
+
+CYPHER_MODEL = os.getenv("CYPHER_MODEL", "gpt-4o-mini")
+# Validated Cypher per normalized question
+CYPHER_CACHE_TTL = float(os.getenv("CYPHER_CACHE_TTL", "3600"))
+CYPHER_CACHE_MAX_ENTRIES = int(os.getenv("CYPHER_CACHE_MAX_ENTRIES", "512"))
+# Rows returned when the request gives no limit, and the cap on any limit
+CYPHER_DEFAULT_LIMIT = int(os.getenv("CYPHER_DEFAULT_LIMIT", "100"))
+CYPHER_MAX_LIMIT = int(os.getenv("CYPHER_MAX_LIMIT", "1000"))
+# Server-side transaction timeout of a generated query, in seconds
+CYPHER_QUERY_TIMEOUT = float(os.getenv("CYPHER_QUERY_TIMEOUT", "10"))
+
+SCHEMA_DESCRIPTION = """
+# Mô tả Kiến thức Đồ thị (Knowledge Graph)
+
+## Wallet
+- id: str ("<chainId>_<address>")
+- address: str
+- chainId: str
+- balanceInUSD: float
+- depositInUSD: float
+- borrowInUSD: float
+- numberOfLiquidation: int
+- totalValueOfLiquidation: float
+- credit_score: float
+- total_deposit: float
+- total_borrow: float
+- total_repay: float
+- total_liquidated: int
+- num_borrow: int
+- num_repay: int
+- num_liquidated: int
+
+## Project
+- id: str
+- name: str
+- category: str
+- tvl: float
+- tokenAddresses: str
+- contractAddresses: str
+- deployedChains: [str]
+- twitterId: str
+
+## Contract
+- id: str
+- address: str
+- chainId: str
+- tags: [str]
+- numberOfDailyCalls: int
+- numberOfDailyActiveUsers: int
+
+## Token
+- id: str
+- address: str
+- chainId: str
+- symbol: str
+- price: float
+- marketCap: float
+- decimals: int
+- tradingVolume: str
+
+## Tweet
+- id: str
+- authorName: str
+- likes: int
+- retweetCounts: int
+- replyCounts: int
+- hashTags: [str]
+- timestamp: int
+
+## TweetUser
+- id: str
+- userName: str
+- verified: bool
+- followersCount: int
+- friendsCount: int
+- statusesCount: int
+- favouritesCount: int
+
+## Hashtag
+- id: str
+- tag: str
+
+---
+
+## Relationships:
+
+- (Wallet)-[:DEPOSITED]->(Contract)
+- (Wallet)-[:BORROWED]->(Contract)
+- (Wallet)-[:REPAID]->(Contract)
+- (Wallet)-[:WITHDREW]->(Contract)
+- (Wallet)-[:TRANSFERRED_TO]->(Wallet)
+- (Wallet)-[:LIQUIDATED_BY]->(Wallet)
+- (Contract)-[:PART_OF]->(Project)
+- (Token)-[:PART_OF]->(Project)
+- (Project)-[:HAS_ACCOUNT]->(TweetUser)
+- (TweetUser)-[:TWEETED]->(Tweet)
+- (Tweet)-[:MENTIONS]->(Hashtag)
+"""
+
+SYSTEM_PROMPT = f"""
+Bạn là một trợ lý sinh truy vấn Cypher (Neo4j) từ câu hỏi người dùng.
+
+Hãy sử dụng các thông tin dưới đây làm schema tham khảo:
+
+{SCHEMA_DESCRIPTION}
+
+Chỉ sinh truy vấn đọc (MATCH / OPTIONAL MATCH / WITH / UNWIND / RETURN), một câu lệnh duy nhất.
+Trả về **chỉ câu truy vấn Cypher**, KHÔNG thêm giải thích, KHÔNG có markdown hoặc ```.
+"""
+
+# Clauses and keywords that write, load data, switch database or call procedures; property names
+# (after a dot) are not keywords
+FORBIDDEN_KEYWORDS = re.compile(
+    r"(?<![.\w])(CREATE|MERGE|DELETE|DETACH|SET|REMOVE|DROP|FOREACH|LOAD\s+CSV|USE|CALL\s+(?!\{)[A-Za-z_][\w.]*)\b",
+    re.IGNORECASE
+)
+READ_CLAUSE_START = re.compile(r"^(?:(?:MATCH|OPTIONAL\s+MATCH|WITH|UNWIND|RETURN)\b|CALL\s*\{)", re.IGNORECASE)
+STRING_LITERAL = re.compile(r"'(?:[^'\\]|\\.)*'|\"(?:[^\"\\]|\\.)*\"|`[^`]*`")
+COMMENT = re.compile(r"//[^\n]*|/\*.*?\*/", re.DOTALL)
+# Strings first, so "//" or "/*" inside a string literal is not taken for a comment
+STRING_OR_COMMENT = re.compile(f"({STRING_LITERAL.pattern})|{COMMENT.pattern}", re.DOTALL)
+LIMIT_KEYWORD = re.compile(r"\bLIMIT\b", re.IGNORECASE)
+# Anything after a LIMIT that means it is not the query's final clause (subquery end, later clause)
+AFTER_FINAL_LIMIT = re.compile(r"\}|\b(?:RETURN|WITH|MATCH|UNWIND|CALL|UNION|ORDER|SKIP|LIMIT)\b", re.IGNORECASE)
+UNION_OR_BRACE = re.compile(r"[{}]|\bUNION\b", re.IGNORECASE)
+
+
+class CypherValidationError(ValueError):
+    """Generated Cypher that is not a single read-only query"""
+
+
+def normalize_question(question: str) -> str:
+    """Cache key of a question: NFC, lowercase, single spaces, no trailing punctuation"""
+    text = unicodedata.normalize("NFC", question).lower()
+    return re.sub(r"\s+", " ", text).strip().rstrip("?.!。 ")
+
+
+def strip_comments(query: str) -> str:
+    return STRING_OR_COMMENT.sub(lambda match: match.group(1) or " ", query)
+
+
+def clean_cypher(text: str) -> str:
+    """Model output without markdown fences, comments and the trailing semicolon"""
+    text = text.strip()
+    fenced = re.match(r"^```(?:cypher)?\s*(.*?)\s*```$", text, re.DOTALL | re.IGNORECASE)
+    if fenced:
+        text = fenced.group(1)
+    return strip_comments(text).strip().rstrip(";").strip()
+
+
+def validate_cypher(query: str) -> str:
+    """Reject anything but one read-only statement; keywords inside strings and comments are ignored"""
+    if not query:
+        raise CypherValidationError("Empty query")
+    code = STRING_LITERAL.sub("''", strip_comments(query))
+    if ";" in code:
+        raise CypherValidationError("Only a single statement is allowed")
+    if not READ_CLAUSE_START.match(code.strip()):
+        raise CypherValidationError("Query must start with a read clause")
+    forbidden = FORBIDDEN_KEYWORDS.search(code)
+    if forbidden:
+        raise CypherValidationError(f"Forbidden clause: {forbidden.group(1).upper()}")
+    return query
+
+
+def apply_limit(query: str, limit: int) -> str:
+    """
+    Query (comment-free, see clean_cypher) returning at most `limit` rows. A final LIMIT with a smaller
+    literal is kept; a larger literal, a parameter or an expression is replaced; otherwise one is appended.
+    A top-level UNION is wrapped in a CALL subquery first, a trailing LIMIT would only bound its last branch.
+    """
+    query = query.rstrip()
+    # Same offsets as `query`, with string contents masked so keywords inside strings are not matched
+    code = STRING_LITERAL.sub(lambda match: "_" * len(match.group()), query)
+    if _has_top_level_union(code):
+        return f"CALL {{\n{query}\n}}\nRETURN *\nLIMIT {limit}"
+    final_limit = None
+    for final_limit in LIMIT_KEYWORD.finditer(code):
+        pass
+    if final_limit is None or AFTER_FINAL_LIMIT.search(code, final_limit.end()):
+        return f"{query}\nLIMIT {limit}"
+    value = query[final_limit.end():].strip()
+    if value.isdigit():
+        limit = min(int(value), limit)
+    return f"{query[:final_limit.start()]}LIMIT {limit}"
+
+
+def _has_top_level_union(code: str) -> bool:
+    depth = 0
+    for match in UNION_OR_BRACE.finditer(code):
+        token = match.group()
+        if token == "{":
+            depth += 1
+        elif token == "}":
+            depth -= 1
+        elif depth == 0:
+            return True
+    return False
+
+
+class CypherQueryService:
+    """
+    Natural-language questions to read-only Cypher on the shared Neo4j driver.
+    Generated queries are validated and cached per normalized question, so a repeated question skips
+    the LLM. The row-bounded query that is executed is the one EXPLAINed (query type must be read-only),
+    and is cached per (question, limit) so a repeat also skips the planning round trip.
+    """
+
+    def __init__(self, db_manager: DatabaseManager, client: Optional[AsyncOpenAI] = None, model: str = CYPHER_MODEL):
+        self.db_manager = db_manager
+        self.client = client or AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+        self.model = model
+        # normalized question -> generated Cypher, stored only once a bounded form of it passed EXPLAIN
+        self.query_cache = TTLCache(CYPHER_CACHE_MAX_ENTRIES, CYPHER_CACHE_TTL)
+        # (normalized question, limit) -> checked bounded Cypher
+        self.bounded_cache = TTLCache(CYPHER_CACHE_MAX_ENTRIES, CYPHER_CACHE_TTL)
+
+    async def answer(self, question: str, limit: Optional[int] = None) -> Dict[str, Any]:
+        limit = max(1, min(limit or CYPHER_DEFAULT_LIMIT, CYPHER_MAX_LIMIT))
+        key = normalize_question(question)
+        cached = key in self.query_cache
+        bounded = await self.bounded_cache.get_or_load((key, limit), lambda: self._bounded_query(question, key, limit))
+        rows = await self.run_read_query(bounded, limit)
+        logger.info(f"Cypher question answered ({'cached' if cached else 'generated'}), {len(rows)} row(s)")
+        return {"question": question, "cypher": bounded, "cached": cached, "row_count": len(rows), "rows": rows}
+
+    async def generate_cypher(self, question: str) -> str:
+        response = await self.client.chat.completions.create(
+            model=self.model,
+            messages=[
+                {"role": "system", "content": SYSTEM_PROMPT},
+                {"role": "user", "content": question},
+            ],
+            temperature=0,
+        )
+        return clean_cypher(response.choices[0].message.content or "")
+
+    async def explain(self, query: str) -> None:
+        """Plan the query without running it; rejects syntax errors and anything the planner marks as a write"""
+        driver = self.db_manager.get_neo4j_driver()
+        async with driver.session(default_access_mode=READ_ACCESS) as session:
+            result = await session.run(f"EXPLAIN {query}")
+            summary = await result.consume()
+        if summary.query_type != "r":
+            raise CypherValidationError(f"Query is not read-only (type {summary.query_type})")
+
+    async def run_read_query(self, query: str, limit: int) -> List[Dict[str, Any]]:
+        async def read(tx):
+            result = await tx.run(Query(query, timeout=CYPHER_QUERY_TIMEOUT))
+            rows = []
+            async for record in result:
+                rows.append(record.data())
+                if len(rows) >= limit:
+                    break
+            await result.consume()
+            return rows
+
+        driver = self.db_manager.get_neo4j_driver()
+        async with driver.session(default_access_mode=READ_ACCESS) as session:
+            return await session.execute_read(read)
+
+    async def _bounded_query(self, question: str, key: str, limit: int) -> str:
+        cypher = self.query_cache.get(key)
+        if cypher is None:
+            cypher = validate_cypher(await self.generate_cypher(question))
+        bounded = validate_cypher(apply_limit(cypher, limit))
+        await self.explain(bounded)
+        self.query_cache.set(key, cypher)
+        return bounded
@@ -1,10 +1,14 @@
 from typing import Optional, List, Dict, Any
 from src.core.database import DatabaseManager
+from src.core.bloom_filter import BloomFilter
 from src.schemas.responses import GraphNodeResponse, GraphRelationshipResponse, GraphQueryResponse, GraphStatsResponse
 from src.services.query_service import QueryService
+from src.services.graph_writer import GraphWriter
+from src.services.wallet_batch_executor import WalletBatchExecutor, DEFAULT_CONCURRENCY, DEFAULT_WALLET_TIMEOUT
+from src.services.wallet_checkpoint import WalletCheckpointStore, encode_cursor, decode_cursor
 import asyncio
 import logging
-import json
+import os
 from enum import Enum
 
 logger = logging.getLogger(__name__)
@@ -21,19 +25,57 @@ class WalletSource(str, Enum):
     liquidations = "liquidations"
     token_transfer = "token_transfer"
     fullOnNeo4j = "full"  # For full graph build
+
+# Mongo wallet sources: (database, collection, address fields)
+MONGO_WALLET_SOURCES = {
+    WalletSource.wallets: ("knowledge_graph", "wallets", ["address"]),
+    WalletSource.lending_events: ("ethereum_blockchain_etl", "lending_events", ["wallet"]),
+    WalletSource.liquidations: ("knowledge_graph", "liquidates", ["debtBuyerWallet", "liquidatedWallet"]),
+}
+DEFAULT_PAGE_SIZE = int(os.getenv("WALLET_BATCH_PAGE_SIZE", 1000))
+# Optional local Bloom filter of processed wallet ids, disabled when capacity is 0
+BLOOM_FILTER_CAPACITY = int(os.getenv("WALLET_BLOOM_FILTER_CAPACITY", 0))
+BLOOM_FILTER_ERROR_RATE = float(os.getenv("WALLET_BLOOM_FILTER_ERROR_RATE", 1e-6))
+# Uniqueness constraint per label MERGEd by GraphWriter (label -> constraint name)
+GRAPH_ID_CONSTRAINTS = {
+    "Wallet": "wallet_id_unique",
+    "Project": "project_id_unique",
+    "Contract": "contract_id_unique",
+    "Token": "token_id_unique",
+    "TweetUser": "tweet_user_id_unique",
+    "Tweet": "tweet_id_unique",
+    "Hashtag": "hashtag_id_unique",
+}
+
 class GraphService:
     def __init__(self, db_manager: DatabaseManager):
         self.db_manager = db_manager
         self.query_service = QueryService(db_manager)
+        self.graph_writer = GraphWriter(db_manager)
+        self.checkpoint_store = WalletCheckpointStore(db_manager)
+        self.processed_wallet_filter = (
+            BloomFilter(BLOOM_FILTER_CAPACITY, BLOOM_FILTER_ERROR_RATE) if BLOOM_FILTER_CAPACITY > 0 else None
+        )
+        self._graph_schema_ready = False
 
     async def build_graph_from_wallet_batch(
     self,
     limit: int = 100,
     offset: int = 0,
     source: str = WalletSource.wallets,
-    chain_id: str = "0x1"
+    chain_id: str = "0x1",
+    concurrency: Optional[int] = None,
+    wallet_timeout: Optional[float] = None,
+    page_size: Optional[int] = None,
+    after_id: Optional[str] = None,
+    resume: bool = False,
+    reset: bool = False
 ) -> Dict[str, Any]:
-        logger.info(f"Starting build_graph_from_wallet_batch with limit={limit}, offset={limit}, chain_id={chain_id}")
+        """Build graphs for up to `limit` source records, paging on _id and checkpointing after every page"""
+        logger.info(
+            f"Starting build_graph_from_wallet_batch with limit={limit}, offset={offset}, source={source}, "
+            f"chain_id={chain_id}, concurrency={concurrency}, after_id={after_id}, resume={resume}, reset={reset}"
+        )
         try:
             # Initialize result
             result = {
@@ -42,124 +84,99 @@ class GraphService:
                 "total_processed": 0,
                 "successes": 0,
                 "failures": 0,
-                "errors": []
+                "skipped": 0,
+                "errors": [],
+                "next_cursor": None
             }
 
-            # Step 1: Fetch wallets from the specified source
-            unique_wallets = []
-            seen_addresses = set()
-
-            if source == WalletSource.wallets:
-                db = self.db_manager.get_mongodb_database("knowledge_graph")
-                collection = db["wallets"]
-                projection = {"_id": 0, "address": 1}
-                cursor = collection.find({}, projection).skip(offset).limit(limit)
-                async for doc in cursor:
-                    address = doc.get("address")
-                    if address and address.lower() not in seen_addresses:
-                        unique_wallets.append(address)
-                        seen_addresses.add(address.lower())
-
-            elif source == WalletSource.lending_events:
-                db = self.db_manager.get_mongodb_database("ethereum_blockchain_etl")
-                collection = db["lending_events"]
-                projection = {"_id": 0, "wallet": 1}
-                cursor = collection.find({}, projection).skip(offset).limit(limit)
-                async for doc in cursor:
-                    address = doc.get("wallet")
-                    if address and address.lower() not in seen_addresses:
-                        unique_wallets.append(address)
-                        seen_addresses.add(address.lower())
-
-            elif source == WalletSource.liquidations:
-                db = self.db_manager.get_mongodb_database("knowledge_graph")
-                collection = db["liquidates"]
-                projection = {"_id": 0, "debtBuyerWallet": 1, "liquidatedWallet": 1}
-                cursor = collection.find({}, projection).skip(offset).limit(limit)
-                async for doc in cursor:
-                    for address in [doc.get("debtBuyerWallet"), doc.get("liquidatedWallet")]:
-                        if address and address.lower() not in seen_addresses:
-                            unique_wallets.append(address)
-                            seen_addresses.add(address.lower())
-
-            elif source == WalletSource.token_transfer:
+            chain_id = chain_id or "0x1"
+            try:
+                source = WalletSource(source)
+            except ValueError:
+                raise ValueError(f"Invalid source: {source}")
+
+            executor = WalletBatchExecutor(
+                concurrency=concurrency or DEFAULT_CONCURRENCY,
+                wallet_timeout=wallet_timeout or DEFAULT_WALLET_TIMEOUT
+            )
+
+            if source == WalletSource.token_transfer:
                 # Truy vấn vào Cassandra
-                session = self.db_manager.get_cassandra_session()
-                query = "SELECT from_address, to_address FROM token_transfer LIMIT %s"
-                rows = session.execute(query, (limit,))
-                addresses = set()
-                for row in rows:
-                    if row.from_address and row.from_address.lower() not in addresses:
-                        addresses.add(row.from_address.lower())
-                    if row.to_address and row.to_address.lower() not in addresses:
-                        addresses.add(row.to_address.lower())
-                unique_wallets = list(addresses)
+                unique_wallets = await self._fetch_token_transfer_wallets(limit)
+                await self._process_wallet_page(unique_wallets, chain_id, executor, result)
 
-            else:
-                raise ValueError(f"Invalid source: {source}")
+            elif source in MONGO_WALLET_SOURCES:
+                db_name, collection_name, address_fields = MONGO_WALLET_SOURCES[source]
+                collection = self.db_manager.get_mongodb_database(db_name)[collection_name]
+                projection = {"_id": 1, **{field: 1 for field in address_fields}}
+                page_size = page_size or DEFAULT_PAGE_SIZE
+                checkpoint_name = f"{source.value}:{chain_id}"
 
-            
-            processed_wallets = set()
-            async with self.db_manager.get_neo4j_driver() as neo4j_session:
-                query = """
-                    MATCH (w:Wallet)
-                    RETURN w.address AS wallet_address
-                """
-                session = neo4j_session.session()
-                neo4j_result = await session.run(query)
-                async for record in neo4j_result:
-                    wallet_address = record["wallet_address"]
-                    if wallet_address:
-                        processed_wallets.add(wallet_address.lower())  # Normalize to lowercase
-
-            # Step 4: Filter out already processed wallets
-            unprocessed_wallets = [
-                wallet for wallet in unique_wallets
-                if wallet.lower() in processed_wallets
-            ]
+                if reset:
+                    # Forget the stored progress of this source/chain, the run starts over
+                    await self.checkpoint_store.clear(checkpoint_name)
+                    logger.info(f"Cleared checkpoint {checkpoint_name}")
 
-            # Step 5: Update result
-            result["total_processed"] = len(unique_wallets)
-            result["successes"] = len(unprocessed_wallets)
-            result["failures"] = len(unique_wallets) - len(unprocessed_wallets)
+                # Resume after an explicit cursor, or after the stored checkpoint of this source/chain
+                last_id = None
+                checkpoint_processed = 0
+                if after_id:
+                    last_id = decode_cursor(after_id)
+                elif resume:
+                    checkpoint = await self.checkpoint_store.load(checkpoint_name)
+                    if checkpoint:
+                        last_id = decode_cursor(checkpoint["cursor"])
+                        checkpoint_processed = checkpoint["processed"]
+                        logger.info(f"Resuming {checkpoint_name} after {checkpoint['cursor']} ({checkpoint_processed} records done)")
+                # Legacy offset is only honoured when no cursor is given, and only for the first page
+                skip = offset if last_id is None else 0
+                if last_id is not None:
+                    result["next_cursor"] = encode_cursor(last_id)
 
-            # Log for debugging
-            logger.info(f"Found {len(unique_wallets)} unique wallets, {len(unprocessed_wallets)} unprocessed wallets")
+                seen_addresses = set()
+                records_read = 0
+                while records_read < limit:
+                    page_limit = min(page_size, limit - records_read)
+                    query = {"_id": {"$gt": last_id}} if last_id is not None else {}
+                    cursor = collection.find(query, projection).sort("_id", 1).skip(skip).limit(page_limit)
+                    skip = 0
 
-            # Step 3: Process each wallet sequentially
-            for wallet_address in unprocessed_wallets:
-                logger.debug(f"Processing wallet: {wallet_address}")
-                try:
-                    # Call existing build_graph_from_mongodb
-                    graph_result = await self.build_graph_from_mongodb(
-                        wallet_address=wallet_address,
-                        chain_id=chain_id,
-                        limit=20  # Use default limit from build_graph_from_mongodb
-                    )
-                    
-                    if graph_result.get("status") == "success":
-                        result["successes"] += 1
-                        logger.debug(f"Successfully built graph for wallet: {wallet_address}")
-                    else:
-                        result["failures"] += 1
-                        error_msg = f"Failed to build graph for wallet {wallet_address}: {graph_result.get('message')}"
-                        result["errors"].append(error_msg)
-                        logger.error(error_msg)
-                
-                except Exception as e:
-                    result["failures"] += 1
-                    error_msg = f"Error processing wallet {wallet_address}: {str(e)}"
-                    result["errors"].append(error_msg)
-                    logger.error(error_msg, exc_info=True)
-                
-                result["total_processed"] += 1
-
-            # Step 4: Finalize result
+                    page_wallets = []
+                    page_records = 0
+                    async for doc in cursor:
+                        page_records += 1
+                        last_id = doc["_id"]
+                        for field in address_fields:
+                            address = doc.get(field)
+                            if address and address.lower() not in seen_addresses:
+                                page_wallets.append(address)
+                                seen_addresses.add(address.lower())
+                    if page_records == 0:
+                        break
+
+                    records_read += page_records
+                    await self._process_wallet_page(page_wallets, chain_id, executor, result)
+
+                    # Checkpoint only after the whole page is done, so a crash replays at most one page
+                    result["next_cursor"] = encode_cursor(last_id)
+                    checkpoint_processed += page_records
+                    await self.checkpoint_store.save(checkpoint_name, result["next_cursor"], checkpoint_processed)
+
+                    if page_records < page_limit:
+                        break  # Reached the end of the collection
+
+            else:
+                raise ValueError(f"Invalid source: {source}")
+
+            # Finalize result
             if result["failures"] > 0:
                 result["status"] = "partial_success"
                 result["message"] = f"Processed {result['total_processed']} wallets with {result['failures']} failures"
             
-            logger.info(f"Completed batch processing: {result}")
+            logger.info(
+                f"Completed batch processing: {result['total_processed']} processed, {result['successes']} succeeded, "
+                f"{result['failures']} failed, {result['skipped']} skipped, next_cursor={result['next_cursor']}"
+            )
             return result
         
         except Exception as e:
@@ -170,8 +187,118 @@ class GraphService:
                 "total_processed": 0,
                 "successes": 0,
                 "failures": 0,
-                "errors": [str(e)]
+                "skipped": 0,
+                "errors": [str(e)],
+                "next_cursor": None
             }
+
+    async def _process_wallet_page(
+        self,
+        wallets: List[str],
+        chain_id: str,
+        executor: WalletBatchExecutor,
+        result: Dict[str, Any]
+    ) -> None:
+        """Filter one page of wallets, build their graphs and add the counts to `result`"""
+        # Filter out already processed wallets
+        unprocessed_wallets = await self._filter_unprocessed_wallets(wallets, chain_id)
+        result["skipped"] += len(wallets) - len(unprocessed_wallets)
+        logger.info(f"Found {len(wallets)} unique wallets, {len(unprocessed_wallets)} unprocessed wallets")
+
+        async def build_wallet(wallet_address: str) -> Dict[str, Any]:
+            graph_result = await self._build_wallet_graph(
+                wallet_address=wallet_address,
+                chain_id=chain_id,
+                limit=20  # Use default limit from build_graph_from_mongodb
+            )
+            if self.processed_wallet_filter is not None and graph_result.get("status") == "success":
+                self.processed_wallet_filter.add(f"{chain_id}_{wallet_address}".lower())
+            return graph_result
+
+        # Process wallets concurrently through a bounded worker pool
+        page_result = await executor.run(unprocessed_wallets, build_wallet)
+        result["total_processed"] += page_result["total_processed"]
+        result["successes"] += page_result["successes"]
+        result["failures"] += page_result["failures"]
+        result["errors"].extend(page_result["errors"])
+
+    async def _filter_unprocessed_wallets(self, wallets: List[str], chain_id: str) -> List[str]:
+        """Return the wallets of this page that have no Wallet node yet, looking up only this page's ids"""
+        if not wallets:
+            return []
+        await self._ensure_graph_schema()
+
+        candidates = wallets
+        if self.processed_wallet_filter is not None:
+            # A filter hit means the wallet was built before (false positives at WALLET_BLOOM_FILTER_ERROR_RATE),
+            # so only misses need a round trip to Neo4j
+            candidates = [
+                wallet for wallet in wallets
+                if f"{chain_id}_{wallet}".lower() not in self.processed_wallet_filter
+            ]
+            if not candidates:
+                return []
+
+        # Wallet ids are "<chain_id>_<address>"; check the address as stored and lowercased
+        ids = set()
+        for wallet in candidates:
+            ids.add(f"{chain_id}_{wallet}")
+            ids.add(f"{chain_id}_{wallet.lower()}")
+
+        processed_ids = set()
+        driver = self.db_manager.get_neo4j_driver()
+        async with driver.session() as session:
+            neo4j_result = await session.run("""
+                UNWIND $ids AS id
+                MATCH (w:Wallet {id: id})
+                RETURN w.id AS wallet_id
+            """, ids=list(ids))
+            async for record in neo4j_result:
+                processed_ids.add(record["wallet_id"].lower())  # Normalize to lowercase
+
+        if self.processed_wallet_filter is not None:
+            for wallet_id in processed_ids:
+                self.processed_wallet_filter.add(wallet_id)
+
+        return [
+            wallet for wallet in candidates
+            if f"{chain_id}_{wallet}".lower() not in processed_ids
+        ]
+
+    async def _ensure_graph_schema(self) -> None:
+        """
+        Create the id uniqueness constraints of every label GraphWriter MERGEs, and the Wallet address index,
+        once per process. Concurrent wallet builds MERGE the same Contract / Project / Token / TweetUser nodes;
+        without a constraint two of those MERGEs can both miss and create duplicates.
+        """
+        if self._graph_schema_ready:
+            return
+        driver = self.db_manager.get_neo4j_driver()
+        queries = [
+            f"CREATE CONSTRAINT {name} IF NOT EXISTS FOR (n:{label}) REQUIRE n.id IS UNIQUE"
+            for label, name in GRAPH_ID_CONSTRAINTS.items()
+        ]
+        queries.append("CREATE INDEX wallet_address IF NOT EXISTS FOR (w:Wallet) ON (w.address)")
+        async with driver.session() as session:
+            for query in queries:
+                try:
+                    result = await session.run(query)
+                    await result.consume()
+                except Exception as e:
+                    # e.g. duplicate ids from older builds; lookups still work, only slower
+                    logger.warning(f"Could not create graph schema ({query}): {e}")
+        self._graph_schema_ready = True
+
+    async def _fetch_token_transfer_wallets(self, limit: int) -> List[str]:
+        session = self.db_manager.get_cassandra_async_session()
+        query = "SELECT from_address, to_address FROM token_transfer LIMIT ?"
+        addresses = set()
+        async for row in session.iterate(query, (limit,)):
+            if row.from_address and row.from_address.lower() not in addresses:
+                addresses.add(row.from_address.lower())
+            if row.to_address and row.to_address.lower() not in addresses:
+                addresses.add(row.to_address.lower())
+        return list(addresses)
     
     async def build_graph_from_mongodb(
         self, 
@@ -182,678 +309,66 @@ class GraphService:
         """Build Neo4j graph from data fetched by QueryService based on provided schema"""
         logger.info(f"Starting build_graph_from_mongodb with wallet_address={wallet_address}, chain_id={chain_id}, limit={limit}")
         try:
-            driver = self.db_manager.get_neo4j_driver()
-            
-            chain_id = chain_id or "0x1"
-            # Fetch data from QueryService
-            data = await self.query_service.get_wallet_graph_data(
-                wallet_address=wallet_address,
-                chain_id=chain_id,
-                limit=limit
-            )
-            logger.info("Fetched data from QueryService successfully")
-            
-            # Extract contract_addresses for PART_OF relationships
-            contract_addresses = [contract["address"] for contract in data["contracts"]]
-            logger.debug(f"Extracted {len(contract_addresses)} contract addresses: {contract_addresses[:5]}")
-            
-            # Build graph components
-            stats = {
-                "projects_created": 0,
-                "wallets_created": 0,
-                "contracts_created": 0,
-                "tokens_created": 0,
-                "tweet_users_created": 0,
-                "tweets_created": 0,
-                "hashtags_created": 0,
-                "relationships_created": 0
-            }
-            
-            # Create nodes
-            stats["projects_created"] = await self._create_project_nodes(data["projects"])
-            stats["wallets_created"] = await self._create_wallet_nodes(data["wallets"], chain_id)
-            stats["contracts_created"] = await self._create_contract_nodes(data["contracts"], chain_id)
-            stats["tokens_created"] = await self._create_token_nodes(data["contracts"], chain_id)
-            stats["tweet_users_created"] = await self._create_tweet_user_nodes(data["twitter_users"])
-            stats["tweets_created"] = await self._create_tweet_nodes(data["tweets"])
-            stats["hashtags_created"] = await self._create_hashtag_nodes(data["tweets"])
-            
-            # Create relationships
-            stats["relationships_created"] += await self._create_lending_event_relationships(data["lending_events"], chain_id)
-            stats["relationships_created"] += await self._create_transferred_to_relationships(data["token_transfers"], chain_id)
-            stats["relationships_created"] += await self._create_liquidated_by_relationships(data["liquidations"], chain_id)
-            stats["relationships_created"] += await self._create_part_of_relationships(data["projects"], chain_id, contract_addresses)
-            stats["relationships_created"] += await self._create_has_account_relationships(data["project_social"])
-            stats["relationships_created"] += await self._create_tweet_relationships(data["tweets"], data["twitter_users"])
-            
-            logger.info(f"Graph built successfully with stats: {stats}")
-            return {
-                "status": "success",
-                "message": "Graph built successfully from QueryService data",
-                "stats": stats
-            }
-            
+            return await self._build_wallet_graph(wallet_address, chain_id, limit)
         except Exception as e:
             logger.error(f"Error building graph: {str(e)}", exc_info=True)
             return {
                 "status": "error",
                 "message": f"Error building graph: {str(e)}"
             }
-    
-    async def _create_project_nodes(self, projects: List[Dict]) -> int:
-        logger.debug(f"Creating or updating project nodes for {len(projects)} projects")
-        try:
-            driver = self.db_manager.get_neo4j_driver()
-            count = 0
-            
-            for project in projects:
-                project_id = str(project["_id"])
-                # Ensure contractAddresses and tokenAddresses are dictionaries
-                contract_addresses = project.get("contractAddresses", {})
-                token_addresses = project.get("tokenAddresses", {})
-                deployed_chains = project.get("deployedChains", [])  # Ensure it's a list
-                if not isinstance(deployed_chains, list):
-                    deployed_chains = [deployed_chains] if deployed_chains else []
-                
-                async with driver.session() as session:
-                    await session.run("""
-                        MERGE (p:Project {id: $id})
-                        SET p += {
-                            name: $name,
-                            tvl: $tvl,
-                            category: $category,
-                            deployedChains: $deployedChains,
-                            contractAddresses: $contractAddresses,
-                            tokenAddresses: $tokenAddresses,
-                            twitterId: $twitterId
-                        }
-                    """,
-                    id=project_id,
-                    name=project.get("name", ""),
-                    tvl=project.get("tvl", 0.0),
-                    category=project.get("category", ""),
-                    deployedChains=deployed_chains,
-                    contractAddresses=json.dumps(contract_addresses),  # Serialize to string
-                    tokenAddresses=json.dumps(token_addresses),  # Serialize to string
-                    twitterId=project.get("socialAccounts", {}).get("twitter", {}).get("id", "")
-                    )
-                count += 1
-            
-            logger.info(f"Processed {count} project nodes")
-            if count > 0:
-                logger.debug(f"Sample project node: {projects[0]}")
-            return count
-        except Exception as e:
-            logger.error(f"Error creating or updating project nodes: {e}", exc_info=True)
-            return 0
-
-    async def _create_wallet_nodes(self, wallets: List[Dict], chain_id: str) -> int:
-        """Create or update Wallet nodes using MERGE to avoid duplicates"""
-        logger.debug(f"Creating or updating wallet nodes for {len(wallets)} wallets")
-        try:
-            driver = self.db_manager.get_neo4j_driver()
-            count = 0
-            
-            for wallet in wallets:
-                wallet_id = f"{chain_id}_{wallet['address']}"
-                # Serialize dictionary properties to JSON strings
-                balance_change_logs = json.dumps(wallet.get("balanceChangeLogs", []))
-                deposit_change_logs = json.dumps(wallet.get("depositChangeLogs", []))
-                borrow_change_logs = json.dumps(wallet.get("borrowChangeLogs", []))
-                daily_all_transactions = json.dumps(wallet.get("dailyAllTransactions", {}))
-                daily_number_of_transactions = json.dumps(wallet.get("dailyNumberOfTransactions", {}))
-                daily_transaction_amounts = json.dumps(wallet.get("dailyTransactionAmounts", {}))
-                
-                async with driver.session() as session:
-                    await session.run("""
-                        MERGE (w:Wallet {id: $id})
-                        SET w += {
-                            address: $address,
-                            chainId: $chainId,
-                            balanceInUSD: $balanceInUSD,
-                            balanceChangeLogs: $balanceChangeLogs,
-                            depositInUSD: $depositInUSD,
-                            depositChangeLogs: $depositChangeLogs,
-                            borrowInUSD: $borrowInUSD,
-                            borrowChangeLogs: $borrowChangeLogs,
-                            dailyAllTransactions: $dailyAllTransactions,
-                            dailyNumberOfTransactions: $dailyNumberOfTransactions,
-                            dailyTransactionAmounts: $dailyTransactionAmounts,
-                            numberOfLiquidation: $numberOfLiquidation,
-                            totalValueOfLiquidation: $totalValueOfLiquidation
-                        }
-                    """,
-                    id=wallet_id,
-                    address=wallet.get("address", ""),
-                    chainId=wallet.get("chainId", chain_id),
-                    balanceInUSD=wallet.get("balanceInUSD", 0.0),
-                    balanceChangeLogs=balance_change_logs,
-                    depositInUSD=wallet.get("depositInUSD", 0.0),
-                    depositChangeLogs=deposit_change_logs,
-                    borrowInUSD=wallet.get("borrowInUSD", 0.0),
-                    borrowChangeLogs=borrow_change_logs,
-                    dailyAllTransactions=daily_all_transactions,
-                    dailyNumberOfTransactions=daily_number_of_transactions,
-                    dailyTransactionAmounts=daily_transaction_amounts,
-                    numberOfLiquidation=wallet.get("numberOfLiquidation", 0),
-                    totalValueOfLiquidation=wallet.get("totalValueOfLiquidation", 0.0)
-                    )
-                count += 1
-            
-            logger.info(f"Processed {count} wallet nodes")
-            if count > 0:
-                logger.debug(f"Sample wallet node: {wallets[0]}")
-            return count
-        except Exception as e:
-            logger.error(f"Error creating or updating wallet nodes: {e}", exc_info=True)
-            return 0
 
-    async def _create_contract_nodes(self, contracts: List[Dict], chain_id: str) -> int:
-        """Create or update Contract nodes using MERGE to avoid duplicates"""
-        logger.debug(f"Creating or updating contract nodes for {len(contracts)} contracts")
-        try:
-            driver = self.db_manager.get_neo4j_driver()
-            count = 0
-            
-            for contract in contracts:
-                contract_id = f"{chain_id}_{contract['address']}"
-                async with driver.session() as session:
-                    await session.run("""
-                        MERGE (c:Contract {id: $id})
-                        SET c += {
-                            address: $address,
-                            chainId: $chainId,
-                            tags: $tags,
-                            numberOfDailyCalls: $numberOfDailyCalls,
-                            numberOfDailyActiveUsers: $numberOfDailyActiveUsers
-                        }
-                    """,
-                    id=contract_id,
-                    address=contract.get("address", ""),
-                    chainId=chain_id,
-                    tags=contract.get("tags", []),
-                    numberOfDailyCalls=contract.get("numberOfDailyCalls", 0),
-                    numberOfDailyActiveUsers=contract.get("numberOfDailyActiveUsers", 0)
-                    )
-                count += 1
-            
-            logger.info(f"Processed {count} contract nodes")
-            if count > 0:
-                logger.debug(f"Sample contract node: {contracts[0]}")
-            return count
-        except Exception as e:
-            logger.error(f"Error creating or updating contract nodes: {e}", exc_info=True)
-            return 0
-
-    async def _create_token_nodes(self, contracts: List[Dict], chain_id: str) -> int:
-        """Create or update Token nodes from contracts with tag 'token' using MERGE to avoid duplicates"""
-        logger.debug(f"Creating or updating token nodes from {len(contracts)} contracts")
-        try:
-            driver = self.db_manager.get_neo4j_driver()
-            count = 0
-            
-            for contract in contracts:
-                if "token" in contract.get("tags", []):
-                    token_id = f"{chain_id}_{contract['address']}"
-                    # Serialize dictionary properties
-                    price_change_logs = json.dumps(contract.get("priceChangeLogs", {}))
-                    async with driver.session() as session:
-                        await session.run("""
-                            MERGE (t:Token {id: $id})
-                            SET t += {
-                                address: $address,
-                                chainId: $chainId,
-                                symbol: $symbol,
-                                decimals: $decimals,
-                                price: $price,
-                                marketCap: $marketCap,
-                                tradingVolume: $tradingVolume,
-                                priceChangeLogs: $priceChangeLogs
-                            }
-                        """,
-                        id=token_id,
-                        address=contract.get("address", ""),
-                        chainId=chain_id,
-                        symbol=contract.get("symbol", ""),
-                        decimals=contract.get("decimals", 18),
-                        price=contract.get("price", 0.0),
-                        marketCap=contract.get("marketCap", ""),
-                        tradingVolume=contract.get("tradingVolume", "0"),
-                        priceChangeLogs=price_change_logs
-                        )
-                    count += 1
-            
-            logger.info(f"Processed {count} token nodes")
-            if count > 0:
-                logger.debug(f"Sample token node: {contracts[0]}")
-            return count
-        except Exception as e:
-            logger.error(f"Error creating or updating token nodes: {e}", exc_info=True)
-            return 0
+    async def _build_wallet_graph(
+        self,
+        wallet_address: Optional[str],
+        chain_id: str,
+        limit: int
+    ) -> Dict[str, Any]:
+        """Same as build_graph_from_mongodb but lets errors propagate so callers can retry them"""
+        self.db_manager.get_neo4j_driver()  # Fail fast if Neo4j is not connected
 
-    async def _create_tweet_user_nodes(self, twitter_users: List[Dict]) -> int:
-        """Create or update TweetUser nodes using MERGE to avoid duplicates"""
-        logger.debug(f"Creating or updating tweet user nodes for {len(twitter_users)} users")
-        try:
-            driver = self.db_manager.get_neo4j_driver()
-            count = 0
-            
-            for user in twitter_users:
-                user_id = str(user["_id"])
-                async with driver.session() as session:
-                    await session.run("""
-                        MERGE (u:TweetUser {id: $id})
-                        SET u += {
-                            userName: $userName,
-                            followersCount: $followersCount,
-                            favouritesCount: $favouritesCount,
-                            friendsCount: $friendsCount,
-                            statusesCount: $statusesCount,
-                            verified: $verified
-                        }
-                    """,
-                    id=user_id,
-                    userName=user.get("userName", ""),
-                    followersCount=user.get("followersCount", 0),
-                    favouritesCount=user.get("favouritesCount", 0),
-                    friendsCount=user.get("friendsCount", 0),
-                    statusesCount=user.get("statusesCount", 0),
-                    verified=user.get("verified", False)
-                    )
-                count += 1
-            
-            logger.info(f"Processed {count} tweet user nodes")
-            if count > 0:
-                logger.debug(f"Sample tweet user node: {twitter_users[0]}")
-            return count
-        except Exception as e:
-            logger.error(f"Error creating or updating tweet user nodes: {e}", exc_info=True)
-            return 0
+        chain_id = chain_id or "0x1"
+        # Fetch data from QueryService
+        data = await self.query_service.get_wallet_graph_data(
+            wallet_address=wallet_address,
+            chain_id=chain_id,
+            limit=limit,
+            raise_errors=True
+        )
+        logger.info("Fetched data from QueryService successfully")
+        
+        # Extract contract_addresses for PART_OF relationships
+        contract_addresses = [contract["address"] for contract in data["contracts"]]
+        logger.debug(f"Extracted {len(contract_addresses)} contract addresses: {contract_addresses[:5]}")
+        
+        # Build graph components
+        stats = {
+            "projects_created": 0,
+            "wallets_created": 0,
+            "contracts_created": 0,
+            "tokens_created": 0,
+            "tweet_users_created": 0,
+            "tweets_created": 0,
+            "hashtags_created": 0,
+            "lending_event_relationships_created": 0,
+            "transferred_to_relationships_created": 0,
+            "liquidated_by_relationships_created": 0,
+            "part_of_relationships_created": 0,
+            "has_account_relationships_created": 0,
+            "tweet_relationships_created": 0,
+            "relationships_created": 0
+        }
 
-    async def _create_tweet_nodes(self, tweets: List[Dict]) -> int:
-        """Create or update Tweet nodes using MERGE to avoid duplicates"""
-        logger.debug(f"Creating or updating tweet nodes for {len(tweets)} tweets")
-        try:
-            driver = self.db_manager.get_neo4j_driver()
-            count = 0
-            
-            for tweet in tweets:
-                tweet_id = str(tweet["id"])
-                async with driver.session() as session:
-                    await session.run("""
-                        MERGE (t:Tweet {id: $id})
-                        SET t += {
-                            authorName: $authorName,
-                            timestamp: $timestamp,
-                            likes: $likes,
-                            retweetCounts: $retweetCounts,
-                            replyCounts: $replyCounts,
-                            hashTags: $hashTags
-                        }
-                    """,
-                    id=tweet_id,
-                    authorName=tweet.get("authorName", ""),
-                    timestamp=tweet.get("timestamp", 0),
-                    likes=tweet.get("likes", 0),
-                    retweetCounts=tweet.get("retweetCounts", 0),
-                    replyCounts=tweet.get("replyCounts", 0),
-                    hashTags=tweet.get("hashTags", [])
-                    )
-                count += 1
-            
-            logger.info(f"Processed {count} tweet nodes")
-            if count > 0:
-                logger.debug(f"Sample tweet node: {tweets[0]}")
-            return count
-        except Exception as e:
-            logger.error(f"Error creating or updating tweet nodes: {e}", exc_info=True)
-            return 0
+        # Create nodes and relationships with batched UNWIND writes
+        stats.update(await self.graph_writer.write_wallet_graph(data, chain_id, contract_addresses))
+        stats["relationships_created"] = sum(
+            count for key, count in stats.items()
+            if key.endswith("_relationships_created")
+        )
+        
+        logger.info(f"Graph built successfully with stats: {stats}")
+        return {
+            "status": "success",
+            "message": "Graph built successfully from QueryService data",
+            "stats": stats
+        }
 
-    async def _create_hashtag_nodes(self, tweets: List[Dict]) -> int:
-        """Create or update Hashtag nodes from tweet hashtags using MERGE to avoid duplicates"""
-        logger.debug(f"Creating or updating hashtag nodes from {len(tweets)} tweets")
-        try:
-            driver = self.db_manager.get_neo4j_driver()
-            count = 0
-            hashtags_set = set()
-            
-            for tweet in tweets:
-                hashtags = tweet.get("hashTags", []) or []
-                for hashtag in hashtags:
-                    hashtags_set.add(hashtag)
-            
-            for hashtag in hashtags_set:
-                async with driver.session() as session:
-                    await session.run("""
-                        MERGE (h:Hashtag {id: $id})
-                        SET h += {
-                            tag: $tag
-                        }
-                    """,
-                    id=hashtag,
-                    tag=hashtag
-                    )
-                count += 1
-            
-            logger.info(f"Processed {count} hashtag nodes")
-            if count > 0:
-                logger.debug(f"Sample hashtag node: {list(hashtags_set)[0]}")
-            return count
-        except Exception as e:
-            logger.error(f"Error creating or updating hashtag nodes: {e}", exc_info=True)
-            return 0
-    
-    async def _create_lending_event_relationships(self, lending_events: List[Dict], chain_id: str) -> int:
-        """Create DEPOSITED, BORROWED, REPAID, WITHDREW relationships"""
-        logger.debug(f"Creating lending event relationships for {len(lending_events)} events")
-        try:
-            driver = self.db_manager.get_neo4j_driver()
-            count = 0
-            
-            for event in lending_events:
-                event_id = str(event.get("_id", ""))
-                wallet_id = f"{chain_id}_{event['wallet']}"
-                contract_id = f"{chain_id}_{event['contract_address']}"
-                event_type = event.get("event_type", "").upper()
-                
-                if event_type in ["DEPOSIT", "BORROW", "REPAY", "WITHDRAW"]:
-                    edge_label = {
-                        "DEPOSIT": "DEPOSITED",
-                        "BORROW": "BORROWED",
-                        "REPAY": "REPAID",
-                        "WITHDRAW": "WITHDREW"
-                    }[event_type]
-                    
-                    async with driver.session() as session:
-                        result = await session.run(f"""
-                            MATCH (w:Wallet {{id: $wallet_id}})
-                            MATCH (c:Contract {{id: $contract_id}})
-                            MERGE (w)-[r:{edge_label} {{_id: $event_id}}]->(c)
-                            SET r += {{
-                                amount: $amount,
-                                timestamp: $timestamp
-                            }}
-                            RETURN COUNT(*) as created
-                        """,
-                        wallet_id=wallet_id,
-                        contract_id=contract_id,
-                        event_id=event_id,
-                        amount=event.get("amount", 0.0),
-                        timestamp=event.get("block_timestamp", 0)
-                        )
-                        record = await result.single()
-                        if record and record["created"] > 0:
-                            count += 1
-            
-            logger.info(f"Created {count} lending event relationships")
-            if count > 0:
-                logger.debug(f"Sample lending event relationship: {lending_events[0]}")
-            return count
-        except Exception as e:
-            logger.error(f"Error creating lending event relationships: {e}", exc_info=True)
-            return 0
-    
-    async def _create_transferred_to_relationships(self, token_transfers: List[Dict], chain_id: str) -> int:
-        """Create TRANSFERRED_TO relationships"""
-        logger.debug(f"Creating TRANSFERRED_TO relationships for {len(token_transfers)} transfers")
-        try:
-            driver = self.db_manager.get_neo4j_driver()
-            count = 0
-            
-            for transfer in token_transfers:
-                transfer_id = f"{transfer['block_number']}_{transfer['contract_address']}_{transfer['log_index']}_{transfer['bucket_id']}"
-                from_wallet_id = f"{chain_id}_{transfer['from_address']}"
-                to_wallet_id = f"{chain_id}_{transfer['to_address']}"
-                async with driver.session() as session:
-                    result = await session.run("""
-                        MATCH (w1:Wallet {id: $from_wallet_id})
-                        MATCH (w2:Wallet {id: $to_wallet_id})
-                        MERGE (w1)-[r:TRANSFERRED_TO {id: $transfer_id}]->(w2)
-                        SET r.value = $value,
-                            r.block_number = $block_number,
-                            r.contract_address = $contract_address,
-                            r.log_index = $log_index,
-                            r.bucket_id = $bucket_id
-                        RETURN COUNT(*) as created
-                    """,
-                        from_wallet_id=from_wallet_id,
-                        to_wallet_id=to_wallet_id,
-                        transfer_id=transfer_id,
-                        value=transfer.get("value", "0"),
-                        block_number=transfer.get("block_number", 0),
-                        contract_address=transfer.get("contract_address", ""),
-                        log_index=transfer.get("log_index", 0),
-                        bucket_id=transfer.get("bucket_id", 0)
-                    )
-                    record = await result.single()
-                    if record and record["created"] > 0:
-                        count += 1
-            
-            logger.info(f"Created {count} TRANSFERRED_TO relationships")
-            if count > 0:
-                logger.debug(f"Sample TRANSFERRED_TO relationship: {token_transfers[0]}")
-            return count
-        except Exception as e:
-            logger.error(f"Error creating TRANSFERRED_TO relationships: {e}", exc_info=True)
-            return 0
-    
-    async def _create_liquidated_by_relationships(self, liquidations: List[Dict], chain_id: str) -> int:
-        """Create LIQUIDATED_BY relationships"""
-        logger.debug(f"Creating LIQUIDATED_BY relationships for {len(liquidations)} liquidations")
-        try:
-            driver = self.db_manager.get_neo4j_driver()
-            count = 0
-            
-            for liquidation in liquidations:
-                liquidation_id = str(liquidation.get("_id", ""))
-                liquidated_wallet_id = f"{chain_id}_{liquidation['liquidatedWallet']}"
-                debt_buyer_wallet_id = f"{chain_id}_{liquidation['debtBuyerWallet']}"
-                liquidation_logs = json.dumps(liquidation.get("liquidationLogs", []))
-                async with driver.session() as session:
-                    result = await session.run("""
-                        MATCH (w1:Wallet {id: $liquidated_wallet_id})
-                        MATCH (w2:Wallet {id: $debt_buyer_wallet_id})
-                        MERGE (w1)-[r:LIQUIDATED_BY {_id: $liquidation_id}]->(w2)
-                        SET r += {
-                            liquidationLogs: $liquidationLogs
-                        }
-                        RETURN COUNT(*) as created
-                    """,
-                    liquidated_wallet_id=liquidated_wallet_id,
-                    debt_buyer_wallet_id=debt_buyer_wallet_id,
-                    liquidation_id=liquidation_id,
-                    liquidationLogs=liquidation_logs
-                    )
-                    record = await result.single()
-                    if record and record["created"] > 0:
-                        count += 1
-            
-            logger.info(f"Created {count} LIQUIDATED_BY relationships")
-            if count > 0:
-                logger.debug(f"Sample LIQUIDATED_BY relationship: {liquidations[0]}")
-            return count
-        except Exception as e:
-            logger.error(f"Error creating LIQUIDATED_BY relationships: {e}", exc_info=True)
-            return 0
-    
-    async def _create_part_of_relationships(self, projects: List[Dict], chain_id: str, contract_addresses: List[str] = None) -> int:
-        """Create PART_OF relationships for contracts and tokens, matching QueryService's project_query logic"""
-        logger.debug(f"Creating PART_OF relationships for {len(projects)} projects with chain_id={chain_id}")
-        try:
-            driver = self.db_manager.get_neo4j_driver()
-            count = 0
-            
-            # Prepare contract_addresses set for matching (mimics $or query)
-            contract_addresses_set = set(contract_addresses or [])
-            logger.debug(f"Matching against {len(contract_addresses_set)} contract addresses: {list(contract_addresses_set)[:5]}")
-            
-            # Collect relationships for batch processing
-            contract_rels = []
-            token_rels = []
-            
-            for project in projects:
-                project_id = str(project["_id"])
-                # Use contractAddresses and tokenAddresses directly as dictionaries
-                contract_addresses_dict = project.get("contractAddresses", {})
-                token_addresses_dict = project.get("tokenAddresses", {})
-                
-                # Contract -> Project (match QueryService's $or logic)
-                for contract_key, value in contract_addresses_dict.items():
-                    if "_" in contract_key:
-                        contract_chain_id, address = contract_key.split("_", 1)
-                        if contract_chain_id == chain_id and (not contract_addresses_set or address in contract_addresses_set):
-                            contract_id = f"{chain_id}_{address}"
-                            contract_rels.append({"contract_id": contract_id, "project_id": project_id})
-                            logger.debug(f"Found Contract match: contract_id={contract_id}, project_id={project_id}")
-                
-                # Token -> Project
-                for token_key, value in token_addresses_dict.items():
-                    if "_" in token_key:
-                        token_chain_id, address = token_key.split("_", 1)
-                        if token_chain_id == chain_id:
-                            token_id = f"{chain_id}_{address}"
-                            token_rels.append({"token_id": token_id, "project_id": project_id})
-                            logger.debug(f"Found Token match: token_id={token_id}, project_id={project_id}")
-            
-            # Batch create Contract -> Project relationships
-            if contract_rels:
-                async with driver.session() as session:
-                    result = await session.run("""
-                        UNWIND $rels AS rel
-                        MATCH (c:Contract {id: rel.contract_id})
-                        MATCH (p:Project {id: rel.project_id})
-                        MERGE (c)-[:PART_OF]->(p)
-                        RETURN count(*) AS created
-                    """, rels=contract_rels)
-                    record = await result.single()
-                    created = record["created"]
-                    count += created
-                    logger.debug(f"Created {created} Contract->Project relationships")
-                    if created == 0:
-                        logger.warning("No Contract->Project relationships created, check contract_addresses")
-            
-            # Batch create Token -> Project relationships
-            if token_rels:
-                async with driver.session() as session:
-                    result = await session.run("""
-                        UNWIND $rels AS rel
-                        MATCH (t:Token {id: rel.token_id})
-                        MATCH (p:Project {id: rel.project_id})
-                        MERGE (t)-[:PART_OF]->(p)
-                        RETURN count(*) AS created
-                    """, rels=token_rels)
-                    record = await result.single()
-                    created = record["created"]
-                    count += created
-                    logger.debug(f"Created {created} Token->Project relationships")
-                    if created == 0:
-                        logger.warning("No Token->Project relationships created, check token_addresses")
-            
-            logger.info(f"Created {count} PART_OF relationships")
-            if count > 0 and projects:
-                logger.debug(f"Sample contractAddresses: {projects[0].get('contractAddresses', '{}')}")
-            elif count == 0:
-                logger.debug("No PART_OF relationships created. Check contract_addresses, project data, or Contract/Token nodes")
-            
-            return count
-        except Exception as e:
-            logger.error(f"Error creating PART_OF relationships: {e}", exc_info=True)
-            return 0
-    
-    async def _create_has_account_relationships(self, project_social: List[Dict]) -> int:
-        """Create HAS_ACCOUNT relationships"""
-        logger.debug(f"Creating HAS_ACCOUNT relationships for {len(project_social)} social records")
-        try:
-            driver = self.db_manager.get_neo4j_driver()
-            count = 0
-            
-            for social in project_social:
-                project_id = str(social["_id"])
-                twitter_id = social.get("twitter", {}).get("id", "")
-                if twitter_id:
-                    async with driver.session() as session:
-                        result = await session.run("""
-                            MATCH (p:Project {id: $project_id})
-                            MATCH (u:TweetUser {userName: $twitter_id})
-                            MERGE (p)-[:HAS_ACCOUNT]->(u)
-                            RETURN count(*) as created
-                        """,
-                        project_id=project_id,
-                        twitter_id=twitter_id
-                        )
-                        record = await result.single()
-                        if record and record["created"] > 0:
-                            count += 1
-            
-            logger.info(f"Created {count} HAS_ACCOUNT relationships")
-            if count > 0:
-                logger.debug(f"Sample HAS_ACCOUNT: {project_social[0]}")
-            return count
-        except Exception as e:
-            logger.error(f"Error creating HAS_ACCOUNT relationships: {e}", exc_info=True)
-            return 0
-    
-    async def _create_tweet_relationships(self, tweets: List[Dict], twitter_users: List[Dict]) -> int:
-        """Create TWEETED and MENTIONS relationships"""
-        logger.debug(f"Creating tweet relationships for {len(tweets)} tweets")
-        try:
-            driver = self.db_manager.get_neo4j_driver()
-            count = 0
-            
-            # Map userName to user _id
-            user_map = {user["userName"]: str(user["_id"]) for user in twitter_users}
-            
-            for tweet in tweets:
-                tweet_id = str(tweet["id"])
-                author_name = tweet.get("authorName", "")
-                
-                # TWEETED
-                if author_name in user_map:
-                    author_id = user_map[author_name]
-                    async with driver.session() as session:
-                        result = await session.run("""
-                            MATCH (u:TweetUser {id: $author_id})
-                            MATCH (t:Tweet {id: $tweet_id})
-                            MERGE (u)-[:TWEETED {
-                                timestamp: $timestamp,
-                                likes: $likes,
-                                retweetCounts: $retweetCounts,
-                                replyCounts: $replyCounts
-                            }]->(t)
-                            RETURN count(*) as created
-                        """,
-                        author_id=author_id,
-                        tweet_id=tweet_id,
-                        timestamp=tweet.get("timestamp", 0),
-                        likes=tweet.get("likes", 0),
-                        retweetCounts=tweet.get("retweetCounts", 0),
-                        replyCounts=tweet.get("replyCounts", 0)
-                        )
-                        record = await result.single()
-                        if record and record["created"] > 0:
-                            count += 1
-                
-                # MENTIONS
-                hashtags = tweet.get("hashTags", []) or []
-                for hashtag in hashtags:
-                    async with driver.session() as session:
-                        result = await session.run("""
-                            MATCH (t:Tweet {id: $tweet_id})
-                            MATCH (h:Hashtag {id: $hashtag})
-                            MERGE (t)-[:MENTIONS]->(h)
-                            RETURN count(*) as created
-                        """,
-                        tweet_id=tweet_id,
-                        hashtag=hashtag
-                        )
-                        record = await result.single()
-                        if record and record["created"] > 0:
-                            count += 1
-            
-            logger.info(f"Created {count} tweet relationships (TWEETED and MENTIONS)")
-            if count > 0:
-                logger.debug(f"Sample tweet relationship: {tweets[0]}")
-            return count
-        except Exception as e:
-            logger.error(f"Error creating tweet relationships: {e}", exc_info=True)
-            return 0
\ No newline at end of file
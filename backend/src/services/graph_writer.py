@@ -0,0 +1,568 @@
+from typing import Optional, List, Dict, Any, Tuple
+from src.core.database import DatabaseManager
+import logging
+import json
+import os
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+handler = logging.StreamHandler()
+formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
+handler.setFormatter(formatter)
+if not logger.handlers:
+    logger.addHandler(handler)
+
+DEFAULT_BATCH_SIZE = int(os.getenv("NEO4J_WRITE_BATCH_SIZE", 500))
+# "wallet": one write transaction for the whole wallet graph
+# "batch": one write transaction per UNWIND batch
+DEFAULT_TRANSACTION_SCOPE = os.getenv("NEO4J_WRITE_TRANSACTION_SCOPE", "wallet")
+
+LENDING_EDGE_LABELS = {
+    "DEPOSIT": "DEPOSITED",
+    "BORROW": "BORROWED",
+    "REPAY": "REPAID",
+    "WITHDRAW": "WITHDREW"
+}
+
+# Wallet and Project nodes get graphUpdatedAt = timestamp() (epoch ms) when they are created or a write
+# actually changes them: a property differs from the stored one, or one of their edges is new or has
+# different properties. The incremental wallet feature refresh in ai-service/wallet_feature_export.py
+# uses it as its watermark, so rebuilding unchanged data must not stamp it.
+PROJECT_NODES_QUERY = """
+    UNWIND $rows AS row
+    MERGE (p:Project {id: row.id})
+    WITH p, {
+        name: row.name,
+        tvl: row.tvl,
+        category: row.category,
+        deployedChains: row.deployedChains,
+        contractAddresses: row.contractAddresses,
+        tokenAddresses: row.tokenAddresses,
+        twitterId: row.twitterId
+    } AS props
+    WITH p, props, p.graphUpdatedAt IS NULL OR any(key IN keys(props) WHERE coalesce(p[key] <> props[key], p[key] IS NOT NULL OR props[key] IS NOT NULL)) AS changed
+    SET p += props
+    SET p.graphUpdatedAt = CASE WHEN changed THEN timestamp() ELSE p.graphUpdatedAt END
+    RETURN count(*) AS created
+"""
+
+WALLET_NODES_QUERY = """
+    UNWIND $rows AS row
+    MERGE (w:Wallet {id: row.id})
+    WITH w, {
+        address: row.address,
+        chainId: row.chainId,
+        balanceInUSD: row.balanceInUSD,
+        balanceChangeLogs: row.balanceChangeLogs,
+        depositInUSD: row.depositInUSD,
+        depositChangeLogs: row.depositChangeLogs,
+        borrowInUSD: row.borrowInUSD,
+        borrowChangeLogs: row.borrowChangeLogs,
+        dailyAllTransactions: row.dailyAllTransactions,
+        dailyNumberOfTransactions: row.dailyNumberOfTransactions,
+        dailyTransactionAmounts: row.dailyTransactionAmounts,
+        numberOfLiquidation: row.numberOfLiquidation,
+        totalValueOfLiquidation: row.totalValueOfLiquidation
+    } AS props
+    WITH w, props, w.graphUpdatedAt IS NULL OR any(key IN keys(props) WHERE coalesce(w[key] <> props[key], w[key] IS NOT NULL OR props[key] IS NOT NULL)) AS changed
+    SET w += props
+    SET w.graphUpdatedAt = CASE WHEN changed THEN timestamp() ELSE w.graphUpdatedAt END
+    RETURN count(*) AS created
+"""
+
+CONTRACT_NODES_QUERY = """
+    UNWIND $rows AS row
+    MERGE (c:Contract {id: row.id})
+    SET c += {
+        address: row.address,
+        chainId: row.chainId,
+        tags: row.tags,
+        numberOfDailyCalls: row.numberOfDailyCalls,
+        numberOfDailyActiveUsers: row.numberOfDailyActiveUsers
+    }
+    RETURN count(*) AS created
+"""
+
+TOKEN_NODES_QUERY = """
+    UNWIND $rows AS row
+    MERGE (t:Token {id: row.id})
+    SET t += {
+        address: row.address,
+        chainId: row.chainId,
+        symbol: row.symbol,
+        decimals: row.decimals,
+        price: row.price,
+        marketCap: row.marketCap,
+        tradingVolume: row.tradingVolume,
+        priceChangeLogs: row.priceChangeLogs
+    }
+    RETURN count(*) AS created
+"""
+
+TWEET_USER_NODES_QUERY = """
+    UNWIND $rows AS row
+    MERGE (u:TweetUser {id: row.id})
+    SET u += {
+        userName: row.userName,
+        followersCount: row.followersCount,
+        favouritesCount: row.favouritesCount,
+        friendsCount: row.friendsCount,
+        statusesCount: row.statusesCount,
+        verified: row.verified
+    }
+    RETURN count(*) AS created
+"""
+
+TWEET_NODES_QUERY = """
+    UNWIND $rows AS row
+    MERGE (t:Tweet {id: row.id})
+    SET t += {
+        authorName: row.authorName,
+        timestamp: row.timestamp,
+        likes: row.likes,
+        retweetCounts: row.retweetCounts,
+        replyCounts: row.replyCounts,
+        hashTags: row.hashTags
+    }
+    RETURN count(*) AS created
+"""
+
+HASHTAG_NODES_QUERY = """
+    UNWIND $rows AS row
+    MERGE (h:Hashtag {id: row.id})
+    SET h += {
+        tag: row.tag
+    }
+    RETURN count(*) AS created
+"""
+
+# Relationship labels cannot be parameterized, so one query per lending label
+LENDING_EVENT_RELATIONSHIPS_QUERY = """
+    UNWIND $rows AS row
+    MATCH (w:Wallet {{id: row.wallet_id}})
+    MATCH (c:Contract {{id: row.contract_id}})
+    MERGE (w)-[r:{edge_label} {{_id: row.event_id}}]->(c)
+    ON CREATE SET w.graphUpdatedAt = timestamp()
+    WITH w, r, {{
+        amount: row.amount,
+        timestamp: row.timestamp
+    }} AS props
+    WITH w, r, props, any(key IN keys(props) WHERE coalesce(r[key] <> props[key], r[key] IS NOT NULL OR props[key] IS NOT NULL)) AS changed
+    SET r += props
+    SET w.graphUpdatedAt = CASE WHEN changed THEN timestamp() ELSE w.graphUpdatedAt END
+    RETURN count(*) AS created
+"""
+
+TRANSFERRED_TO_RELATIONSHIPS_QUERY = """
+    UNWIND $rows AS row
+    MATCH (w1:Wallet {id: row.from_wallet_id})
+    MATCH (w2:Wallet {id: row.to_wallet_id})
+    MERGE (w1)-[r:TRANSFERRED_TO {id: row.transfer_id}]->(w2)
+    ON CREATE SET w1.graphUpdatedAt = timestamp(), w2.graphUpdatedAt = timestamp()
+    WITH w1, w2, r, {
+        value: row.value,
+        block_number: row.block_number,
+        contract_address: row.contract_address,
+        log_index: row.log_index,
+        bucket_id: row.bucket_id
+    } AS props
+    WITH w1, w2, r, props, any(key IN keys(props) WHERE coalesce(r[key] <> props[key], r[key] IS NOT NULL OR props[key] IS NOT NULL)) AS changed
+    SET r += props
+    SET w1.graphUpdatedAt = CASE WHEN changed THEN timestamp() ELSE w1.graphUpdatedAt END,
+        w2.graphUpdatedAt = CASE WHEN changed THEN timestamp() ELSE w2.graphUpdatedAt END
+    RETURN count(*) AS created
+"""
+
+LIQUIDATED_BY_RELATIONSHIPS_QUERY = """
+    UNWIND $rows AS row
+    MATCH (w1:Wallet {id: row.liquidated_wallet_id})
+    MATCH (w2:Wallet {id: row.debt_buyer_wallet_id})
+    MERGE (w1)-[r:LIQUIDATED_BY {_id: row.liquidation_id}]->(w2)
+    ON CREATE SET w1.graphUpdatedAt = timestamp(), w2.graphUpdatedAt = timestamp()
+    WITH w1, w2, r, {
+        liquidationLogs: row.liquidationLogs
+    } AS props
+    WITH w1, w2, r, props, any(key IN keys(props) WHERE coalesce(r[key] <> props[key], r[key] IS NOT NULL OR props[key] IS NOT NULL)) AS changed
+    SET r += props
+    SET w1.graphUpdatedAt = CASE WHEN changed THEN timestamp() ELSE w1.graphUpdatedAt END,
+        w2.graphUpdatedAt = CASE WHEN changed THEN timestamp() ELSE w2.graphUpdatedAt END
+    RETURN count(*) AS created
+"""
+
+CONTRACT_PART_OF_RELATIONSHIPS_QUERY = """
+    UNWIND $rows AS row
+    MATCH (c:Contract {id: row.contract_id})
+    MATCH (p:Project {id: row.project_id})
+    MERGE (c)-[:PART_OF]->(p)
+    ON CREATE SET p.graphUpdatedAt = timestamp()
+    RETURN count(*) AS created
+"""
+
+TOKEN_PART_OF_RELATIONSHIPS_QUERY = """
+    UNWIND $rows AS row
+    MATCH (t:Token {id: row.token_id})
+    MATCH (p:Project {id: row.project_id})
+    MERGE (t)-[:PART_OF]->(p)
+    ON CREATE SET p.graphUpdatedAt = timestamp()
+    RETURN count(*) AS created
+"""
+
+HAS_ACCOUNT_RELATIONSHIPS_QUERY = """
+    UNWIND $rows AS row
+    MATCH (p:Project {id: row.project_id})
+    MATCH (u:TweetUser {userName: row.twitter_id})
+    MERGE (p)-[:HAS_ACCOUNT]->(u)
+    ON CREATE SET p.graphUpdatedAt = timestamp()
+    RETURN count(*) AS created
+"""
+
+TWEETED_RELATIONSHIPS_QUERY = """
+    UNWIND $rows AS row
+    MATCH (u:TweetUser {id: row.author_id})
+    MATCH (t:Tweet {id: row.tweet_id})
+    MERGE (u)-[:TWEETED {
+        timestamp: row.timestamp,
+        likes: row.likes,
+        retweetCounts: row.retweetCounts,
+        replyCounts: row.replyCounts
+    }]->(t)
+    RETURN count(*) AS created
+"""
+
+MENTIONS_RELATIONSHIPS_QUERY = """
+    UNWIND $rows AS row
+    MATCH (t:Tweet {id: row.tweet_id})
+    MATCH (h:Hashtag {id: row.hashtag})
+    MERGE (t)-[:MENTIONS]->(h)
+    RETURN count(*) AS created
+"""
+
+# (stats key, cypher, rows) in write order: nodes first, then relationships
+WritePlan = List[Tuple[str, str, List[Dict[str, Any]]]]
+
+
+class GraphWriter:
+    """Write a wallet graph to Neo4j with one UNWIND query per node/relationship type and batch"""
+
+    def __init__(
+        self,
+        db_manager: DatabaseManager,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        transaction_scope: str = DEFAULT_TRANSACTION_SCOPE
+    ):
+        if batch_size < 1:
+            raise ValueError("batch_size must be >= 1")
+        if transaction_scope not in ("wallet", "batch"):
+            raise ValueError(f"Invalid transaction_scope: {transaction_scope}")
+        self.db_manager = db_manager
+        self.batch_size = batch_size
+        self.transaction_scope = transaction_scope
+
+    async def write_wallet_graph(
+        self,
+        data: Dict[str, List[Dict]],
+        chain_id: str,
+        contract_addresses: Optional[List[str]] = None
+    ) -> Dict[str, int]:
+        """Write all nodes and relationships of one QueryService result, return per-type counts"""
+        plan = self.build_write_plan(data, chain_id, contract_addresses)
+        stats = {stat_key: 0 for stat_key, _, _ in plan}
+        driver = self.db_manager.get_neo4j_driver()
+
+        async with driver.session() as session:
+            if self.transaction_scope == "wallet":
+                counts = await session.execute_write(self._write_plan, plan)
+                for stat_key, created in counts:
+                    stats[stat_key] += created
+            else:
+                for stat_key, query, rows in plan:
+                    for batch in self._batches(rows):
+                        stats[stat_key] += await session.execute_write(self._write_batch, query, batch)
+
+        for stat_key, created in stats.items():
+            logger.info(f"Graph writer: {stat_key}={created}")
+        return stats
+
+    def build_write_plan(
+        self,
+        data: Dict[str, List[Dict]],
+        chain_id: str,
+        contract_addresses: Optional[List[str]] = None
+    ) -> WritePlan:
+        """Group QueryService data into UNWIND rows per node/relationship type"""
+        plan: WritePlan = [
+            ("projects_created", PROJECT_NODES_QUERY, _project_rows(data["projects"])),
+            ("wallets_created", WALLET_NODES_QUERY, _wallet_rows(data["wallets"], chain_id)),
+            ("contracts_created", CONTRACT_NODES_QUERY, _contract_rows(data["contracts"], chain_id)),
+            ("tokens_created", TOKEN_NODES_QUERY, _token_rows(data["contracts"], chain_id)),
+            ("tweet_users_created", TWEET_USER_NODES_QUERY, _tweet_user_rows(data["twitter_users"])),
+            ("tweets_created", TWEET_NODES_QUERY, _tweet_rows(data["tweets"])),
+            ("hashtags_created", HASHTAG_NODES_QUERY, _hashtag_rows(data["tweets"])),
+        ]
+
+        for edge_label, rows in _lending_event_rows(data["lending_events"], chain_id).items():
+            plan.append((
+                "lending_event_relationships_created",
+                LENDING_EVENT_RELATIONSHIPS_QUERY.format(edge_label=edge_label),
+                rows
+            ))
+        plan.append((
+            "transferred_to_relationships_created",
+            TRANSFERRED_TO_RELATIONSHIPS_QUERY,
+            _transferred_to_rows(data["token_transfers"], chain_id)
+        ))
+        plan.append((
+            "liquidated_by_relationships_created",
+            LIQUIDATED_BY_RELATIONSHIPS_QUERY,
+            _liquidated_by_rows(data["liquidations"], chain_id)
+        ))
+        contract_rels, token_rels = _part_of_rows(data["projects"], chain_id, contract_addresses)
+        plan.append(("part_of_relationships_created", CONTRACT_PART_OF_RELATIONSHIPS_QUERY, contract_rels))
+        plan.append(("part_of_relationships_created", TOKEN_PART_OF_RELATIONSHIPS_QUERY, token_rels))
+        plan.append((
+            "has_account_relationships_created",
+            HAS_ACCOUNT_RELATIONSHIPS_QUERY,
+            _has_account_rows(data["project_social"])
+        ))
+        tweeted_rels, mention_rels = _tweet_relationship_rows(data["tweets"], data["twitter_users"])
+        plan.append(("tweet_relationships_created", TWEETED_RELATIONSHIPS_QUERY, tweeted_rels))
+        plan.append(("tweet_relationships_created", MENTIONS_RELATIONSHIPS_QUERY, mention_rels))
+        return plan
+
+    async def _write_plan(self, tx, plan: WritePlan) -> List[Tuple[str, int]]:
+        counts = []
+        for stat_key, query, rows in plan:
+            for batch in self._batches(rows):
+                counts.append((stat_key, await self._write_batch(tx, query, batch)))
+        return counts
+
+    @staticmethod
+    async def _write_batch(tx, query: str, rows: List[Dict[str, Any]]) -> int:
+        result = await tx.run(query, rows=rows)
+        record = await result.single()
+        return record["created"] if record else 0
+
+    def _batches(self, rows: List[Dict[str, Any]]):
+        for start in range(0, len(rows), self.batch_size):
+            yield rows[start:start + self.batch_size]
+
+
+def _project_rows(projects: List[Dict]) -> List[Dict[str, Any]]:
+    rows = []
+    for project in projects:
+        deployed_chains = project.get("deployedChains", [])  # Ensure it's a list
+        if not isinstance(deployed_chains, list):
+            deployed_chains = [deployed_chains] if deployed_chains else []
+        rows.append({
+            "id": str(project["_id"]),
+            "name": project.get("name", ""),
+            "tvl": project.get("tvl", 0.0),
+            "category": project.get("category", ""),
+            "deployedChains": deployed_chains,
+            "contractAddresses": json.dumps(project.get("contractAddresses", {})),  # Serialize to string
+            "tokenAddresses": json.dumps(project.get("tokenAddresses", {})),  # Serialize to string
+            "twitterId": project.get("socialAccounts", {}).get("twitter", {}).get("id", "")
+        })
+    return rows
+
+
+def _wallet_rows(wallets: List[Dict], chain_id: str) -> List[Dict[str, Any]]:
+    return [
+        {
+            "id": f"{chain_id}_{wallet['address']}",
+            "address": wallet.get("address", ""),
+            "chainId": wallet.get("chainId", chain_id),
+            "balanceInUSD": wallet.get("balanceInUSD", 0.0),
+            # Serialize dictionary properties to JSON strings
+            "balanceChangeLogs": json.dumps(wallet.get("balanceChangeLogs", [])),
+            "depositInUSD": wallet.get("depositInUSD", 0.0),
+            "depositChangeLogs": json.dumps(wallet.get("depositChangeLogs", [])),
+            "borrowInUSD": wallet.get("borrowInUSD", 0.0),
+            "borrowChangeLogs": json.dumps(wallet.get("borrowChangeLogs", [])),
+            "dailyAllTransactions": json.dumps(wallet.get("dailyAllTransactions", {})),
+            "dailyNumberOfTransactions": json.dumps(wallet.get("dailyNumberOfTransactions", {})),
+            "dailyTransactionAmounts": json.dumps(wallet.get("dailyTransactionAmounts", {})),
+            "numberOfLiquidation": wallet.get("numberOfLiquidation", 0),
+            "totalValueOfLiquidation": wallet.get("totalValueOfLiquidation", 0.0)
+        }
+        for wallet in wallets
+    ]
+
+
+def _contract_rows(contracts: List[Dict], chain_id: str) -> List[Dict[str, Any]]:
+    return [
+        {
+            "id": f"{chain_id}_{contract['address']}",
+            "address": contract.get("address", ""),
+            "chainId": chain_id,
+            "tags": contract.get("tags", []),
+            "numberOfDailyCalls": contract.get("numberOfDailyCalls", 0),
+            "numberOfDailyActiveUsers": contract.get("numberOfDailyActiveUsers", 0)
+        }
+        for contract in contracts
+    ]
+
+
+def _token_rows(contracts: List[Dict], chain_id: str) -> List[Dict[str, Any]]:
+    return [
+        {
+            "id": f"{chain_id}_{contract['address']}",
+            "address": contract.get("address", ""),
+            "chainId": chain_id,
+            "symbol": contract.get("symbol", ""),
+            "decimals": contract.get("decimals", 18),
+            "price": contract.get("price", 0.0),
+            "marketCap": contract.get("marketCap", ""),
+            "tradingVolume": contract.get("tradingVolume", "0"),
+            "priceChangeLogs": json.dumps(contract.get("priceChangeLogs", {}))
+        }
+        for contract in contracts
+        if "token" in contract.get("tags", [])
+    ]
+
+
+def _tweet_user_rows(twitter_users: List[Dict]) -> List[Dict[str, Any]]:
+    return [
+        {
+            "id": str(user["_id"]),
+            "userName": user.get("userName", ""),
+            "followersCount": user.get("followersCount", 0),
+            "favouritesCount": user.get("favouritesCount", 0),
+            "friendsCount": user.get("friendsCount", 0),
+            "statusesCount": user.get("statusesCount", 0),
+            "verified": user.get("verified", False)
+        }
+        for user in twitter_users
+    ]
+
+
+def _tweet_rows(tweets: List[Dict]) -> List[Dict[str, Any]]:
+    return [
+        {
+            "id": str(tweet["id"]),
+            "authorName": tweet.get("authorName", ""),
+            "timestamp": tweet.get("timestamp", 0),
+            "likes": tweet.get("likes", 0),
+            "retweetCounts": tweet.get("retweetCounts", 0),
+            "replyCounts": tweet.get("replyCounts", 0),
+            "hashTags": tweet.get("hashTags", [])
+        }
+        for tweet in tweets
+    ]
+
+
+def _hashtag_rows(tweets: List[Dict]) -> List[Dict[str, Any]]:
+    hashtags = {hashtag for tweet in tweets for hashtag in (tweet.get("hashTags", []) or [])}
+    return [{"id": hashtag, "tag": hashtag} for hashtag in hashtags]
+
+
+def _lending_event_rows(lending_events: List[Dict], chain_id: str) -> Dict[str, List[Dict[str, Any]]]:
+    rows_by_label: Dict[str, List[Dict[str, Any]]] = {}
+    for event in lending_events:
+        edge_label = LENDING_EDGE_LABELS.get(event.get("event_type", "").upper())
+        if not edge_label:
+            continue
+        rows_by_label.setdefault(edge_label, []).append({
+            "wallet_id": f"{chain_id}_{event['wallet']}",
+            "contract_id": f"{chain_id}_{event['contract_address']}",
+            "event_id": str(event.get("_id", "")),
+            "amount": event.get("amount", 0.0),
+            "timestamp": event.get("block_timestamp", 0)
+        })
+    return rows_by_label
+
+
+def _transferred_to_rows(token_transfers: List[Dict], chain_id: str) -> List[Dict[str, Any]]:
+    return [
+        {
+            "transfer_id": f"{transfer['block_number']}_{transfer['contract_address']}_{transfer['log_index']}_{transfer['bucket_id']}",
+            "from_wallet_id": f"{chain_id}_{transfer['from_address']}",
+            "to_wallet_id": f"{chain_id}_{transfer['to_address']}",
+            "value": transfer.get("value", "0"),
+            "block_number": transfer.get("block_number", 0),
+            "contract_address": transfer.get("contract_address", ""),
+            "log_index": transfer.get("log_index", 0),
+            "bucket_id": transfer.get("bucket_id", 0)
+        }
+        for transfer in token_transfers
+    ]
+
+
+def _liquidated_by_rows(liquidations: List[Dict], chain_id: str) -> List[Dict[str, Any]]:
+    return [
+        {
+            "liquidation_id": str(liquidation.get("_id", "")),
+            "liquidated_wallet_id": f"{chain_id}_{liquidation['liquidatedWallet']}",
+            "debt_buyer_wallet_id": f"{chain_id}_{liquidation['debtBuyerWallet']}",
+            "liquidationLogs": json.dumps(liquidation.get("liquidationLogs", []))
+        }
+        for liquidation in liquidations
+    ]
+
+
+def _part_of_rows(
+    projects: List[Dict],
+    chain_id: str,
+    contract_addresses: Optional[List[str]] = None
+) -> Tuple[List[Dict[str, str]], List[Dict[str, str]]]:
+    """Contract -> Project and Token -> Project rows, matching QueryService's project_query logic"""
+    # Prepare contract_addresses set for matching (mimics $or query)
+    contract_addresses_set = set(contract_addresses or [])
+    contract_rels = []
+    token_rels = []
+
+    for project in projects:
+        project_id = str(project["_id"])
+
+        # Contract -> Project (match QueryService's $or logic)
+        for contract_key in project.get("contractAddresses", {}):
+            if "_" in contract_key:
+                contract_chain_id, address = contract_key.split("_", 1)
+                if contract_chain_id == chain_id and (not contract_addresses_set or address in contract_addresses_set):
+                    contract_rels.append({"contract_id": f"{chain_id}_{address}", "project_id": project_id})
+
+        # Token -> Project
+        for token_key in project.get("tokenAddresses", {}):
+            if "_" in token_key:
+                token_chain_id, address = token_key.split("_", 1)
+                if token_chain_id == chain_id:
+                    token_rels.append({"token_id": f"{chain_id}_{address}", "project_id": project_id})
+
+    return contract_rels, token_rels
+
+
+def _has_account_rows(project_social: List[Dict]) -> List[Dict[str, str]]:
+    rows = []
+    for social in project_social:
+        twitter_id = social.get("twitter", {}).get("id", "")
+        if twitter_id:
+            rows.append({"project_id": str(social["_id"]), "twitter_id": twitter_id})
+    return rows
+
+
+def _tweet_relationship_rows(
+    tweets: List[Dict],
+    twitter_users: List[Dict]
+) -> Tuple[List[Dict[str, Any]], List[Dict[str, str]]]:
+    """TWEETED and MENTIONS rows"""
+    # Map userName to user _id
+    user_map = {user["userName"]: str(user["_id"]) for user in twitter_users}
+    tweeted_rels = []
+    mention_rels = []
+
+    for tweet in tweets:
+        tweet_id = str(tweet["id"])
+        author_name = tweet.get("authorName", "")
+        if author_name in user_map:
+            tweeted_rels.append({
+                "author_id": user_map[author_name],
+                "tweet_id": tweet_id,
+                "timestamp": tweet.get("timestamp", 0),
+                "likes": tweet.get("likes", 0),
+                "retweetCounts": tweet.get("retweetCounts", 0),
+                "replyCounts": tweet.get("replyCounts", 0)
+            })
+        for hashtag in tweet.get("hashTags", []) or []:
+            mention_rels.append({"tweet_id": tweet_id, "hashtag": hashtag})
+
+    return tweeted_rels, mention_rels
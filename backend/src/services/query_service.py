@@ -1,9 +1,11 @@
 import logging
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Awaitable
 from src.core.database import DatabaseManager
 from src.schemas.responses import *
+from src.services.token_transfer_service import TokenTransferService
 from bson import ObjectId
 import asyncio
+import time
 
 # Configure logger
 logger = logging.getLogger(__name__)
@@ -17,256 +19,321 @@ if not logger.handlers:  # Avoid duplicate handlers
 class QueryService:
     def __init__(self, db_manager: DatabaseManager):
         self.db_manager = db_manager
+        self.token_transfer_service = TokenTransferService(db_manager)
     
     async def get_wallet_graph_data(
         self,
         wallet_address: Optional[str] = None,
         chain_id: str = "0x1",
-        limit: int = 1  # Default limit to 1 record per collection
+        limit: int = 1,  # Default limit to 1 record per collection
+        start_block: Optional[int] = None,
+        end_block: Optional[int] = None,
+        raise_errors: bool = False
     ) -> Dict[str, Any]:
+        """Fetch records from each collection to link Wallet, Lending Events, Contracts, Projects, Social, Twitter
+
+        Token transfers are read over the block window [start_block, end_block] (defaults from
+        TOKEN_TRANSFER_DEFAULT_START_BLOCK/END_BLOCK). Errors yield the empty result, or are re-raised
+        with raise_errors=True for callers that must not mistake a failure for a wallet without data.
+
+        Stages form a dependency DAG and independent stages run concurrently:
+
+            wallets -> lending_events -> contracts
+                                      -> projects -> project_social -> twitter_users
+                                                                    -> tweets
+                    -> token_transfers
+                    -> liquidations
+        """
         chain_id = chain_id or "0x1"
-        """Fetch one record from each collection to link Wallet, Lending Events, Contracts, Projects, Social, Twitter"""
         logger.info(f"Fetching graph data for wallet_address={wallet_address}, chain_id={chain_id}, limit={limit}")
+        start = time.perf_counter()
+        timings: Dict[str, float] = {}
         try:
-            result = {
-                "wallets": [],
-                "lending_events": [],
-                "contracts": [],
-                "projects": [],
-                "project_social": [],
-                "twitter_users": [],
-                "tweets": [],
-                "token_transfers": [],
-                "liquidations": []
-            }
+            result = self._empty_result()
 
             # Step 1: Query Wallets
-            db = self.db_manager.get_mongodb_database("knowledge_graph")
-            wallet_collection = db["wallets"]
-            wallet_query = {"address": wallet_address}
-            wallet_projection = {
-                "_id": 1, "address": 1, "chainId": 1, "balanceInUSD": 1, "balanceChangeLogs": 1,
-                "depositInUSD": 1, "depositChangeLogs": 1, "borrowInUSD": 1, "borrowChangeLogs": 1,
-                "dailyAllTransactions": 1, "dailyNumberOfTransactions": 1, "dailyTransactionAmounts": 1,
-                "numberOfLiquidation": 1, "totalValueOfLiquidation": 1
-            }
-            async for wallet in wallet_collection.find(wallet_query, wallet_projection).limit(limit):
-                result["wallets"].append(wallet)
-            logger.info(f"Step 1: Retrieved {len(result['wallets'])} wallet(s)")
-            if result["wallets"]:
-                logger.debug(f"Sample wallet: {result['wallets'][0]}")
-            else:
-                logger.debug("No wallets retrieved")
-
-            # Step 2: Query Lending Events
+            result["wallets"] = await self._timed(timings, "wallets", self._fetch_wallets(wallet_address, limit))
             wallet_addresses = [wallet["address"] for wallet in result["wallets"]]
-            if wallet_addresses:
-                lending_collection = self.db_manager.get_mongodb_database("ethereum_blockchain_etl")["lending_events"]
-                lending_query = {"user": {"$in": wallet_addresses}}
-                logger.debug(f"Step 2: Lending event query: {lending_query}")
-                lending_projection = {
-                    "_id": 1, "wallet": 1, "contract_address": 1, "amount": 1, "block_timestamp": 1, "event_type": 1
-                }
-                async for event in lending_collection.find(lending_query, lending_projection).limit(limit):
-                    result["lending_events"].append(event)
-                logger.info(f"Step 2: Retrieved {len(result['lending_events'])} lending event(s)")
-                if result["lending_events"]:
-                    logger.debug(f"Sample lending event: {result['lending_events'][0]}")
-            else:
-                logger.debug("Step 2: Skipped lending events query (no wallet addresses)")
 
-            # Step 3: Query Contracts
-            contract_addresses = list(set(event["contract_address"] for event in result["lending_events"]))
-            if contract_addresses:
-                contract_collection = db["smart_contracts"]
-                contract_query = {"address": {"$in": contract_addresses}}
-                logger.debug(f"Step 3: Contract query: {contract_query}")
-                contract_projection = {
-                    "_id": 1, "address": 1, "tags": 1, "numberOfDailyCalls": 1, "numberOfDailyActiveUsers": 1
-                }
-                async for contract in contract_collection.find(contract_query, contract_projection).limit(limit):
-                    active_users_count = len(contract.get("numberOfDailyActiveUsers", {}))
-                    daily_calls_count = len(contract.get("numberOfDailyCalls", {}))
-                    logger.debug(f"Step 3: Counted {active_users_count} keys in numberOfDailyActiveUsers and {daily_calls_count} keys in numberOfDailyCalls for contract {contract['address']}")
-                    contract["numberOfDailyActiveUsers"] = active_users_count
-                    contract["numberOfDailyCalls"] = daily_calls_count
-                    result["contracts"].append(contract)
-                logger.info(f"Step 3: Retrieved {len(result['contracts'])} contract(s)")
-                if result["contracts"]:
-                    logger.debug(f"Sample contract: {result['contracts'][0]}")
-            else:
-                logger.debug("Step 3: Skipped contracts query (no contract addresses)")
-
-            # Step 4: Query Token Transfers
-            # Giả sử self.db_manager.get_cassandra_session() đã trả về session còn sống
-            if wallet_addresses:
-                block_numbers = list(range(22685200, 22685211))
-                result["token_transfers"] = []
+            async def lending_branch():
+                # Step 2: Query Lending Events
+                result["lending_events"] = await self._timed(
+                    timings, "lending_events", self._fetch_lending_events(wallet_addresses, limit)
+                )
+                contract_addresses = list(set(event["contract_address"] for event in result["lending_events"]))
+                # Steps 3 and 4: Contracts and Projects both only need the contract addresses
+                await self._gather_or_cancel(contracts_stage(contract_addresses), project_branch(contract_addresses))
 
-                session = self.db_manager.get_cassandra_session()  # KHÔNG dùng 'with'
+            async def contracts_stage(contract_addresses: List[str]):
+                result["contracts"] = await self._timed(
+                    timings, "contracts", self._fetch_contracts(contract_addresses, limit)
+                )
 
-                # Query for from_address
-                query_from = """
-                    SELECT bucket_id, block_number, contract_address, log_index, from_address, to_address, transaction_hash, value
-                    FROM token_transfer
-                    WHERE block_number IN ?
-                    AND from_address = ?
-                    LIMIT ?
-                    ALLOW FILTERING
-                """
-                prepared_from = session.prepare(query_from)
+            async def project_branch(contract_addresses: List[str]):
+                result["projects"] = await self._timed(
+                    timings, "projects", self._fetch_projects(contract_addresses, chain_id, limit)
+                )
+                # Step 5: Query Project Social
+                project_ids = [project["_id"] for project in result["projects"]]
+                result["project_social"] = await self._timed(
+                    timings, "project_social", self._fetch_project_social(project_ids, limit)
+                )
+                # Steps 6 and 7: Twitter users and tweets both only need the Twitter ids
+                twitter_ids = [
+                    social["twitter"]["id"] for social in result["project_social"]
+                    if social.get("twitter", {}).get("id")
+                ]
+                result["twitter_users"], result["tweets"] = await self._gather_or_cancel(
+                    self._timed(timings, "twitter_users", self._fetch_twitter_users(twitter_ids, limit)),
+                    self._timed(timings, "tweets", self._fetch_tweets(twitter_ids, limit))
+                )
 
-                # Query for to_address
-                query_to = """
-                    SELECT bucket_id, block_number, contract_address, log_index, from_address, to_address, transaction_hash, value
-                    FROM token_transfer
-                    WHERE block_number IN ?
-                    AND to_address = ?
-                    LIMIT ?
-                    ALLOW FILTERING
-                """
-                prepared_to = session.prepare(query_to)
+            async def token_transfers_stage():
+                result["token_transfers"] = await self._timed(
+                    timings, "token_transfers", self._fetch_token_transfers(
+                        wallet_address, wallet_addresses, limit, start_block, end_block
+                    )
+                )
 
-                # Thực hiện truy vấn song song (trên thread executor)
-                loop = asyncio.get_event_loop()
-                rows_from, rows_to = await asyncio.gather(
-                    loop.run_in_executor(None, lambda: session.execute(prepared_from, (tuple(block_numbers), wallet_address, limit))),
-                    loop.run_in_executor(None, lambda: session.execute(prepared_to, (tuple(block_numbers), wallet_address, limit)))
+            async def liquidations_stage():
+                # Step 8: Query Liquidations
+                result["liquidations"] = await self._timed(
+                    timings, "liquidations", self._fetch_liquidations(wallet_addresses, limit)
                 )
 
-                # Merge results (avoid duplicate transactions by hash + log_index)
-                seen = set()
-                for row in list(rows_from) + list(rows_to):
-                    tx_key = (row.transaction_hash, row.log_index)
-                    if tx_key in seen:
-                        continue
-                    seen.add(tx_key)
-                    transaction = {
-                        "bucket_id": row.bucket_id,
-                        "block_number": row.block_number,
-                        "contract_address": row.contract_address,
-                        "log_index": row.log_index,
-                        "from_address": row.from_address,
-                        "to_address": row.to_address,
-                        "transaction_hash": row.transaction_hash,
-                        "value": row.value
-                    }
-                    result["token_transfers"].append(transaction)
+            await self._gather_or_cancel(lending_branch(), token_transfers_stage(), liquidations_stage())
 
-                logger.info(f"Step 4: Retrieved {len(result['token_transfers'])} unique transactions for contracts")
-                if result["token_transfers"]:
-                    logger.debug(f"Sample transaction: {result['token_transfers'][0]}")
+            timings["total"] = round((time.perf_counter() - start) * 1000, 2)
+            result["timings"] = timings
+            logger.info(f"Graph data fetched successfully, stage timings (ms): {timings}")
+            return result
+        except Exception as e:
+            logger.error(f"Error fetching wallet graph data: {str(e)}", exc_info=True)
+            if raise_errors:
+                raise
+            timings["total"] = round((time.perf_counter() - start) * 1000, 2)
+            result = self._empty_result()
+            result["timings"] = timings
+            return result
 
+    @staticmethod
+    def _empty_result() -> Dict[str, List]:
+        return {
+            "wallets": [],
+            "lending_events": [],
+            "contracts": [],
+            "projects": [],
+            "project_social": [],
+            "twitter_users": [],
+            "tweets": [],
+            "token_transfers": [],
+            "liquidations": []
+        }
 
-            # Step 4: Query Projects
-            if contract_addresses:
-                project_collection = db["projects"]
-                project_query = {
-                    "$or": [{f"contractAddresses.{chain_id}_{addr}": {"$exists": True}} for addr in contract_addresses]
-                }
-                logger.debug(f"Step 4: Project query: {project_query}")
-                project_projection = {
-                    "_id": 1, "name": 1, "tvl": 1, "category": 1, "deployedChains": 1,
-                    "contractAddresses": 1, "tokenAddresses": 1, "socialAccounts.twitter.id": 1
-                }
-                async for project in project_collection.find(project_query, project_projection).limit(limit):
-                    result["projects"].append(project)
-                logger.info(f"Step 4: Retrieved {len(result['projects'])} project(s)")
-                if result["projects"]:
-                    logger.debug(f"Sample project: {result['projects'][0]}")
-            else:
-                logger.debug("Step 4: Skipped projects query (no contract addresses or chain_id)")
+    @staticmethod
+    async def _gather_or_cancel(*coros: Awaitable[Any]) -> List[Any]:
+        """asyncio.gather that cancels the sibling stages once one fails, so none outlives the request"""
+        tasks = [asyncio.ensure_future(coro) for coro in coros]
+        try:
+            return await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
 
-            # Step 5: Query Project Social
-            project_ids = [project["_id"] for project in result["projects"]]
-            if project_ids:
-                social_collection = self.db_manager.get_mongodb_database("cdp_db")["projects_social_media"]
-                social_query = {"_id": {"$in": project_ids}}
-                logger.debug(f"Step 5: Social query: {social_query}")
-                social_projection = {"_id": 1, "twitter.id": 1}
-                async for social in social_collection.find(social_query, social_projection).limit(limit):
-                    result["project_social"].append(social)
-                logger.info(f"Step 5: Retrieved {len(result['project_social'])} project social record(s)")
-                if result["project_social"]:
-                    logger.debug(f"Sample project social: {result['project_social'][0]}")
-            else:
-                logger.debug("Step 5: Skipped project social query (no project IDs)")
+    @staticmethod
+    async def _timed(timings: Dict[str, float], stage: str, coro: Awaitable[Any]) -> Any:
+        """Await one stage and record its duration in milliseconds"""
+        stage_start = time.perf_counter()
+        try:
+            return await coro
+        finally:
+            timings[stage] = round((time.perf_counter() - stage_start) * 1000, 2)
 
-            # Step 6: Query Twitter Users
-            twitter_ids = [social["twitter"]["id"] for social in result["project_social"] if social.get("twitter", {}).get("id")]
-            if twitter_ids:
-                twitter_user_collection = self.db_manager.get_mongodb_database("cdp_db")["twitter_users"]
-                twitter_query = {"userName": {"$in": twitter_ids}}
-                logger.debug(f"Step 6: Twitter user query: {twitter_query}")
-                twitter_user_projection = {
-                    "_id": 1, "userName": 1, "followersCount": 1, "favouritesCount": 1,
-                    "friendsCount": 1, "statusesCount": 1, "verified": 1
-                }
-                async for user in twitter_user_collection.find(twitter_query, twitter_user_projection).limit(limit):
-                    result["twitter_users"].append(user)
-                logger.info(f"Step 6: Retrieved {len(result['twitter_users'])} Twitter user(s)")
-                if result["twitter_users"]:
-                    logger.debug(f"Sample Twitter user: {result['twitter_users'][0]}")
-            else:
-                logger.debug("Step 6: Skipped Twitter users query (no Twitter IDs)")
+    async def _fetch_wallets(self, wallet_address: Optional[str], limit: int) -> List[Dict]:
+        wallets = []
+        wallet_collection = self.db_manager.get_mongodb_database("knowledge_graph")["wallets"]
+        wallet_query = {"address": wallet_address}
+        wallet_projection = {
+            "_id": 1, "address": 1, "chainId": 1, "balanceInUSD": 1, "balanceChangeLogs": 1,
+            "depositInUSD": 1, "depositChangeLogs": 1, "borrowInUSD": 1, "borrowChangeLogs": 1,
+            "dailyAllTransactions": 1, "dailyNumberOfTransactions": 1, "dailyTransactionAmounts": 1,
+            "numberOfLiquidation": 1, "totalValueOfLiquidation": 1
+        }
+        async for wallet in wallet_collection.find(wallet_query, wallet_projection).limit(limit):
+            wallets.append(wallet)
+        logger.info(f"Step 1: Retrieved {len(wallets)} wallet(s)")
+        if wallets:
+            logger.debug(f"Sample wallet: {wallets[0]}")
+        else:
+            logger.debug("No wallets retrieved")
+        return wallets
 
-            # Step 7: Query Tweets
-            if twitter_ids:
-                tweet_collection = self.db_manager.get_mongodb_database("cdp_db")["tweets"]
-                tweet_query = {"authorName": {"$in": twitter_ids}}
-                logger.debug(f"Step 7: Tweet query: {tweet_query}")
-                tweet_projection = {
-                    "_id": 1, "authorName": 1, "timestamp": 1, "likes": 1,
-                    "retweetCounts": 1, "replyCounts": 1, "hashTags": 1
-                }
-                async for tweet in tweet_collection.find(tweet_query, tweet_projection).limit(limit):
-                    tweet_dict = {
-                        "id": str(tweet["_id"]),  # Convert ObjectId to string
-                        "authorName": tweet.get("authorName"),
-                        "timestamp": tweet.get("timestamp"),
-                        "likes": tweet.get("likes"),
-                        "retweetCounts": tweet.get("retweetCounts"),
-                        "replyCounts": tweet.get("replyCounts"),
-                        "hashTags": tweet.get("hashTags")
-                    }
-                    result["tweets"].append(tweet_dict)
-                logger.info(f"Step 7: Retrieved {len(result['tweets'])} tweet(s)")
-                if result["tweets"]:
-                    logger.debug(f"Sample tweet: {result['tweets'][0]}")
-            else:
-                logger.debug("Step 7: Skipped tweets query (no Twitter IDs)")
+    async def _fetch_lending_events(self, wallet_addresses: List[str], limit: int) -> List[Dict]:
+        if not wallet_addresses:
+            logger.debug("Step 2: Skipped lending events query (no wallet addresses)")
+            return []
+        lending_events = []
+        lending_collection = self.db_manager.get_mongodb_database("ethereum_blockchain_etl")["lending_events"]
+        lending_query = {"user": {"$in": wallet_addresses}}
+        logger.debug(f"Step 2: Lending event query: {lending_query}")
+        lending_projection = {
+            "_id": 1, "wallet": 1, "contract_address": 1, "amount": 1, "block_timestamp": 1, "event_type": 1
+        }
+        async for event in lending_collection.find(lending_query, lending_projection).limit(limit):
+            lending_events.append(event)
+        logger.info(f"Step 2: Retrieved {len(lending_events)} lending event(s)")
+        if lending_events:
+            logger.debug(f"Sample lending event: {lending_events[0]}")
+        return lending_events
 
-            # Step 8: Query Liquidations
-            if wallet_addresses:
-                liquidation_collection = db["liquidates"]
-                liquidation_query = {
-                    "$or": [
-                        {"liquidatedWallet": {"$in": wallet_addresses}},
-                        {"debtBuyerWallet": {"$in": wallet_addresses}}
-                    ]
-                }
-                logger.debug(f"Step 8: Liquidation query: {liquidation_query}")
-                liquidation_projection = {"_id": 1, "liquidatedWallet": 1, "debtBuyerWallet": 1, "liquidationLogs": 1}
-                async for liquidation in liquidation_collection.find(liquidation_query, liquidation_projection).limit(limit):
-                    result["liquidations"].append(liquidation)
-                logger.info(f"Step 8: Retrieved {len(result['liquidations'])} liquidation(s)")
-                if result["liquidations"]:
-                    logger.debug(f"Sample liquidation: {result['liquidations'][0]}")
-            else:
-                logger.debug("Step 8: Skipped liquidations query (no wallet addresses)")
+    async def _fetch_contracts(self, contract_addresses: List[str], limit: int) -> List[Dict]:
+        if not contract_addresses:
+            logger.debug("Step 3: Skipped contracts query (no contract addresses)")
+            return []
+        contracts = []
+        contract_collection = self.db_manager.get_mongodb_database("knowledge_graph")["smart_contracts"]
+        contract_query = {"address": {"$in": contract_addresses}}
+        logger.debug(f"Step 3: Contract query: {contract_query}")
+        contract_projection = {
+            "_id": 1, "address": 1, "tags": 1, "numberOfDailyCalls": 1, "numberOfDailyActiveUsers": 1
+        }
+        async for contract in contract_collection.find(contract_query, contract_projection).limit(limit):
+            active_users_count = len(contract.get("numberOfDailyActiveUsers", {}))
+            daily_calls_count = len(contract.get("numberOfDailyCalls", {}))
+            logger.debug(f"Step 3: Counted {active_users_count} keys in numberOfDailyActiveUsers and {daily_calls_count} keys in numberOfDailyCalls for contract {contract['address']}")
+            contract["numberOfDailyActiveUsers"] = active_users_count
+            contract["numberOfDailyCalls"] = daily_calls_count
+            contracts.append(contract)
+        logger.info(f"Step 3: Retrieved {len(contracts)} contract(s)")
+        if contracts:
+            logger.debug(f"Sample contract: {contracts[0]}")
+        return contracts
 
-            logger.info("Graph data fetched successfully")
-            return result
-        except Exception as e:
-            logger.error(f"Error fetching wallet graph data: {str(e)}", exc_info=True)
-            return {
-                "wallets": [],
-                "lending_events": [],
-                "contracts": [],
-                "projects": [],
-                "project_social": [],
-                "twitter_users": [],
-                "tweets": [],
-                "token_transfers": [],
-                "liquidations": []
-            }
\ No newline at end of file
+    async def _fetch_token_transfers(
+        self,
+        wallet_address: Optional[str],
+        wallet_addresses: List[str],
+        limit: int,
+        start_block: Optional[int] = None,
+        end_block: Optional[int] = None
+    ) -> List[Dict]:
+        # Step 4: Query Token Transfers
+        if not wallet_addresses:
+            return []
+        token_transfers = await self.token_transfer_service.get_wallet_transfers(
+            wallet_address,
+            start_block=start_block,
+            end_block=end_block,
+            limit=limit
+        )
+        logger.info(f"Step 4: Retrieved {len(token_transfers)} unique transactions for contracts")
+        if token_transfers:
+            logger.debug(f"Sample transaction: {token_transfers[0]}")
+        return token_transfers
+
+    async def _fetch_projects(self, contract_addresses: List[str], chain_id: str, limit: int) -> List[Dict]:
+        if not contract_addresses:
+            logger.debug("Step 4: Skipped projects query (no contract addresses or chain_id)")
+            return []
+        projects = []
+        project_collection = self.db_manager.get_mongodb_database("knowledge_graph")["projects"]
+        project_query = {
+            "$or": [{f"contractAddresses.{chain_id}_{addr}": {"$exists": True}} for addr in contract_addresses]
+        }
+        logger.debug(f"Step 4: Project query: {project_query}")
+        project_projection = {
+            "_id": 1, "name": 1, "tvl": 1, "category": 1, "deployedChains": 1,
+            "contractAddresses": 1, "tokenAddresses": 1, "socialAccounts.twitter.id": 1
+        }
+        async for project in project_collection.find(project_query, project_projection).limit(limit):
+            projects.append(project)
+        logger.info(f"Step 4: Retrieved {len(projects)} project(s)")
+        if projects:
+            logger.debug(f"Sample project: {projects[0]}")
+        return projects
+
+    async def _fetch_project_social(self, project_ids: List[Any], limit: int) -> List[Dict]:
+        if not project_ids:
+            logger.debug("Step 5: Skipped project social query (no project IDs)")
+            return []
+        project_social = []
+        social_collection = self.db_manager.get_mongodb_database("cdp_db")["projects_social_media"]
+        social_query = {"_id": {"$in": project_ids}}
+        logger.debug(f"Step 5: Social query: {social_query}")
+        social_projection = {"_id": 1, "twitter.id": 1}
+        async for social in social_collection.find(social_query, social_projection).limit(limit):
+            project_social.append(social)
+        logger.info(f"Step 5: Retrieved {len(project_social)} project social record(s)")
+        if project_social:
+            logger.debug(f"Sample project social: {project_social[0]}")
+        return project_social
+
+    async def _fetch_twitter_users(self, twitter_ids: List[str], limit: int) -> List[Dict]:
+        if not twitter_ids:
+            logger.debug("Step 6: Skipped Twitter users query (no Twitter IDs)")
+            return []
+        twitter_users = []
+        twitter_user_collection = self.db_manager.get_mongodb_database("cdp_db")["twitter_users"]
+        twitter_query = {"userName": {"$in": twitter_ids}}
+        logger.debug(f"Step 6: Twitter user query: {twitter_query}")
+        twitter_user_projection = {
+            "_id": 1, "userName": 1, "followersCount": 1, "favouritesCount": 1,
+            "friendsCount": 1, "statusesCount": 1, "verified": 1
+        }
+        async for user in twitter_user_collection.find(twitter_query, twitter_user_projection).limit(limit):
+            twitter_users.append(user)
+        logger.info(f"Step 6: Retrieved {len(twitter_users)} Twitter user(s)")
+        if twitter_users:
+            logger.debug(f"Sample Twitter user: {twitter_users[0]}")
+        return twitter_users
+
+    async def _fetch_tweets(self, twitter_ids: List[str], limit: int) -> List[Dict]:
+        if not twitter_ids:
+            logger.debug("Step 7: Skipped tweets query (no Twitter IDs)")
+            return []
+        tweets = []
+        tweet_collection = self.db_manager.get_mongodb_database("cdp_db")["tweets"]
+        tweet_query = {"authorName": {"$in": twitter_ids}}
+        logger.debug(f"Step 7: Tweet query: {tweet_query}")
+        tweet_projection = {
+            "_id": 1, "authorName": 1, "timestamp": 1, "likes": 1,
+            "retweetCounts": 1, "replyCounts": 1, "hashTags": 1
+        }
+        async for tweet in tweet_collection.find(tweet_query, tweet_projection).limit(limit):
+            tweet_dict = {
+                "id": str(tweet["_id"]),  # Convert ObjectId to string
+                "authorName": tweet.get("authorName"),
+                "timestamp": tweet.get("timestamp"),
+                "likes": tweet.get("likes"),
+                "retweetCounts": tweet.get("retweetCounts"),
+                "replyCounts": tweet.get("replyCounts"),
+                "hashTags": tweet.get("hashTags")
+            }
+            tweets.append(tweet_dict)
+        logger.info(f"Step 7: Retrieved {len(tweets)} tweet(s)")
+        if tweets:
+            logger.debug(f"Sample tweet: {tweets[0]}")
+        return tweets
+
+    async def _fetch_liquidations(self, wallet_addresses: List[str], limit: int) -> List[Dict]:
+        if not wallet_addresses:
+            logger.debug("Step 8: Skipped liquidations query (no wallet addresses)")
+            return []
+        liquidations = []
+        liquidation_collection = self.db_manager.get_mongodb_database("knowledge_graph")["liquidates"]
+        liquidation_query = {
+            "$or": [
+                {"liquidatedWallet": {"$in": wallet_addresses}},
+                {"debtBuyerWallet": {"$in": wallet_addresses}}
+            ]
+        }
+        logger.debug(f"Step 8: Liquidation query: {liquidation_query}")
+        liquidation_projection = {"_id": 1, "liquidatedWallet": 1, "debtBuyerWallet": 1, "liquidationLogs": 1}
+        async for liquidation in liquidation_collection.find(liquidation_query, liquidation_projection).limit(limit):
+            liquidations.append(liquidation)
+        logger.info(f"Step 8: Retrieved {len(liquidations)} liquidation(s)")
+        if liquidations:
+            logger.debug(f"Sample liquidation: {liquidations[0]}")
+        return liquidations
@@ -0,0 +1,196 @@
+from typing import Optional, List, Dict, Any, AsyncIterator, Tuple
+from src.core.database import DatabaseManager
+import asyncio
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+handler = logging.StreamHandler()
+formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
+handler.setFormatter(formatter)
+if not logger.handlers:
+    logger.addHandler(handler)
+
+# Block window used when the caller does not give one
+DEFAULT_START_BLOCK = int(os.getenv("TOKEN_TRANSFER_DEFAULT_START_BLOCK", 22685200))
+DEFAULT_END_BLOCK = int(os.getenv("TOKEN_TRANSFER_DEFAULT_END_BLOCK", 22685210))
+# Upper bound on partitions one request may fan out to
+MAX_BLOCK_WINDOW = int(os.getenv("TOKEN_TRANSFER_MAX_BLOCK_WINDOW", 10000))
+PARTITION_CONCURRENCY = int(os.getenv("TOKEN_TRANSFER_PARTITION_CONCURRENCY", 32))
+# Rows one partition query may return when the caller gives no limit
+MAX_ROWS_PER_PARTITION = int(os.getenv("TOKEN_TRANSFER_MAX_ROWS_PER_PARTITION", 10000))
+# bucket_ids per block when bucket_id is part of the token_transfer partition key, 0 when it is not
+BUCKETS_PER_BLOCK = int(os.getenv("TOKEN_TRANSFER_BUCKETS_PER_BLOCK", 0))
+# Optional table keyed by (address, block_number) holding one row per transfer side
+ADDRESS_LOOKUP_TABLE = os.getenv("TOKEN_TRANSFER_ADDRESS_TABLE", "token_transfer_by_address")
+
+TRANSFER_COLUMNS = "bucket_id, block_number, contract_address, log_index, from_address, to_address, transaction_hash, value"
+
+# One query per partition and transfer side; the address predicate is evaluated by the replica, and
+# ALLOW FILTERING is bounded here because the partition key is fully restricted
+PARTITION_QUERY = (
+    f"SELECT {TRANSFER_COLUMNS} FROM token_transfer "
+    "WHERE block_number = ? AND {side} = ? LIMIT ? ALLOW FILTERING"
+)
+BUCKET_PARTITION_QUERY = (
+    f"SELECT {TRANSFER_COLUMNS} FROM token_transfer "
+    "WHERE block_number = ? AND bucket_id = ? AND {side} = ? LIMIT ? ALLOW FILTERING"
+)
+TRANSFER_SIDES = ("from_address", "to_address")
+ADDRESS_LOOKUP_QUERY = (
+    f"SELECT {TRANSFER_COLUMNS} FROM {ADDRESS_LOOKUP_TABLE} "
+    "WHERE address = ? AND block_number >= ? AND block_number <= ?"
+)
+
+_DONE = object()
+
+
+class TokenTransferService:
+    """Fetch a wallet's token transfers over a block window without full-table filtering
+
+    With an address-keyed lookup table the window is a single partition range read. Otherwise
+    every block (and bucket) partition of the window is queried concurrently for each transfer
+    side, each query routed to its replicas by the token-aware policy, which filter on the address
+    within that one partition so only the wallet's rows are sent back.
+    Results are merged and de-duplicated on (transaction_hash, log_index) as they arrive.
+    """
+
+    def __init__(self, db_manager: DatabaseManager):
+        self.db_manager = db_manager
+        self._has_address_table: Optional[bool] = None
+
+    async def get_wallet_transfers(
+        self,
+        wallet_address: str,
+        start_block: Optional[int] = None,
+        end_block: Optional[int] = None,
+        limit: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        return [
+            transfer async for transfer in
+            self.stream_wallet_transfers(wallet_address, start_block, end_block, limit)
+        ]
+
+    async def stream_wallet_transfers(
+        self,
+        wallet_address: str,
+        start_block: Optional[int] = None,
+        end_block: Optional[int] = None,
+        limit: Optional[int] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        start_block, end_block = self.block_window(start_block, end_block)
+        if self.has_address_table():
+            logger.debug(f"Token transfers for {wallet_address}: address lookup over blocks {start_block}-{end_block}")
+            rows = self._scan_address_table(wallet_address, start_block, end_block)
+        else:
+            logger.debug(f"Token transfers for {wallet_address}: partition fan-out over blocks {start_block}-{end_block}")
+            rows = self._scan_partitions(wallet_address, start_block, end_block, limit)
+
+        seen = set()
+        try:
+            async for row in rows:
+                tx_key = (row.transaction_hash, row.log_index)
+                if tx_key in seen:
+                    continue
+                seen.add(tx_key)
+                yield _transfer_to_dict(row)
+                if limit is not None and len(seen) >= limit:
+                    return
+        finally:
+            await rows.aclose()
+
+    def has_address_table(self) -> bool:
+        """Whether the address-keyed lookup table exists in the connected keyspace (checked once)"""
+        if self._has_address_table is None:
+            session = self.db_manager.get_cassandra_session()
+            keyspace = session.cluster.metadata.keyspaces.get(session.keyspace)
+            self._has_address_table = bool(keyspace and ADDRESS_LOOKUP_TABLE in keyspace.tables)
+            logger.info(f"Token transfer lookup table {ADDRESS_LOOKUP_TABLE} available: {self._has_address_table}")
+        return self._has_address_table
+
+    @staticmethod
+    def block_window(start_block: Optional[int], end_block: Optional[int]) -> Tuple[int, int]:
+        """The window with defaults filled in; ValueError when it is reversed or wider than MAX_BLOCK_WINDOW"""
+        start_block = DEFAULT_START_BLOCK if start_block is None else start_block
+        end_block = DEFAULT_END_BLOCK if end_block is None else end_block
+        if end_block < start_block:
+            raise ValueError(f"end_block ({end_block}) must be >= start_block ({start_block})")
+        if end_block - start_block + 1 > MAX_BLOCK_WINDOW:
+            raise ValueError(f"Block window {start_block}-{end_block} exceeds TOKEN_TRANSFER_MAX_BLOCK_WINDOW={MAX_BLOCK_WINDOW}")
+        return start_block, end_block
+
+    async def _scan_address_table(self, wallet_address: str, start_block: int, end_block: int) -> AsyncIterator[Any]:
+        session = self.db_manager.get_cassandra_async_session()
+        async for row in session.iterate(ADDRESS_LOOKUP_QUERY, (wallet_address, start_block, end_block)):
+            yield row
+
+    async def _scan_partitions(
+        self, wallet_address: str, start_block: int, end_block: int, limit: Optional[int] = None
+    ) -> AsyncIterator[Any]:
+        """Query every partition of the window with bounded concurrency, yielding the wallet's rows as they arrive"""
+        session = self.db_manager.get_cassandra_async_session()
+        row_limit = limit or MAX_ROWS_PER_PARTITION
+        # The address as given and lowercased, the filter is an exact match on the replica
+        addresses = list(dict.fromkeys([wallet_address, wallet_address.lower()]))
+        if BUCKETS_PER_BLOCK > 0:
+            partitions = [
+                (BUCKET_PARTITION_QUERY.format(side=side), (block, bucket, address, row_limit))
+                for block in range(start_block, end_block + 1)
+                for bucket in range(BUCKETS_PER_BLOCK)
+                for side in TRANSFER_SIDES
+                for address in addresses
+            ]
+        else:
+            partitions = [
+                (PARTITION_QUERY.format(side=side), (block, address, row_limit))
+                for block in range(start_block, end_block + 1)
+                for side in TRANSFER_SIDES
+                for address in addresses
+            ]
+
+        queue: asyncio.Queue = asyncio.Queue()
+        semaphore = asyncio.Semaphore(PARTITION_CONCURRENCY)
+
+        async def read_partition(query: str, parameters: Tuple[Any, ...]):
+            async with semaphore:
+                async for row in session.iterate(query, parameters):
+                    await queue.put(row)
+
+        async def read_all():
+            tasks = [asyncio.ensure_future(read_partition(query, parameters)) for query, parameters in partitions]
+            try:
+                await asyncio.gather(*tasks)
+            except BaseException:
+                # One failed partition (or the consumer leaving) stops the rest, none outlives the request
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+                raise
+            finally:
+                await queue.put(_DONE)
+
+        reader = asyncio.create_task(read_all())
+        try:
+            while True:
+                row = await queue.get()
+                if row is _DONE:
+                    break
+                yield row
+            await reader  # Surface partition read errors
+        finally:
+            if not reader.done():
+                reader.cancel()
+
+
+def _transfer_to_dict(row) -> Dict[str, Any]:
+    return {
+        "bucket_id": row.bucket_id,
+        "block_number": row.block_number,
+        "contract_address": row.contract_address,
+        "log_index": row.log_index,
+        "from_address": row.from_address,
+        "to_address": row.to_address,
+        "transaction_hash": row.transaction_hash,
+        "value": row.value
+    }
@@ -0,0 +1,136 @@
+from typing import Optional, List, Dict, Any, Callable, Awaitable
+from neo4j.exceptions import ServiceUnavailable, SessionExpired, TransientError
+from pymongo.errors import AutoReconnect, NetworkTimeout, ServerSelectionTimeoutError
+import asyncio
+import logging
+import os
+import random
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+handler = logging.StreamHandler()
+formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
+handler.setFormatter(formatter)
+if not logger.handlers:
+    logger.addHandler(handler)
+
+DEFAULT_CONCURRENCY = int(os.getenv("WALLET_BATCH_CONCURRENCY", 16))
+DEFAULT_WALLET_TIMEOUT = float(os.getenv("WALLET_BATCH_TIMEOUT_SECONDS", 120))
+DEFAULT_MAX_RETRIES = int(os.getenv("WALLET_BATCH_MAX_RETRIES", 3))
+DEFAULT_BACKOFF_BASE = float(os.getenv("WALLET_BATCH_BACKOFF_BASE_SECONDS", 0.5))
+DEFAULT_BACKOFF_MAX = float(os.getenv("WALLET_BATCH_BACKOFF_MAX_SECONDS", 30))
+
+# Errors worth retrying: the wallet itself is fine, the store was briefly unavailable
+TRANSIENT_ERRORS = (
+    asyncio.TimeoutError,
+    ServiceUnavailable,
+    SessionExpired,
+    TransientError,
+    AutoReconnect,
+    NetworkTimeout,
+    ServerSelectionTimeoutError,
+)
+
+WalletTask = Callable[[str], Awaitable[Dict[str, Any]]]
+
+
+class WalletBatchExecutor:
+    """Run a per-wallet coroutine over many wallets with bounded concurrency, timeouts and retries"""
+
+    def __init__(
+        self,
+        concurrency: int = DEFAULT_CONCURRENCY,
+        wallet_timeout: Optional[float] = DEFAULT_WALLET_TIMEOUT,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        backoff_base: float = DEFAULT_BACKOFF_BASE,
+        backoff_max: float = DEFAULT_BACKOFF_MAX
+    ):
+        if concurrency < 1:
+            raise ValueError("concurrency must be >= 1")
+        self.concurrency = concurrency
+        self.wallet_timeout = wallet_timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+    async def run(self, wallet_addresses: List[str], task: WalletTask) -> Dict[str, Any]:
+        """Process every wallet with `task` and aggregate into successes/failures/errors"""
+        result = {
+            "total_processed": 0,
+            "successes": 0,
+            "failures": 0,
+            "errors": []
+        }
+        if not wallet_addresses:
+            return result
+
+        queue: asyncio.Queue = asyncio.Queue()
+        for wallet_address in wallet_addresses:
+            queue.put_nowait(wallet_address)
+
+        async def worker():
+            while True:
+                try:
+                    wallet_address = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                error_msg = await self._process_wallet(wallet_address, task)
+                # Workers share the event loop, so updating the dict needs no lock
+                result["total_processed"] += 1
+                if error_msg is None:
+                    result["successes"] += 1
+                else:
+                    result["failures"] += 1
+                    result["errors"].append(error_msg)
+                queue.task_done()
+
+        workers = [
+            asyncio.create_task(worker())
+            for _ in range(min(self.concurrency, len(wallet_addresses)))
+        ]
+        try:
+            await asyncio.gather(*workers)
+        finally:
+            for w in workers:
+                w.cancel()
+
+        logger.info(
+            f"Wallet batch finished: {result['successes']} succeeded, {result['failures']} failed "
+            f"(concurrency={self.concurrency})"
+        )
+        return result
+
+    async def _process_wallet(self, wallet_address: str, task: WalletTask) -> Optional[str]:
+        """Return None on success, otherwise the error message recorded for the wallet"""
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                graph_result = await asyncio.wait_for(task(wallet_address), timeout=self.wallet_timeout)
+                if graph_result.get("status") == "success":
+                    logger.debug(f"Successfully built graph for wallet: {wallet_address}")
+                    return None
+                error_msg = f"Failed to build graph for wallet {wallet_address}: {graph_result.get('message')}"
+                logger.error(error_msg)
+                return error_msg
+
+            except TRANSIENT_ERRORS as e:
+                if attempt > self.max_retries:
+                    error_msg = f"Error processing wallet {wallet_address} after {attempt} attempts: {type(e).__name__}: {e}"
+                    logger.error(error_msg)
+                    return error_msg
+                delay = self._backoff_delay(attempt)
+                logger.warning(
+                    f"Transient error for wallet {wallet_address} (attempt {attempt}): {type(e).__name__}: {e}; "
+                    f"retrying in {delay:.2f}s"
+                )
+                await asyncio.sleep(delay)
+
+            except Exception as e:
+                error_msg = f"Error processing wallet {wallet_address}: {str(e)}"
+                logger.error(error_msg, exc_info=True)
+                return error_msg
+
+    def _backoff_delay(self, attempt: int) -> float:
+        """Exponential backoff with full jitter"""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** (attempt - 1))))
@@ -0,0 +1,127 @@
+from typing import Optional, Dict, Any
+from src.core.database import DatabaseManager
+from bson import ObjectId
+import asyncio
+import logging
+import json
+import os
+import re
+import time
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+handler = logging.StreamHandler()
+formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
+handler.setFormatter(formatter)
+if not logger.handlers:
+    logger.addHandler(handler)
+
+DEFAULT_CHECKPOINT_DIR = os.getenv("WALLET_CHECKPOINT_DIR", ".checkpoints")
+
+
+def encode_cursor(doc_id: Any) -> str:
+    """Encode a Mongo _id as a resume token that keeps its BSON type"""
+    if isinstance(doc_id, ObjectId):
+        return f"oid:{doc_id}"
+    if isinstance(doc_id, int):
+        return f"int:{doc_id}"
+    return f"str:{doc_id}"
+
+
+def decode_cursor(cursor: str) -> Any:
+    """Inverse of encode_cursor"""
+    kind, _, value = cursor.partition(":")
+    if kind == "oid" and ObjectId.is_valid(value):
+        return ObjectId(value)
+    if kind == "int":
+        return int(value)
+    if kind == "str":
+        return value
+    raise ValueError(f"Invalid wallet batch cursor: {cursor}")
+
+
+class WalletCheckpointStore:
+    """Persist the last processed _id of a wallet batch run, in Postgres when connected, else on local disk"""
+
+    def __init__(self, db_manager: DatabaseManager, checkpoint_dir: str = DEFAULT_CHECKPOINT_DIR):
+        self.db_manager = db_manager
+        self.checkpoint_dir = checkpoint_dir
+        self._table_ready = False
+
+    async def load(self, name: str) -> Optional[Dict[str, Any]]:
+        """Return {"cursor", "processed", "updated_at"} or None when no checkpoint exists"""
+        if self.db_manager.is_postgres_connected():
+            await self._ensure_table()
+            async with self.db_manager.postgres_connection() as conn:
+                row = await conn.fetchrow(
+                    "SELECT cursor, processed, EXTRACT(EPOCH FROM updated_at) AS updated_at "
+                    "FROM wallet_batch_checkpoints WHERE name = $1",
+                    name
+                )
+            return {"cursor": row["cursor"], "processed": row["processed"], "updated_at": float(row["updated_at"])} if row else None
+
+        path = self._path(name)
+        if not os.path.exists(path):
+            return None
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    async def save(self, name: str, cursor: str, processed: int) -> None:
+        if self.db_manager.is_postgres_connected():
+            await self._ensure_table()
+            async with self.db_manager.postgres_connection() as conn:
+                await conn.execute(
+                    """
+                    INSERT INTO wallet_batch_checkpoints (name, cursor, processed, updated_at)
+                    VALUES ($1, $2, $3, now())
+                    ON CONFLICT (name) DO UPDATE
+                    SET cursor = EXCLUDED.cursor, processed = EXCLUDED.processed, updated_at = now()
+                    """,
+                    name, cursor, processed
+                )
+            return
+
+        await asyncio.to_thread(self._write_file, name, {
+            "cursor": cursor,
+            "processed": processed,
+            "updated_at": time.time()
+        })
+
+    async def clear(self, name: str) -> None:
+        if self.db_manager.is_postgres_connected():
+            await self._ensure_table()
+            async with self.db_manager.postgres_connection() as conn:
+                await conn.execute("DELETE FROM wallet_batch_checkpoints WHERE name = $1", name)
+            return
+
+        path = self._path(name)
+        if os.path.exists(path):
+            os.remove(path)
+
+    async def _ensure_table(self) -> None:
+        if self._table_ready:
+            return
+        async with self.db_manager.postgres_connection() as conn:
+            await conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS wallet_batch_checkpoints (
+                    name TEXT PRIMARY KEY,
+                    cursor TEXT NOT NULL,
+                    processed BIGINT NOT NULL DEFAULT 0,
+                    updated_at TIMESTAMPTZ NOT NULL DEFAULT now()
+                )
+                """
+            )
+        self._table_ready = True
+
+    def _path(self, name: str) -> str:
+        safe_name = re.sub(r"[^A-Za-z0-9_.-]", "_", name)
+        return os.path.join(self.checkpoint_dir, f"{safe_name}.json")
+
+    def _write_file(self, name: str, checkpoint: Dict[str, Any]) -> None:
+        os.makedirs(self.checkpoint_dir, exist_ok=True)
+        path = self._path(name)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(checkpoint, f)
+        os.replace(tmp_path, path)  # Atomic, a crash never leaves a half-written checkpoint